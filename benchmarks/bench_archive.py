@@ -0,0 +1,98 @@
+"""
+Compara o tamanho e a leitura de listagens arquivadas: `RecordArchive` com zstd por
+registro, com dicionário treinado, e um arquivo gzip único com todas as listagens.
+
+Uso:
+    python -m benchmarks.bench_archive --listings 50000
+"""
+import argparse
+import copy
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.samples import LISTING
+from datalar.archive import RecordArchive
+
+AMENITIES = ["POOL", "GYM", "BARBECUE_GRILL", "PARTY_HALL", "ELEVATOR", "PETS_ALLOWED"]
+NEIGHBORHOODS = ["Bela Vista", "Pinheiros", "Moema", "Tatuapé", "Santana", "Butantã"]
+
+
+def make_listing(rng: random.Random, i: int) -> dict:
+    listing = copy.deepcopy(LISTING)
+    listing["id"] = str(2_700_000_000 + i)
+    listing["sourceId"] = f"src-{rng.getrandbits(40):x}"
+    listing["amenities"] = listing["mergedAmenities"] = rng.sample(AMENITIES, 3)
+    listing["usableAreas"] = [rng.randrange(30, 300)]
+    listing["bedrooms"] = [rng.randrange(1, 5)]
+    listing["pricingInfos"][0]["price"] = rng.randrange(200_000, 3_000_000, 1000)
+    listing["pricingInfos"][0]["monthlyCondoFee"] = rng.randrange(200, 3000, 10)
+    listing["address"]["neighborhood"] = rng.choice(NEIGHBORHOODS)
+    listing["address"]["streetNumber"] = str(rng.randrange(1, 3000))
+    listing["address"]["point"] = {
+        "lat": round(-23.5 - rng.random() / 5, 6),
+        "lon": round(-46.6 - rng.random() / 5, 6),
+        "source": "GOOGLE",
+    }
+    return listing
+
+
+def archive_size(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith(".dat")
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    listings = [make_listing(rng, i) for i in range(args.listings)]
+    encoded = [json.dumps(item, ensure_ascii=False).encode() for item in listings]
+    raw = sum(map(len, encoded))
+    keys = rng.sample([item["id"] for item in listings], args.lookups)
+    print(f"{args.listings} listings, {raw / 2**20:.1f} MiB of JSON")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "listings.jsonl.gz")
+        with gzip.open(path, "wb") as f:
+            f.writelines(line + b"\n" for line in encoded)
+        start = time.perf_counter()
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if json.loads(line)["id"] == keys[0]:
+                    break
+        print(
+            f"{'gzip file':<22} {raw / os.path.getsize(path):5.1f}x  "
+            f"one lookup {(time.perf_counter() - start) * 1000:8.2f} ms"
+        )
+
+        for name, train in (("zstd per record", False), ("zstd + dictionary", True)):
+            target = os.path.join(directory, name.replace(" ", "-"))
+            with RecordArchive(target) as archive:
+                if train:
+                    archive.train_dictionary(encoded[:5000])
+                for item, data in zip(listings, encoded):
+                    archive.append(item["id"], data)
+                start = time.perf_counter()
+                for key in keys:
+                    archive.get(key)
+                lookup = (time.perf_counter() - start) / len(keys)
+            print(
+                f"{name:<22} {raw / archive_size(target):5.1f}x  "
+                f"one lookup {lookup * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compara a vazão da validação das listagens com cada `SDKConfig.PARSE_EXECUTOR`.
+
+Uso:
+    python -m benchmarks.bench_parse --pages 50 --page-size 110 --workers 4 --callers 4
+
+Usa páginas sintéticas (nenhuma requisição é feita). Em builds free-threaded do Python
+(3.13t+), o modo "thread" também valida em paralelo. Cada chamada de validação bloqueia
+até a página inteira ser validada; com `--callers` maior que 1, as páginas são divididas
+entre threads que compartilham a SDK, como os workers do crawler, e `--latency` simula a
+espera da rede antes de cada página, que é onde a validação se sobrepõe às buscas.
+"""
+import argparse
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.samples import LISTING
+from datalar.scrapers.zap_imoveis.sdk.parsing import free_threading_enabled
+from datalar.scrapers.zap_imoveis.sdk.sdk import SDKConfig, ZapGlueAPI
+
+
+def make_page(page: int, size: int) -> dict:
+    listings = []
+    for i in range(size):
+        listing = copy.deepcopy(LISTING)
+        listing["id"] = f"{page}-{i}"
+        listings.append({"listing": listing})
+    return {"search": {"result": {"listings": listings}, "totalCount": size}}
+
+
+def run(
+    executor: str, pages: list, workers: int, callers: int = 1, latency: float = 0.0
+) -> float:
+    sdk = ZapGlueAPI(
+        SDKConfig(PARSE_EXECUTOR=executor, PARSE_WORKERS=workers, LOG_LEVEL="ERROR")
+    )
+    # aquece o executor (criação dos processos) fora da medição
+    sdk.listings._parse_listing_data(pages[0])
+
+    def fetch_and_parse(page: dict) -> None:
+        time.sleep(latency)
+        sdk.listings._parse_listing_data(page)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(callers) as pool:
+        list(pool.map(fetch_and_parse, pages))
+    elapsed = time.perf_counter() - start
+    sdk.close()
+    return sum(len(p["search"]["result"]["listings"]) for p in pages) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=110)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--callers", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    pages = [make_page(page, args.page_size) for page in range(args.pages)]
+    print(f"free-threading: {free_threading_enabled()}")
+    for executor in ("inline", "thread", "process"):
+        rate = run(executor, pages, args.workers, args.callers, args.latency)
+        print(f"{executor:<8} {rate:10.0f} listings/s")
+
+
+if __name__ == "__main__":
+    main()
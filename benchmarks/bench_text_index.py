@@ -0,0 +1,57 @@
+"""
+Mede a indexação e a latência das buscas do `TextIndex` sobre listagens sintéticas.
+
+Uso:
+    python -m benchmarks.bench_text_index --listings 200000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from datalar.scrapers.zap_imoveis.text_index import TextIndex
+
+WORDS = (
+    "apartamento casa cobertura studio quarto quartos suite suites varanda gourmet "
+    "piscina academia churrasqueira quintal edicula garagem vaga vagas metro proximo "
+    "reformado planejada cozinha sala ampla vista mar aceita pet portaria 24h lazer "
+    "completo sol manha andar alto elevador condominio seguranca escola mercado parque"
+).split()
+AMENITIES = ["POOL", "GYM", "BARBECUE_GRILL", "PARTY_HALL", "ELEVATOR", "PETS_ALLOWED"]
+QUERIES = ["varanda gourmet", "aceita pet", "piscina academia", "vista mar", "quintal"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = TextIndex()
+    start = time.perf_counter()
+    for i in range(args.listings):
+        index.add_text(
+            str(i),
+            {
+                "title": " ".join(rng.choices(WORDS, k=6)),
+                "description": " ".join(rng.choices(WORDS, k=60)),
+                "amenities": " ".join(rng.sample(AMENITIES, 3)),
+            },
+        )
+    elapsed = time.perf_counter() - start
+    print(
+        f"indexed {args.listings} listings in {elapsed:.1f}s "
+        f"({args.listings / elapsed:.0f}/s), postings {index.index_size() / 2**20:.1f} MB"
+    )
+    for query in QUERIES:
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            timings.append(time.perf_counter() - start)
+        print(f"{query:<20} {statistics.median(timings) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compara a vazão das requisições de busca usando o transporte padrão (cloudscraper,
+HTTP/1.1) e o cliente HTTP/2 da SDK (`SDKConfig.HTTP2`).
+
+Uso:
+    python -m benchmarks.bench_transport --requests 200 --concurrency 32
+
+Faz requisições reais à API (ou à URL informada em `--base-url`).
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from datalar.scrapers.zap_imoveis.sdk.sdk import SDKConfig, ZapGlueAPI
+
+
+def run(http2: bool, requests: int, concurrency: int, base_url: str | None) -> dict:
+    sdk = ZapGlueAPI(SDKConfig(HTTP2=http2, RAISE_FOR_STATUS=False, LOG_LEVEL="ERROR"))
+    if base_url:
+        sdk.BASE_URL = base_url
+
+    def request(page: int) -> float:
+        start = time.perf_counter()
+        sdk.listings.count(
+            business_type="SALE", listing_type="USED", page=page % 10 + 1
+        )
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(request, range(requests)))
+    elapsed = time.perf_counter() - start
+    sdk.close()
+
+    return {
+        "transport": "HTTP/2 (httpx)" if http2 else "HTTP/1.1 (cloudscraper)",
+        "req/s": requests / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p95 ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base-url", default=None)
+    args = parser.parse_args()
+
+    for http2 in (False, True):
+        result = run(http2, args.requests, args.concurrency, args.base_url)
+        print(
+            f"{result['transport']:<24} {result['req/s']:8.1f} req/s "
+            f"p50 {result['p50 ms']:7.1f} ms  p95 {result['p95 ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compara formas de carregar modelos a partir de registros JSON armazenados: decodificar
+com `json.loads` e validar, montar sem validação com `model_construct` (apenas o modelo
+raiz; os aninhados ficam como dicionários) e o `TrustedLoader`, que valida os bytes
+diretamente.
+
+Uso:
+    python -m benchmarks.bench_trusted --rows 20000
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from benchmarks.samples import LISTING, PROPERTY
+from datalar.scrapers.schemas import PropertySchema
+from datalar.scrapers.trusted import trusted_loader
+from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+from datalar.scrapers.zap_imoveis.sdk.utils import normalize_keys
+
+
+def measure(load: Callable, lines: List[bytes]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        load(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    listing = ListingData(**normalize_keys(LISTING)).model_dump(mode="json")
+    cases = [
+        ("ListingData", ListingData, listing),
+        ("PropertySchema", PropertySchema, PROPERTY),
+    ]
+    for name, model, row in cases:
+        lines = [json.dumps({**row, "id": str(i)}).encode() for i in range(args.rows)]
+        loader = trusted_loader(model)
+        strategies = {
+            "loads+validate": lambda line: model.model_validate(json.loads(line)),
+            "loads+construct": lambda line: model.model_construct(**json.loads(line)),
+            "trusted": loader.from_json,
+        }
+        rates = {key: measure(load, lines) for key, load in strategies.items()}
+        baseline = rates["loads+validate"]
+        print(
+            f"{name:<15}"
+            + "".join(
+                f"  {key} {rate:8.0f}/s ({rate / baseline:.1f}x)"
+                for key, rate in rates.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Registros de exemplo compartilhados pelos benchmarks e pelos testes: uma listagem no
+formato bruto da API do Zap (camelCase) e um registro de `PropertySchema` armazenado.
+"""
+LISTING = {
+    "contractType": "REAL_ESTATE",
+    "propertyDevelopers": [],
+    "sourceId": "src-1001",
+    "displayAddressType": "ALL",
+    "amenities": ["POOL", "GYM"],
+    "usableAreas": [70],
+    "constructionStatus": "BUILT",
+    "listingType": "USED",
+    "description": "Apartamento com varanda gourmet, aceita pet e próximo ao metrô.",
+    "title": "Apartamento com 2 quartos na Bela Vista",
+    "stamps": [],
+    "createdAt": "2024-01-10T12:00:00Z",
+    "floors": [3],
+    "unitTypes": ["APARTMENT"],
+    "condominiumName": "",
+    "unitsOnTheFloor": 4,
+    "id": "1001",
+    "portal": "ZAP",
+    "unitFloor": 3,
+    "parkingSpaces": [1],
+    "updatedAt": "2024-02-01T08:00:00Z",
+    "suites": [1],
+    "portals": ["ZAP", "VIVAREAL"],
+    "bathrooms": [2],
+    "usageTypes": ["RESIDENTIAL"],
+    "bedrooms": [2],
+    "pricingInfos": [
+        {
+            "price": 700000,
+            "businessType": "SALE",
+            "monthlyCondoFee": 800,
+            "yearlyIptu": 1200,
+            "iptuPeriod": "YEARLY",
+        }
+    ],
+    "mergedAmenities": ["POOL", "GYM"],
+    "status": "ACTIVE",
+    "address": {
+        "country": "BR",
+        "zipCode": "01310-100",
+        "city": "São Paulo",
+        "streetNumber": "1000",
+        "neighborhood": "Bela Vista",
+        "street": "Avenida Paulista",
+        "state": "SP",
+        "point": {"lat": -23.56, "lon": -46.65, "source": "GOOGLE"},
+    },
+    "totalAreas": [80],
+    "whatsappNumber": "11999999999",
+}
+
+
+PROPERTY = {
+    "id": "1",
+    "address": "Avenida Paulista, 1000",
+    "city": "São Paulo",
+    "state": "SP",
+    "zip_code": "01310-100",
+    "country": "BR",
+    "for_rent": False,
+    "for_sale": True,
+    "iptu": 1200.0,
+    "sale_price": 700000.0,
+    "bedrooms": 2,
+    "bathrooms": 2,
+    "parking_spaces": 1,
+    "area": 70.0,
+    "property_type": "residential",
+    "has_garden": False,
+    "has_pool": True,
+    "is_furnished": False,
+    "images": ["https://example.com/1.jpg"],
+    "url": "https://example.com/1",
+    "source": "zap",
+    "scraped_at": "2024-02-01T08:00:00Z",
+    "source_id": "src-1",
+    "source_url": "https://example.com",
+    "source_name": "Zap Imóveis",
+}
@@ -0,0 +1,558 @@
+"""
+Arquivo somente de acréscimo das respostas brutas da API, com acesso direto por id.
+
+As respostas brutas ficam guardadas para auditoria, mas encontrar o JSON de uma listagem
+em arquivos comprimidos inteiros exige descomprimir e percorrer tudo. O `RecordArchive`
+grava um registro por listagem, prefixado pelo tamanho e comprimido individualmente com
+zstd, e mantém um índice do id (e do momento da coleta) para a posição do registro: ler
+o registro de uma listagem é uma busca no índice e uma única leitura no arquivo.
+
+O arquivo é um diretório de segmentos numerados. Cada segmento tem:
+
+- `NNNNNNNN.dat`: os registros, após um cabeçalho de 8 bytes. Cada registro tem um
+  cabeçalho fixo (`_RECORD`: tamanho dos dados, CRC32 dos dados gravados, tamanho do id,
+  codec), o id em UTF-8 e os dados;
+- `NNNNNNNN.log`: no segmento ativo, uma entrada de tamanho fixo por registro (hash de 64
+  bits do id, momento em microssegundos, posição), na ordem de gravação;
+- `NNNNNNNN.idx`: nos segmentos fechados, as mesmas entradas ordenadas por hash e
+  momento, em três colunas contíguas, para busca binária direto no `mmap`.
+
+Ao atingir `segment_size`, o segmento ativo é fechado (`seal`): o índice ordenado é
+gravado e o log, removido. Os segmentos fechados são lidos apenas por `mmap`, sem
+carregar os índices em memória, então o custo de uma consulta cresce com o logaritmo do
+número de registros de cada segmento. Ao reabrir o arquivo, registros do segmento ativo
+gravados sem a entrada correspondente no log (interrompidos no meio) são descartados.
+
+Registros individuais de listagens são pequenos e muito repetitivos (as mesmas chaves,
+os mesmos valores de enums, o mesmo vocabulário de amenidades), então o zstd sem
+dicionário pouco ganha em cada um. `train_dictionary` treina um dicionário zstd sobre uma
+amostra de registros (por padrão, os já gravados no arquivo) e o grava em
+`dictionaries/NNNN.zdict`. Cada dicionário treinado é uma nova versão, usada nos
+registros gravados a partir daí; as versões anteriores são mantidas para ler os registros
+antigos. O número da versão é o id do dicionário gravado no cabeçalho de cada frame zstd,
+então cada registro identifica o dicionário que o descomprime.
+
+Exemplo::
+
+    with RecordArchive("raw/listings", train_after=10_000) as archive:
+        archive.append_json(listing["id"], listing)
+        raw = archive.get_json("2712345678")
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import zstandard
+
+_MAGIC = b"DLARC\x00\x00\x01"
+_INDEX_MAGIC = b"DLIDX\x00\x00\x01"
+# tamanho dos dados, CRC32 dos dados gravados, tamanho do id, codec
+_RECORD = struct.Struct("<IIHB")
+# hash do id, momento (microssegundos), posição
+_ENTRY = struct.Struct("<QqQ")
+_INDEX_HEADER = struct.Struct("<8sQ")
+_INDEX_HEADER_SIZE = 64
+
+CODEC_RAW = 0
+CODEC_ZSTD = 1
+# zstd com dicionário; a versão do dicionário é o id gravado no frame
+CODEC_ZSTD_DICT = 2
+
+DEFAULT_DICTIONARY_SIZE = 110 * 1024
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def train_dictionary(
+    samples: Iterable[bytes],
+    size: int = DEFAULT_DICTIONARY_SIZE,
+    dict_id: int = 0,
+) -> zstandard.ZstdCompressionDict:
+    """
+    Treina um dicionário zstd sobre as amostras (por exemplo, o JSON das entradas de
+    `search.result.listings`). Algumas milhares de amostras costumam bastar.
+
+    :param dict_id: Id gravado nos frames comprimidos com o dicionário.
+    """
+    samples = list(samples)
+    if not samples:
+        raise ValueError("At least one sample is required to train a dictionary")
+    return zstandard.train_dictionary(size, samples, dict_id=dict_id)
+
+
+def _micros(timestamp: float) -> int:
+    return round(timestamp * 1_000_000)
+
+
+@dataclass(frozen=True)
+class ArchivedRecord:
+    key: str
+    timestamp: float
+    data: bytes
+    segment: int
+    offset: int
+
+    def json(self) -> Any:
+        return json.loads(self.data)
+
+
+class _SealedSegment:
+    """
+    Segmento fechado: dados e índice ordenado, ambos mapeados em memória.
+    """
+
+    def __init__(self, data_path: str, index_path: str) -> None:
+        with open(data_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(index_path, "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _INDEX_HEADER.unpack_from(self.index)
+        if magic != _INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not an archive index")
+        self.count = count
+        column = _INDEX_HEADER_SIZE
+        self.hashes = np.frombuffer(self.index, "<u8", count, column)
+        self.timestamps = np.frombuffer(self.index, "<i8", count, column + 8 * count)
+        self.offsets = np.frombuffer(self.index, "<u8", count, column + 16 * count)
+
+    def entries(self, hashed: int) -> List[Tuple[int, int]]:
+        """
+        (momento, posição) dos registros com o hash, em ordem cronológica.
+        """
+        target = np.uint64(hashed)
+        start = int(np.searchsorted(self.hashes, target, "left"))
+        end = int(np.searchsorted(self.hashes, target, "right"))
+        return [
+            (int(self.timestamps[i]), int(self.offsets[i])) for i in range(start, end)
+        ]
+
+    def close(self) -> None:
+        del self.hashes, self.timestamps, self.offsets
+        self.index.close()
+        self.data.close()
+
+
+class RecordArchive:
+    """
+    Arquivo de registros em um diretório de segmentos.
+
+    :param directory: O diretório do arquivo (criado se necessário).
+    :param compress: Comprime os registros com zstd (mantidos sem compressão quando a
+                     compressão não reduz o tamanho).
+    :param level: Nível de compressão do zstd.
+    :param segment_size: Tamanho, em bytes, a partir do qual o segmento ativo é fechado.
+    :param dictionary: Comprime os novos registros com o dicionário mais recente, se
+                       houver.
+    :param train_after: Treina o primeiro dicionário automaticamente quando o arquivo
+                        atinge esse número de registros.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        compress: bool = True,
+        level: int = 3,
+        segment_size: int = 1 << 30,
+        dictionary: bool = True,
+        train_after: Optional[int] = None,
+    ) -> None:
+        os.makedirs(os.path.join(directory, "dictionaries"), exist_ok=True)
+        self.directory = directory
+        self.compress = compress
+        self.level = level
+        self.segment_size = segment_size
+        self.use_dictionary = dictionary
+        self.train_after = train_after
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._dictionaries: Dict[int, zstandard.ZstdCompressionDict] = {}
+        self._load_dictionaries()
+        self._sealed: Dict[int, _SealedSegment] = {}
+        # entradas do segmento ativo: hash -> [(momento, posição)]
+        self._active_entries: Dict[int, List[Tuple[int, int]]] = {}
+        self._active_map: Optional[mmap.mmap] = None
+
+        numbers = sorted(
+            int(name[:-4]) for name in os.listdir(directory) if name.endswith(".dat")
+        )
+        for number in numbers:
+            if os.path.exists(self._path(number, "idx")):
+                self._sealed[number] = _SealedSegment(
+                    self._path(number, "dat"), self._path(number, "idx")
+                )
+        active = [n for n in numbers if n not in self._sealed]
+        self._active = active[-1] if active else (numbers[-1] + 1 if numbers else 1)
+        self._open_active()
+
+    def _path(self, number: int, extension: str) -> str:
+        return os.path.join(self.directory, f"{number:08d}.{extension}")
+
+    def _dictionary_path(self, version: int) -> str:
+        return os.path.join(self.directory, "dictionaries", f"{version:04d}.zdict")
+
+    def _load_dictionaries(self) -> None:
+        for name in os.listdir(os.path.join(self.directory, "dictionaries")):
+            if name.endswith(".zdict"):
+                version = int(name[:-6])
+                if version not in self._dictionaries:
+                    with open(self._dictionary_path(version), "rb") as f:
+                        self._dictionaries[version] = zstandard.ZstdCompressionDict(
+                            f.read()
+                        )
+
+    @property
+    def dictionary_version(self) -> Optional[int]:
+        """
+        Versão do dicionário usado nos novos registros.
+        """
+        if not self.use_dictionary or not self._dictionaries:
+            return None
+        return max(self._dictionaries)
+
+    def dictionary_versions(self) -> List[int]:
+        return sorted(self._dictionaries)
+
+    def train_dictionary(
+        self,
+        samples: Optional[Iterable[bytes]] = None,
+        *,
+        size: int = DEFAULT_DICTIONARY_SIZE,
+        max_samples: int = 20_000,
+    ) -> int:
+        """
+        Treina e grava uma nova versão do dicionário, usada nos registros gravados a
+        partir daqui.
+
+        :param samples: As amostras. Por padrão, os primeiros `max_samples` registros do
+                        arquivo.
+        :return: A versão do dicionário.
+        """
+        if samples is None:
+            samples = (record.data for record in self.scan())
+        samples = [sample for sample, _ in zip(samples, range(max_samples))]
+        with self._train_lock:
+            self._load_dictionaries()
+            version = max(self._dictionaries, default=0) + 1
+            trained = train_dictionary(samples, size, dict_id=version)
+            path = self._dictionary_path(version)
+            with open(path + ".tmp", "wb") as f:
+                f.write(trained.as_bytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            self._dictionaries[version] = trained
+        return version
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.records + sum(s.count for s in self._sealed.values())
+
+    def _open_active(self) -> None:
+        data_path = self._path(self._active, "dat")
+        log_path = self._path(self._active, "log")
+        self._active_entries = {}
+        end = len(_MAGIC)
+        if os.path.exists(data_path):
+            log = b""
+            if os.path.exists(log_path):
+                with open(log_path, "rb") as f:
+                    log = f.read()
+            entries = list(_ENTRY.iter_unpack(log[: len(log) - len(log) % _ENTRY.size]))
+            with open(data_path, "r+b") as f:
+                # os registros são contíguos: basta conferir o último registro completo
+                while entries:
+                    offset = entries[-1][2]
+                    f.seek(offset)
+                    header = f.read(_RECORD.size)
+                    if len(header) == _RECORD.size:
+                        size, _, key_size, _ = _RECORD.unpack(header)
+                        record_end = offset + _RECORD.size + key_size + size
+                        if record_end <= os.fstat(f.fileno()).st_size:
+                            end = record_end
+                            break
+                    entries.pop()
+                # descarta registros e entradas incompletos
+                f.truncate(end)
+            with open(log_path, "ab") as f:
+                f.truncate(len(entries) * _ENTRY.size)
+            for hashed, timestamp, offset in entries:
+                self._active_entries.setdefault(hashed, []).append((timestamp, offset))
+        else:
+            with open(data_path, "wb") as f:
+                f.write(_MAGIC)
+        # leitura e escrita: o segmento ativo também é lido por `mmap`
+        self._data = open(data_path, "a+b")
+        self._log = open(log_path, "ab")
+        self._size = end
+        self.records = sum(len(entries) for entries in self._active_entries.values())
+
+    def append(
+        self, key: str, data: bytes, timestamp: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Grava um registro.
+
+        :param timestamp: Momento da coleta (segundos desde a época). Por padrão, agora.
+        :return: O segmento e a posição do registro.
+        """
+        codec = CODEC_RAW
+        if self.compress:
+            version = self.dictionary_version
+            compressed = self._compressor(version).compress(data)
+            if len(compressed) < len(data):
+                data = compressed
+                codec = CODEC_ZSTD if version is None else CODEC_ZSTD_DICT
+        encoded_key = key.encode()
+        header = _RECORD.pack(len(data), zlib.crc32(data), len(encoded_key), codec)
+        hashed = key_hash(key)
+        micros = _micros(time.time() if timestamp is None else timestamp)
+        with self._lock:
+            offset = self._size
+            self._data.write(header + encoded_key + data)
+            self._log.write(_ENTRY.pack(hashed, micros, offset))
+            self._size += len(header) + len(encoded_key) + len(data)
+            self._active_entries.setdefault(hashed, []).append((micros, offset))
+            self.records += 1
+            location = (self._active, offset)
+            if self._size >= self.segment_size:
+                self._seal()
+        if (
+            self.train_after is not None
+            and self.compress
+            and self.dictionary_version is None
+            and len(self) >= self.train_after
+            and not self._train_lock.locked()
+        ):
+            self.train_dictionary(max_samples=self.train_after)
+        return location
+
+    def append_json(self, key: str, value: Any, timestamp: Optional[float] = None):
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        return self.append(key, encoded.encode(), timestamp)
+
+    def _cached(self, kind: str, version: Optional[int], factory) -> Any:
+        # compressores e descompressores do zstd não são seguros entre threads
+        cache = self._local.__dict__.setdefault(kind, {})
+        if version not in cache:
+            cache[version] = factory()
+        return cache[version]
+
+    def _compressor(self, version: Optional[int]) -> zstandard.ZstdCompressor:
+        return self._cached(
+            "compressors",
+            version,
+            lambda: zstandard.ZstdCompressor(
+                level=self.level,
+                dict_data=None if version is None else self._dictionaries[version],
+            ),
+        )
+
+    def _decompressor(self, version: Optional[int]) -> zstandard.ZstdDecompressor:
+        if version is not None and version not in self._dictionaries:
+            # treinado por outro processo depois da abertura
+            with self._train_lock:
+                self._load_dictionaries()
+            if version not in self._dictionaries:
+                raise ValueError(f"Missing compression dictionary version {version}")
+        return self._cached(
+            "decompressors",
+            version,
+            lambda: zstandard.ZstdDecompressor(
+                dict_data=None if version is None else self._dictionaries[version]
+            ),
+        )
+
+    def _decode(self, codec: int, data: bytes) -> bytes:
+        if codec == CODEC_RAW:
+            return data
+        if codec == CODEC_ZSTD:
+            return self._decompressor(None).decompress(data)
+        if codec == CODEC_ZSTD_DICT:
+            version = zstandard.get_frame_parameters(data).dict_id
+            return self._decompressor(version).decompress(data)
+        raise ValueError(f"Unknown record codec {codec}")
+
+    def _read(self, buffer, offset: int) -> Tuple[str, bytes]:
+        size, crc, key_size, codec = _RECORD.unpack_from(buffer, offset)
+        start = offset + _RECORD.size
+        key = bytes(buffer[start : start + key_size]).decode()
+        data = bytes(buffer[start + key_size : start + key_size + size])
+        if zlib.crc32(data) != crc:
+            raise ValueError(f"Corrupted archive record at offset {offset}")
+        return key, self._decode(codec, data)
+
+    def _active_buffer(self) -> mmap.mmap:
+        # chamado com `_lock`: o mapeamento acompanha o crescimento do arquivo
+        self._data.flush()
+        if self._active_map is None or len(self._active_map) < self._size:
+            if self._active_map is not None:
+                self._active_map.close()
+            self._active_map = mmap.mmap(
+                self._data.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        return self._active_map
+
+    def _candidates(self, key: str) -> List[Tuple[int, int, int]]:
+        """
+        (momento, segmento, posição) dos registros com o hash do id, em ordem
+        cronológica.
+        """
+        hashed = key_hash(key)
+        with self._lock:
+            sealed = list(self._sealed.items())
+        found = [
+            (timestamp, number, offset)
+            for number, segment in sealed
+            for timestamp, offset in segment.entries(hashed)
+        ]
+        with self._lock:
+            found.extend(
+                (timestamp, self._active, offset)
+                for timestamp, offset in self._active_entries.get(hashed, ())
+            )
+        found.sort()
+        return found
+
+    def _record_at(self, number: int, offset: int) -> Tuple[str, bytes]:
+        segment = self._sealed.get(number)
+        if segment is not None:
+            return self._read(segment.data, offset)
+        with self._lock:
+            return self._read(self._active_buffer(), offset)
+
+    def history(self, key: str) -> List[ArchivedRecord]:
+        """
+        Todos os registros do id, em ordem cronológica.
+        """
+        records = []
+        for timestamp, number, offset in self._candidates(key):
+            stored_key, data = self._record_at(number, offset)
+            # colisões do hash de 64 bits
+            if stored_key == key:
+                records.append(
+                    ArchivedRecord(key, timestamp / 1_000_000, data, number, offset)
+                )
+        return records
+
+    def get(self, key: str, at: Optional[float] = None) -> Optional[ArchivedRecord]:
+        """
+        O registro mais recente do id ou, com `at`, o mais recente até esse momento.
+        """
+        limit = None if at is None else _micros(at)
+        for timestamp, number, offset in reversed(self._candidates(key)):
+            if limit is not None and timestamp > limit:
+                continue
+            stored_key, data = self._record_at(number, offset)
+            if stored_key == key:
+                return ArchivedRecord(key, timestamp / 1_000_000, data, number, offset)
+        return None
+
+    def get_json(self, key: str, at: Optional[float] = None) -> Any:
+        record = self.get(key, at)
+        return record.json() if record is not None else None
+
+    def scan(self) -> Iterator[ArchivedRecord]:
+        """
+        Percorre todos os registros, na ordem de gravação.
+        """
+        with self._lock:
+            self._data.flush()
+        numbers = sorted([*self._sealed, self._active])
+        for number in numbers:
+            segment = self._sealed.get(number)
+            if segment is not None:
+                entries = zip(segment.timestamps.tolist(), segment.offsets.tolist())
+            else:
+                with self._lock:
+                    entries = [
+                        item
+                        for items in self._active_entries.values()
+                        for item in items
+                    ]
+            for timestamp, offset in sorted(entries, key=lambda item: item[1]):
+                key, data = self._record_at(number, offset)
+                yield ArchivedRecord(key, timestamp / 1_000_000, data, number, offset)
+
+    def seal(self) -> None:
+        """
+        Fecha o segmento ativo (se tiver registros) e inicia um novo.
+        """
+        with self._lock:
+            if self.records:
+                self._seal()
+
+    def _seal(self) -> None:
+        number = self._active
+        hashes, timestamps, offsets = [], [], []
+        for hashed, entries in self._active_entries.items():
+            for timestamp, offset in entries:
+                hashes.append(hashed)
+                timestamps.append(timestamp)
+                offsets.append(offset)
+        hashes = np.array(hashes, dtype="<u8")
+        timestamps = np.array(timestamps, dtype="<i8")
+        order = np.lexsort((timestamps, hashes))
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, len(order))
+        index_path = self._path(number, "idx")
+        with open(index_path + ".tmp", "wb") as f:
+            f.write(header.ljust(_INDEX_HEADER_SIZE, b"\0"))
+            f.write(hashes[order].tobytes())
+            f.write(timestamps[order].tobytes())
+            f.write(np.array(offsets, dtype="<u8")[order].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._close_active()
+        os.replace(index_path + ".tmp", index_path)
+        os.remove(self._path(number, "log"))
+        self._sealed[number] = _SealedSegment(self._path(number, "dat"), index_path)
+        self._active = number + 1
+        self._open_active()
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Grava os buffers no arquivo e, com `fsync`, no disco.
+        """
+        with self._lock:
+            for f in (self._data, self._log):
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+    def _close_active(self) -> None:
+        if self._active_map is not None:
+            self._active_map.close()
+            self._active_map = None
+        self._data.close()
+        self._log.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._data.closed:
+                return
+            self._close_active()
+            for segment in self._sealed.values():
+                segment.close()
+
+    def __enter__(self) -> RecordArchive:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,261 @@
+"""
+Filtro de Bloom persistente para os ids de listagens já vistos.
+
+Saber se uma listagem é nova exige o conjunto completo de ids em memória ou uma consulta
+ao banco por listagem. O `BloomFilter` responde "com certeza nova" ou "talvez já vista"
+em O(1), com `k` bits consultados por id, numa fração da memória: com 1% de falsos
+positivos, cerca de 9,6 bits por id (10 milhões de ids em 12 MB). Só os ids marcados
+como "talvez já vistos" precisam ser confirmados no banco.
+
+O filtro é um arquivo mapeado em memória (`mmap`): abrir um filtro existente não lê o
+arquivo inteiro e as alterações são gravadas pelo sistema operacional. Cada worker pode
+manter o próprio filtro e os filtros são combinados com `merge` (OU bit a bit), desde que
+tenham sido criados com os mesmos parâmetros.
+
+Formato do arquivo: um cabeçalho de 64 bytes (`_HEADER`) seguido dos bits. As posições
+de um id vêm de duplo hashing sobre os 128 bits do BLAKE2b do id.
+
+Exemplo::
+
+    seen = BloomFilter("seen.bloom", capacity=50_000_000, error_rate=0.01)
+    if listing.id not in seen:
+        ...  # com certeza nova: dispensa a consulta ao banco
+    seen.add(listing.id)
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+_MAGIC = b"DLBLOOM\x00"
+_VERSION = 1
+# magic, versão, número de hashes, número de bits, capacidade, ids inseridos
+_HEADER = struct.Struct("<8sIIQQQ")
+_HEADER_SIZE = 64
+_MASK64 = (1 << 64) - 1
+
+Buffer = Union[mmap.mmap, bytearray]
+
+
+def optimal_parameters(capacity: int, error_rate: float) -> tuple[int, int]:
+    """
+    Número de bits (múltiplo de 64) e de hashes para `capacity` ids com a taxa de falsos
+    positivos `error_rate`.
+    """
+    if capacity < 1:
+        raise ValueError("capacity must be positive")
+    if not 0 < error_rate < 1:
+        raise ValueError("error_rate must be between 0 and 1")
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits = max(64, -(-bits // 64) * 64)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _hashes(key: str) -> tuple[int, int]:
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    # o segundo hash é ímpar: os passos nunca são nulos
+    return (
+        int.from_bytes(digest[:8], "little"),
+        int.from_bytes(digest[8:], "little") | 1,
+    )
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom de strings, em memória ou em um arquivo mapeado.
+
+    :param path: Arquivo do filtro. Se existir, é aberto com os parâmetros gravados nele
+                 (`capacity` e `error_rate` são ignorados); caso contrário, é criado. Sem
+                 arquivo, o filtro fica apenas em memória.
+    :param capacity: Número de ids previsto. Acima dele, a taxa de falsos positivos
+                     cresce além de `error_rate`.
+    :param error_rate: Taxa de falsos positivos na capacidade prevista.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        capacity: int = 10_000_000,
+        error_rate: float = 0.01,
+    ) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None and os.path.exists(path):
+            self._open(path)
+            return
+        self.num_bits, self.num_hashes = optimal_parameters(capacity, error_rate)
+        self.capacity = capacity
+        self.count = 0
+        size = _HEADER_SIZE + self.num_bits // 8
+        if path is None:
+            self._buffer: Buffer = bytearray(size)
+        else:
+            with open(path, "xb") as f:
+                f.truncate(size)
+            self._map(path)
+        self._write_header()
+
+    def _map(self, path: str) -> None:
+        self._file = open(path, "r+b")
+        self._buffer = mmap.mmap(self._file.fileno(), 0)
+
+    def _open(self, path: str) -> None:
+        self._map(path)
+        magic, version, hashes, bits, capacity, count = _HEADER.unpack_from(
+            self._buffer
+        )
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a bloom filter file")
+        if len(self._buffer) != _HEADER_SIZE + bits // 8:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        self.num_hashes = hashes
+        self.num_bits = bits
+        self.capacity = capacity
+        self.count = count
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(
+            self._buffer,
+            0,
+            _MAGIC,
+            _VERSION,
+            self.num_hashes,
+            self.num_bits,
+            self.capacity,
+            self.count,
+        )
+
+    def _positions(self, key: str) -> List[int]:
+        h1, h2 = _hashes(key)
+        bits = self.num_bits
+        # módulo 2**64, como a versão vetorizada de `contains_many`
+        return [((h1 + i * h2) & _MASK64) % bits for i in range(self.num_hashes)]
+
+    def _bits(self) -> np.ndarray:
+        return np.frombuffer(self._buffer, dtype=np.uint8, offset=_HEADER_SIZE)
+
+    def add(self, key: str) -> bool:
+        """
+        Adiciona o id.
+
+        :return: `True` se o id era com certeza novo.
+        """
+        buffer = self._buffer
+        new = False
+        with self._lock:
+            for position in self._positions(key):
+                index = _HEADER_SIZE + (position >> 3)
+                mask = 1 << (position & 7)
+                byte = buffer[index]
+                if not byte & mask:
+                    buffer[index] = byte | mask
+                    new = True
+            if new:
+                self.count += 1
+                self._write_header()
+        return new
+
+    def update(self, keys: Iterable[str]) -> int:
+        """
+        Adiciona os ids.
+
+        :return: Quantos eram com certeza novos.
+        """
+        return sum(self.add(key) for key in keys)
+
+    def __contains__(self, key: str) -> bool:
+        """
+        `False` significa que o id com certeza nunca foi adicionado; `True`, que
+        provavelmente foi (a menos de um falso positivo).
+        """
+        buffer = self._buffer
+        for position in self._positions(key):
+            if not buffer[_HEADER_SIZE + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def contains_many(self, keys: Iterable[str]) -> np.ndarray:
+        """
+        `key in self` para vários ids, com as leituras dos bits vetorizadas.
+        """
+        keys = list(keys)
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        hashes = np.array([_hashes(key) for key in keys], dtype=np.uint64)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            positions = (hashes[:, :1] + steps * hashes[:, 1:]) % np.uint64(
+                self.num_bits
+            )
+        bytes_ = self._bits()[positions >> np.uint64(3)]
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        return np.all(bytes_ & masks, axis=1)
+
+    def merge(self, other: BloomFilter) -> None:
+        """
+        Combina os ids de outro filtro neste (OU bit a bit). Os filtros devem ter o
+        mesmo número de bits e de hashes.
+        """
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("Bloom filters must have the same size and hash count")
+        with self._lock:
+            bits = self._bits()
+            np.bitwise_or(bits, other._bits(), out=bits)
+            del bits
+            self.count = self.estimated_count()
+            self._write_header()
+
+    def fill_ratio(self) -> float:
+        """
+        Fração dos bits ligados.
+        """
+        return int(np.bitwise_count(self._bits()).sum()) / self.num_bits
+
+    def estimated_count(self) -> int:
+        """
+        Estimativa do número de ids distintos a partir da fração de bits ligados.
+        """
+        fill = self.fill_ratio()
+        if fill >= 1:
+            return self.capacity
+        return round(-self.num_bits / self.num_hashes * math.log1p(-fill))
+
+    def false_positive_rate(self) -> float:
+        """
+        Taxa de falsos positivos atual, estimada pela fração de bits ligados.
+        """
+        return self.fill_ratio() ** self.num_hashes
+
+    @property
+    def size_bytes(self) -> int:
+        return _HEADER_SIZE + self.num_bits // 8
+
+    def flush(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._buffer.flush()
+        self._buffer.close()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> BloomFilter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
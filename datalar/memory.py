@@ -0,0 +1,114 @@
+"""
+Limites de memória para processos de longa duração.
+
+Coletas de vários dias acumulam memória aos poucos (listas de `ListingData`, buffers de
+log, estado das sessões do cloudscraper) e acabam encerradas pelo sistema no meio de uma
+página. Em vez de tentar liberar tudo, o `MemoryGuard` acompanha o uso de memória
+residente (RSS) e o número de objetos vivos e indica quando o processo deve ser
+reciclado: encerrado de forma limpa, entre duas tarefas, e substituído por um novo.
+
+A RSS é lida de `/proc/self/statm` no Linux; nos demais sistemas, usa-se o pico de RSS
+de `resource.getrusage`, que só cresce, mas basta para um teto.
+
+Exemplo::
+
+    guard = MemoryGuard(max_rss=2 * 2**30, max_pages=5_000)
+    for page in pages:
+        process(page)
+        if guard.observe() is not None:
+            break
+"""
+from __future__ import annotations
+
+import gc
+import os
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+
+def rss_bytes() -> int:
+    """
+    Memória residente atual do processo, em bytes.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes no Linux e nos BSDs, bytes no macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def live_objects() -> int:
+    """
+    Número de objetos acompanhados pelo coletor de lixo. Percorre todos os objetos: não
+    deve ser chamado a cada listagem.
+    """
+    return len(gc.get_objects())
+
+
+@dataclass(frozen=True)
+class MemorySample:
+    rss: int
+    objects: Optional[int]
+    pages: int
+
+
+class MemoryGuard:
+    """
+    Decide quando reciclar um processo.
+
+    :param max_rss: Teto de memória residente, em bytes.
+    :param max_pages: Número de páginas (ou tarefas) após o qual o processo é reciclado,
+                      mesmo abaixo do teto de memória.
+    :param max_objects: Teto de objetos vivos (`gc.get_objects`).
+    :param check_every: Mede a memória a cada `check_every` páginas.
+    :ivar last: A última medição.
+    :ivar peak_rss: A maior RSS medida.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_rss: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        max_objects: Optional[int] = None,
+        check_every: int = 1,
+    ) -> None:
+        if check_every < 1:
+            raise ValueError("check_every must be at least 1")
+        self.max_rss = max_rss
+        self.max_pages = max_pages
+        self.max_objects = max_objects
+        self.check_every = check_every
+        self.pages = 0
+        self.last: Optional[MemorySample] = None
+        self.peak_rss = 0
+
+    def sample(self) -> MemorySample:
+        objects = live_objects() if self.max_objects is not None else None
+        self.last = MemorySample(rss_bytes(), objects, self.pages)
+        self.peak_rss = max(self.peak_rss, self.last.rss)
+        return self.last
+
+    def observe(self, pages: int = 1) -> Optional[str]:
+        """
+        Registra `pages` páginas processadas e verifica os limites.
+
+        :return: O motivo da reciclagem, ou `None` se o processo pode continuar.
+        """
+        before = self.pages
+        self.pages += pages
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return f"processed {self.pages} pages (limit {self.max_pages})"
+        if self.pages // self.check_every == before // self.check_every:
+            return None
+        sample = self.sample()
+        if self.max_rss is not None and sample.rss >= self.max_rss:
+            return f"rss {sample.rss / 2**20:.0f} MiB (limit {self.max_rss / 2**20:.0f} MiB)"
+        if self.max_objects is not None and sample.objects >= self.max_objects:
+            return f"{sample.objects} live objects (limit {self.max_objects})"
+        return None
@@ -0,0 +1,457 @@
+"""
+Pipeline em estágios conectados por filas limitadas.
+
+Cada estágio aplica uma função aos itens recebidos com a própria concorrência (threads,
+processos ou corrotinas) e envia os resultados para a fila de entrada do estágio seguinte.
+As filas têm capacidade limitada: quando um estágio lento (por exemplo, a escrita em
+banco) não acompanha, a sua fila enche, os estágios anteriores ficam bloqueados ao
+enviar e a leitura da fonte para. Assim, a rede e a CPU podem ser ocupadas ao mesmo tempo
+sem que os itens intermediários se acumulem em memória.
+
+Exemplo::
+
+    pipeline = Pipeline(
+        [
+            Stage("fetch", fetch_page, workers=8),
+            Stage("parse", parse_page, workers=4, kind="process", flatten=True),
+            Stage("sink", write_rows, batch_size=500),
+        ]
+    )
+    pipeline.run(pages)
+    for metrics in pipeline.metrics():
+        print(metrics.name, metrics.throughput, metrics.queue_depth)
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Iterable, Iterator, List, Literal, Optional, Sequence
+
+StageKind = Literal["thread", "process", "async"]
+
+# marca o fim dos itens de uma fila (um por consumidor)
+_END = object()
+# retorno de `_get` quando o tempo de espera acabou
+_EMPTY = object()
+# intervalo com que as esperas verificam se o pipeline foi interrompido
+_POLL_INTERVAL = 0.1
+
+
+class _Aborted(Exception):
+    """
+    O pipeline foi interrompido (erro em outro estágio ou consumidor encerrado).
+    """
+
+
+@dataclass
+class Stage:
+    """
+    Um estágio do pipeline.
+
+    :param name: Nome do estágio, usado nas métricas e nos nomes das threads.
+    :param fn: Função aplicada a cada item (ou a cada lote, com `batch_size`). Itens
+               para os quais ela retorna `None` não seguem adiante.
+    :param workers: Número de threads, processos ou corrotinas do estágio.
+    :param kind: `thread`, `process` (`fn` e os itens precisam ser serializáveis com
+                 pickle) ou `async` (`fn` é uma corrotina, executada em um loop de eventos
+                 próprio do estágio).
+    :param batch_size: Se informado, `fn` recebe listas de até `batch_size` itens.
+    :param batch_timeout: Tempo máximo, em segundos, de espera para completar um lote.
+    :param queue_size: Capacidade da fila de entrada. Por padrão, duas vezes o número de
+                       workers (ou o tamanho do lote, se maior).
+    :param flatten: Se `fn` retorna um iterável cujos elementos seguem separadamente.
+    """
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    kind: StageKind = "thread"
+    batch_size: Optional[int] = None
+    batch_timeout: float = 1.0
+    queue_size: Optional[int] = None
+    flatten: bool = False
+
+    def __post_init__(self) -> None:
+        if self.workers < 1:
+            raise ValueError("workers must be greater than 0")
+        if self.kind not in ("thread", "process", "async"):
+            raise ValueError(f"Unknown stage kind: {self.kind}")
+        if self.batch_size is not None and self.batch_size < 1:
+            raise ValueError("batch_size must be greater than 0")
+
+    @property
+    def consumers(self) -> int:
+        # no estágio assíncrono, uma única tarefa lê a fila e distribui entre as corrotinas
+        return 1 if self.kind == "async" else self.workers
+
+    def input_queue_size(self) -> int:
+        return self.queue_size or max(2 * self.workers, self.batch_size or 0)
+
+
+@dataclass
+class StageMetrics:
+    """
+    :ivar received: Itens recebidos pelo estágio.
+    :ivar emitted: Itens enviados ao estágio seguinte.
+    :ivar busy_seconds: Tempo total gasto em `fn`, somado entre os workers.
+    :ivar blocked_seconds: Tempo total esperando espaço na fila seguinte. Valores altos
+                           indicam que o gargalo está depois deste estágio.
+    :ivar queue_depth: Itens na fila de entrada no momento da leitura das métricas.
+    :ivar max_queue_depth: Maior ocupação da fila de entrada observada pelos workers.
+    """
+
+    name: str
+    workers: int
+    queue_size: int
+    received: int = 0
+    emitted: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """
+        Itens recebidos por segundo.
+        """
+        return self.received / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def utilization(self) -> float:
+        """
+        Fração do tempo em que os workers estiveram ocupados em `fn`.
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.busy_seconds / (self.elapsed * self.workers)
+
+
+class _StageRunner:
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        stage: Stage,
+        in_queue: queue.Queue,
+        out_queue: queue.Queue,
+        downstream_consumers: int,
+    ) -> None:
+        self.pipeline = pipeline
+        self.stage = stage
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.downstream_consumers = downstream_consumers
+        self.metrics = StageMetrics(stage.name, stage.workers, in_queue.maxsize)
+        self.lock = threading.Lock()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._remaining = stage.consumers
+
+    def threads(self) -> List[threading.Thread]:
+        if self.stage.kind == "process":
+            self.pool = ProcessPoolExecutor(
+                self.stage.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        target = self._run_async if self.stage.kind == "async" else self._run
+        return [
+            threading.Thread(
+                target=self.pipeline._guard,
+                args=(target,),
+                name=f"pipeline-{self.stage.name}-{i}",
+                daemon=True,
+            )
+            for i in range(self.stage.consumers)
+        ]
+
+    def inputs(self) -> Iterator[Any]:
+        """
+        Itens (ou lotes) da fila de entrada, até o fim da fila.
+        """
+        size = self.stage.batch_size
+        get = self.pipeline._get
+        if not size:
+            while (item := get(self.in_queue)) is not _END:
+                yield item
+            return
+
+        batch: List[Any] = []
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0) if batch else None
+            item = get(self.in_queue, timeout)
+            if item is _END:
+                if batch:
+                    yield batch
+                return
+            if item is _EMPTY:
+                yield batch
+                batch = []
+                continue
+            if not batch:
+                deadline = time.monotonic() + self.stage.batch_timeout
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+    def _call(self, item: Any) -> Any:
+        if self.pool is not None:
+            return self.pool.submit(self.stage.fn, item).result()
+        return self.stage.fn(item)
+
+    def outputs(self, result: Any) -> Iterable[Any]:
+        if result is None:
+            return ()
+        return result if self.stage.flatten else (result,)
+
+    def record(self, item: Any, busy: float) -> None:
+        with self.lock:
+            if self.stage.batch_size:
+                self.metrics.received += len(item)
+                self.metrics.batches += 1
+            else:
+                self.metrics.received += 1
+            self.metrics.busy_seconds += busy
+            self.metrics.max_queue_depth = max(
+                self.metrics.max_queue_depth, self.in_queue.qsize()
+            )
+
+    def emit(self, value: Any) -> None:
+        blocked = self.pipeline._put(self.out_queue, value)
+        with self.lock:
+            self.metrics.emitted += 1
+            self.metrics.blocked_seconds += blocked
+
+    def _run(self) -> None:
+        for item in self.inputs():
+            start = time.perf_counter()
+            result = self._call(item)
+            self.record(item, time.perf_counter() - start)
+            for value in self.outputs(result):
+                self.emit(value)
+        self._finish()
+
+    def _run_async(self) -> None:
+        asyncio.run(self._run_loop())
+        self._finish()
+
+    async def _run_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        workers = self.stage.workers
+        inbox: asyncio.Queue = asyncio.Queue(workers)
+        outbox: asyncio.Queue = asyncio.Queue(workers)
+        # as filas entre estágios são bloqueantes: uma thread lê e outra escreve
+        with ThreadPoolExecutor(2, thread_name_prefix=f"{self.stage.name}-io") as io:
+
+            async def reader() -> None:
+                inputs = self.inputs()
+                while (
+                    item := await loop.run_in_executor(io, next, inputs, _END)
+                ) is not _END:
+                    await inbox.put(item)
+                for _ in range(workers):
+                    await inbox.put(_END)
+
+            async def worker() -> None:
+                while (item := await inbox.get()) is not _END:
+                    start = time.perf_counter()
+                    result = await self.stage.fn(item)
+                    self.record(item, time.perf_counter() - start)
+                    for value in self.outputs(result):
+                        await outbox.put(value)
+
+            async def writer() -> None:
+                while (value := await outbox.get()) is not _END:
+                    await loop.run_in_executor(io, self.emit, value)
+
+            async def produce() -> None:
+                await asyncio.gather(reader(), *(worker() for _ in range(workers)))
+                await outbox.put(_END)
+
+            try:
+                await asyncio.gather(produce(), writer())
+            except BaseException:
+                # libera a thread de leitura antes de aguardar o encerramento do executor
+                self.pipeline._aborted.set()
+                raise
+
+    def _finish(self) -> None:
+        with self.lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+            if last:
+                self.metrics.finished_at = time.monotonic()
+        if last:
+            for _ in range(self.downstream_consumers):
+                self.pipeline._put(self.out_queue, _END)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+
+class Pipeline:
+    """
+    Executa uma sequência de estágios sobre os itens de uma fonte.
+
+    :param stages: Os estágios, na ordem em que os itens passam por eles.
+    :param output_queue_size: Capacidade da fila com os resultados do último estágio,
+                              lidos por `results`.
+    """
+
+    def __init__(self, stages: Sequence[Stage], *, output_queue_size: int = 64) -> None:
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Stage names must be unique")
+        self.stages = list(stages)
+        self.output_queue_size = output_queue_size
+        self._runners: List[_StageRunner] = []
+        self._aborted = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def _get(self, q: queue.Queue, timeout: Optional[float] = None) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._aborted.is_set():
+                raise _Aborted()
+            wait = _POLL_INTERVAL
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return _EMPTY
+            try:
+                return q.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+    def _put(self, q: queue.Queue, item: Any) -> float:
+        """
+        Envia o item, esperando espaço na fila.
+
+        :return: O tempo de espera, em segundos.
+        """
+        try:
+            q.put_nowait(item)
+            return 0.0
+        except queue.Full:
+            pass
+        start = time.perf_counter()
+        while True:
+            if self._aborted.is_set():
+                raise _Aborted()
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return time.perf_counter() - start
+            except queue.Full:
+                continue
+
+    def _guard(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except _Aborted:
+            pass
+        except BaseException as e:
+            with self._error_lock:
+                if self._error is None:
+                    self._error = e
+            self._aborted.set()
+
+    def _feed(self, source: Iterable[Any], first: _StageRunner) -> None:
+        for item in source:
+            self._put(first.in_queue, item)
+        for _ in range(first.stage.consumers):
+            self._put(first.in_queue, _END)
+
+    def results(self, source: Iterable[Any]) -> Iterator[Any]:
+        """
+        Processa os itens da fonte e produz as saídas do último estágio, à medida que
+        ficam prontas e sem ordem garantida. A fonte é lida aos poucos, conforme há espaço
+        na fila do primeiro estágio.
+
+        :raises: A primeira exceção levantada por um estágio ou pela fonte; os demais
+                 estágios são interrompidos.
+        """
+        self._aborted.clear()
+        self._error = None
+        output: queue.Queue = queue.Queue(self.output_queue_size)
+        queues = [queue.Queue(stage.input_queue_size()) for stage in self.stages]
+        self._runners = [
+            _StageRunner(
+                self,
+                stage,
+                queues[i],
+                queues[i + 1] if i + 1 < len(queues) else output,
+                self.stages[i + 1].consumers if i + 1 < len(self.stages) else 1,
+            )
+            for i, stage in enumerate(self.stages)
+        ]
+
+        threads = [
+            threading.Thread(
+                target=self._guard,
+                args=(lambda: self._feed(source, self._runners[0]),),
+                name="pipeline-source",
+                daemon=True,
+            )
+        ]
+        now = time.monotonic()
+        for runner in self._runners:
+            runner.metrics.started_at = now
+            threads.extend(runner.threads())
+        for thread in threads:
+            thread.start()
+
+        try:
+            while (item := self._get(output)) is not _END:
+                yield item
+        except _Aborted:
+            pass
+        finally:
+            # consumidor encerrou antes do fim: interrompe os estágios
+            self._aborted.set()
+            for thread in threads:
+                thread.join()
+            for runner in self._runners:
+                runner.close()
+        if self._error is not None:
+            raise self._error
+
+    def run(self, source: Iterable[Any]) -> List[StageMetrics]:
+        """
+        Processa todos os itens da fonte, descartando as saídas do último estágio.
+
+        :return: As métricas finais de cada estágio.
+        """
+        for _ in self.results(source):
+            pass
+        return self.metrics()
+
+    def metrics(self) -> List[StageMetrics]:
+        """
+        Cópia das métricas atuais de cada estágio. Pode ser chamada de outra thread durante
+        a execução.
+        """
+        snapshot = []
+        for runner in self._runners:
+            with runner.lock:
+                metrics = replace(runner.metrics)
+            metrics.queue_depth = runner.in_queue.qsize()
+            snapshot.append(metrics)
+        return snapshot
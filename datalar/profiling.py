@@ -0,0 +1,350 @@
+"""
+Perfilamento de baixo custo para execuções reais das coletas.
+
+O `SamplingProfiler` roda em uma thread própria e, a cada `interval` segundos, lê a pilha
+de todas as outras threads (`sys._current_frames`), sem instrumentar as chamadas. Cada
+amostra é atribuída a uma etapa (`STAGE_RULES`): rede (cloudscraper, requests, httpx,
+ssl), decodificação de JSON, normalização das chaves, validação (pydantic), logging,
+descompressão ou espera (threads paradas em filas, locks e executores). Opcionalmente,
+o `tracemalloc` registra as alocações no início e no fim da execução.
+
+As amostras são de tempo de parede por thread: uma thread bloqueada lendo um socket
+conta como rede, o que é o desejado para saber onde uma coleta gasta o tempo. As
+amostras também são agrupadas pelo nome da thread, sem o sufixo numérico: as threads
+dos estágios de um `Pipeline` (`pipeline-parse-0`, `pipeline-parse-1`, ...) somam no
+mesmo grupo.
+
+Ao final, `Profile.write` grava em um diretório:
+
+- `stacks.collapsed`: pilhas no formato "collapsed" (`a;b;c 12`), para flame graphs
+  (`flamegraph.pl`, speedscope, etc.);
+- `report.txt` e `report.json`: tempo por etapa, funções com mais amostras próprias,
+  maiores alocadores e maior crescimento de memória.
+
+Exemplo::
+
+    with SamplingProfiler() as profiler:
+        crawl()
+    profiler.profile.write("profiles/run-1")
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# (etapa, fragmentos do caminho do arquivo, nomes de funções), na ordem de prioridade.
+# As pilhas são percorridas da função em execução para a raiz; o primeiro quadro que
+# corresponde a uma regra define a etapa da amostra.
+STAGE_RULES: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = (
+    ("normalize", (), ("_normalize_keys", "normalize_keys")),
+    ("json", ("/json/", "sdk/streaming.py"), ()),
+    ("decompression", ("/gzip.py", "brotli", "zstandard"), ()),
+    ("validation", ("/pydantic/", "/pydantic_core/", "sdk/parsing.py"), ()),
+    ("logging", ("/loguru/", "/logging/"), ()),
+    (
+        "network",
+        (
+            "/cloudscraper/",
+            "/requests/",
+            "/urllib3/",
+            "/httpx/",
+            "/httpcore/",
+            "/h2/",
+            "/ssl.py",
+            "/socket.py",
+            "/http/client.py",
+        ),
+        (),
+    ),
+)
+# arquivos em que a função em execução indica uma thread parada, esperando trabalho
+IDLE_FILES = ("/threading.py", "/queue.py", "/selectors.py", "/concurrent/futures/")
+
+Stack = Tuple[CodeType, ...]
+
+_THREAD_SUFFIX = re.compile(r"[-_ ]?\d+$")
+
+
+def classify(stack: Stack) -> str:
+    """
+    Etapa de uma pilha, ordenada da raiz para a função em execução.
+    """
+    if stack and any(part in stack[-1].co_filename for part in IDLE_FILES):
+        return "idle"
+    for code in reversed(stack):
+        for stage, paths, names in STAGE_RULES:
+            if code.co_name in names or any(p in code.co_filename for p in paths):
+                return stage
+    return "other"
+
+
+def frame_label(code: CodeType) -> str:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)})"
+
+
+def thread_group(name: str) -> str:
+    """
+    Nome da thread sem o sufixo numérico (`pipeline-fetch-3` → `pipeline-fetch`).
+    """
+    return _THREAD_SUFFIX.sub("", name) or name
+
+
+@dataclass
+class Profile:
+    """
+    Resultado de uma execução do `SamplingProfiler`.
+
+    :ivar samples: Número de amostras de cada par (grupo de threads, pilha), com a
+                   pilha ordenada da raiz para a função em execução.
+    :ivar memory_top: Maiores alocadores vivos no fim: (arquivo:linha, bytes, blocos).
+    :ivar memory_growth: Maior crescimento desde o início: (arquivo:linha, bytes, blocos).
+    """
+
+    interval: float
+    started_at: float = 0.0
+    duration: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+    memory_top: List[Tuple[str, int, int]] = field(default_factory=list)
+    memory_growth: List[Tuple[str, int, int]] = field(default_factory=list)
+    peak_memory: Optional[int] = None
+
+    @property
+    def total_samples(self) -> int:
+        return sum(self.samples.values())
+
+    def stages(self) -> Counter:
+        stages: Counter = Counter()
+        for (_, stack), count in self.samples.items():
+            stages[classify(stack)] += count
+        return stages
+
+    def threads(self) -> Dict[str, Dict[str, int]]:
+        """
+        Amostras de cada etapa, por grupo de threads.
+        """
+        threads: Dict[str, Counter] = {}
+        for (group, stack), count in self.samples.items():
+            threads.setdefault(group, Counter())[classify(stack)] += count
+        return {
+            group: dict(stages.most_common())
+            for group, stages in sorted(threads.items())
+        }
+
+    def busy_stages(self) -> Dict[str, float]:
+        """
+        Fração das amostras de cada etapa, sem contar as threads ociosas.
+        """
+        stages = self.stages()
+        stages.pop("idle", None)
+        total = sum(stages.values()) or 1
+        return {stage: count / total for stage, count in stages.most_common()}
+
+    def top_functions(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """
+        Funções com mais amostras próprias (em execução no momento da amostra).
+        """
+        own: Counter = Counter()
+        for (_, stack), count in self.samples.items():
+            if stack:
+                own[frame_label(stack[-1])] += count
+        return own.most_common(limit)
+
+    def collapsed(self) -> Iterator[str]:
+        """
+        Linhas no formato "collapsed" dos flame graphs, com o grupo de threads como
+        raiz de cada pilha.
+        """
+        lines: Counter = Counter()
+        for (group, stack), count in self.samples.items():
+            lines[";".join([group, *(frame_label(code) for code in stack)])] += count
+        for line, count in sorted(lines.items()):
+            yield f"{line} {count}"
+
+    def to_dict(self) -> dict:
+        return {
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "samples": self.total_samples,
+            "stages": dict(self.stages().most_common()),
+            "busy_stages": self.busy_stages(),
+            "threads": self.threads(),
+            "top_functions": self.top_functions(),
+            "memory_top": self.memory_top,
+            "memory_growth": self.memory_growth,
+            "peak_memory": self.peak_memory,
+        }
+
+    def summary(self) -> str:
+        lines = [
+            f"duration: {self.duration:.1f}s, samples: {self.total_samples} "
+            f"(every {self.interval * 1000:.0f} ms)",
+            "",
+            "stage            share (excluding idle threads)",
+        ]
+        lines += [
+            f"  {stage:<14} {share:6.1%}" for stage, share in self.busy_stages().items()
+        ]
+        lines += ["", "samples per thread group"]
+        for group, stages in self.threads().items():
+            detail = ", ".join(f"{stage} {count}" for stage, count in stages.items())
+            lines.append(f"  {group:<24} {detail}")
+        lines += ["", "top functions (own samples)"]
+        lines += [f"  {count:>7}  {name}" for name, count in self.top_functions()]
+        if self.memory_top:
+            lines += ["", f"peak traced memory: {self.peak_memory / 2**20:.1f} MiB"]
+            lines += ["", "top allocators (live at the end)"]
+            lines += [
+                f"  {size / 2**10:>10.1f} KiB {blocks:>8} blocks  {where}"
+                for where, size, blocks in self.memory_top
+            ]
+            lines += ["", "largest growth since the start"]
+            lines += [
+                f"  {size / 2**10:>+10.1f} KiB {blocks:>+8} blocks  {where}"
+                for where, size, blocks in self.memory_growth
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str) -> Dict[str, str]:
+        """
+        Grava os arquivos do perfil no diretório (criado se necessário).
+
+        :return: O caminho de cada arquivo gravado.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {
+            "collapsed": os.path.join(directory, "stacks.collapsed"),
+            "report": os.path.join(directory, "report.txt"),
+            "json": os.path.join(directory, "report.json"),
+        }
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
+        with open(paths["report"], "w", encoding="utf-8") as f:
+            f.write(self.summary())
+        with open(paths["json"], "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return paths
+
+
+class SamplingProfiler:
+    """
+    Amostrador de pilhas de todas as threads do processo.
+
+    :param interval: Intervalo entre amostras, em segundos.
+    :param trace_memory: Registra as alocações com o `tracemalloc`. Deixa as alocações
+                         mais lentas; desative para medir apenas a CPU.
+    :param memory_frames: Profundidade das pilhas guardadas pelo `tracemalloc`.
+    :param top: Número de alocadores listados.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        *,
+        trace_memory: bool = True,
+        memory_frames: int = 1,
+        top: int = 25,
+    ) -> None:
+        self.interval = interval
+        self.trace_memory = trace_memory
+        self.memory_frames = memory_frames
+        self.top = top
+        self.profile = Profile(interval)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracing = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_at = 0.0
+
+    def start(self) -> SamplingProfiler:
+        if self._thread is not None:
+            raise RuntimeError("Profiler already started")
+        self.profile = Profile(self.interval, started_at=time.time())
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.memory_frames)
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.take_snapshot()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._sample, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        if self._thread is None:
+            return self.profile
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.profile.duration = time.perf_counter() - self._started_at
+        if self.trace_memory:
+            self._snapshot_memory()
+        return self.profile
+
+    def _snapshot_memory(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            )
+        )
+        self.profile.peak_memory = tracemalloc.get_traced_memory()[1]
+        self.profile.memory_top = [
+            (str(stat.traceback), stat.size, stat.count)
+            for stat in snapshot.statistics("lineno")[: self.top]
+        ]
+        if self._baseline is not None:
+            self.profile.memory_growth = [
+                (str(stat.traceback), stat.size_diff, stat.count_diff)
+                for stat in snapshot.compare_to(self._baseline, "lineno")[: self.top]
+            ]
+        self._baseline = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        samples = self.profile.samples
+        groups: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if frames.keys() != groups.keys():
+                groups = {
+                    thread.ident: thread_group(thread.name)
+                    for thread in threading.enumerate()
+                    if thread.ident is not None
+                }
+            for thread_id, frame in frames.items():
+                if thread_id != own:
+                    group = groups.get(thread_id, "unknown")
+                    samples[group, _stack(frame)] += 1
+
+    def __enter__(self) -> SamplingProfiler:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def _stack(frame: Optional[FrameType]) -> Stack:
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    return tuple(codes)
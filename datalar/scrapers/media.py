@@ -0,0 +1,394 @@
+"""
+Download das mídias (fotos) das listagens, com deduplicação por conteúdo.
+
+As mesmas fotos aparecem em várias listagens e anunciantes, às vezes recomprimidas ou
+redimensionadas. O `MediaDownloader` baixa as URLs de `ListingSearchFields.media` ou de
+`PropertySchema.images` de forma assíncrona e:
+
+- limita as conexões simultâneas no total e por host;
+- retoma downloads interrompidos com requisições `Range`, a partir do arquivo parcial;
+- não baixa de novo URLs já armazenadas (índice de URLs em SQLite);
+- armazena os arquivos pelo sha256 do conteúdo, de modo que cópias idênticas ocupam um
+  único arquivo;
+- calcula o dHash (hash perceptual) das imagens e associa cópias visualmente iguais
+  (outra compressão ou tamanho) ao arquivo já armazenado. O dHash depende do Pillow
+  (`poetry install -E media`); sem ele, apenas cópias idênticas são deduplicadas.
+
+Exemplo::
+
+    store = MediaStore("media/")
+    results = MediaDownloader(store).download(property.images)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+# o dHash é dividido em 4 bandas de 16 bits: duas imagens a até 3 bits de distância
+# têm, necessariamente, uma banda igual
+_BANDS = 4
+_BAND_BITS = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    dhash TEXT,
+    band0 INTEGER,
+    band1 INTEGER,
+    band2 INTEGER,
+    band3 INTEGER
+);
+CREATE INDEX IF NOT EXISTS objects_band0 ON objects (band0);
+CREATE INDEX IF NOT EXISTS objects_band1 ON objects (band1);
+CREATE INDEX IF NOT EXISTS objects_band2 ON objects (band2);
+CREATE INDEX IF NOT EXISTS objects_band3 ON objects (band3);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+MediaStatus = Literal["stored", "duplicate", "cached", "failed"]
+
+
+def dhash(data: bytes, hash_size: int = 8) -> Optional[int]:
+    """
+    Calcula o dHash de uma imagem: compara o brilho de pixels vizinhos da imagem reduzida
+    a `hash_size + 1` x `hash_size` pixels em tons de cinza.
+
+    :return: Um inteiro de `hash_size ** 2` bits, ou `None` se o Pillow não estiver
+             instalado ou se o conteúdo não for uma imagem.
+    """
+    try:
+        from PIL import Image, UnidentifiedImageError
+    except ImportError:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            pixels = (
+                image.convert("L")
+                .resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+                .tobytes()
+            )
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = value << 1 | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+@dataclass(frozen=True)
+class MediaResult:
+    """
+    :ivar status: `stored` (arquivo novo), `duplicate` (conteúdo igual ou visualmente
+                  igual a um arquivo já armazenado), `cached` (URL já baixada antes) ou
+                  `failed`.
+    """
+
+    url: str
+    status: MediaStatus
+    sha256: Optional[str] = None
+    path: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class MediaStats:
+    cached: int = 0
+    stored: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    bytes_downloaded: int = 0
+
+
+class MediaStore:
+    """
+    Armazenamento das mídias endereçado pelo conteúdo, com índice de URLs em SQLite.
+
+    :param root: Diretório do armazenamento.
+    :param max_distance: Distância de Hamming máxima entre dHashes para considerar duas
+                         imagens iguais. Até 3, todas as cópias são encontradas; acima
+                         disso, apenas as que compartilham uma banda do hash.
+    """
+
+    def __init__(self, root: str, *, max_distance: int = 3) -> None:
+        self.root = root
+        self.max_distance = max_distance
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "partial"), exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(root, "media.db"), timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def partial_path(self, url: str) -> str:
+        """
+        Caminho do download em andamento da URL, mantido entre execuções para retomada.
+        """
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, "partial", f"{name}.part")
+
+    def lookup(self, url: str) -> Optional[str]:
+        """
+        Retorna o sha256 do arquivo da URL, se ela já foi baixada.
+        """
+        row = self._conn.execute(
+            "SELECT sha256 FROM urls WHERE url = ?", (url,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def similar(self, value: int) -> Optional[str]:
+        """
+        Retorna o sha256 de um arquivo armazenado com dHash a até `max_distance` bits.
+        """
+        bands = _bands(value)
+        rows = self._conn.execute(
+            "SELECT sha256, dhash FROM objects WHERE "
+            + " OR ".join(f"band{i} = ?" for i in range(_BANDS)),
+            bands,
+        )
+        best: Optional[Tuple[int, str]] = None
+        for sha256, stored in rows:
+            distance = hamming(value, int(stored, 16))
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, sha256)
+        return best[1] if best else None
+
+    def add(
+        self, url: str, path: str, sha256: str, size: int, value: Optional[int]
+    ) -> Tuple[str, bool]:
+        """
+        Move o arquivo baixado para o armazenamento e registra a URL.
+
+        :param path: O arquivo baixado; é movido ou removido.
+        :param value: O dHash do arquivo, se for uma imagem.
+        :return: O sha256 do arquivo armazenado associado à URL e se ele já existia.
+        """
+        existing = self._conn.execute(
+            "SELECT 1 FROM objects WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if existing is None and value is not None:
+            similar = self.similar(value)
+            if similar is not None:
+                sha256, existing = similar, True
+
+        if existing:
+            os.remove(path)
+        else:
+            target = self.object_path(sha256)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+            bands = _bands(value) if value is not None else (None,) * _BANDS
+            self._conn.execute(
+                "INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sha256, size, f"{value:016x}" if value is not None else None, *bands),
+            )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO urls VALUES (?, ?, ?)", (url, sha256, time.time())
+        )
+        return sha256, bool(existing)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _bands(value: int) -> Tuple[int, ...]:
+    mask = (1 << _BAND_BITS) - 1
+    return tuple((value >> (i * _BAND_BITS)) & mask for i in range(_BANDS))
+
+
+class _ResumeFailed(Exception):
+    """
+    O servidor não aceitou continuar o download do ponto em que parou.
+    """
+
+
+class MediaDownloader:
+    """
+    Baixa mídias para um `MediaStore` de forma assíncrona.
+
+    :param store: Onde as mídias são armazenadas.
+    :param max_connections: Número máximo de downloads simultâneos.
+    :param max_per_host: Número máximo de downloads simultâneos por host.
+    :param retries: Tentativas adicionais em erros de rede, 408, 429 e 5xx. Cada nova
+                    tentativa continua do ponto em que a anterior parou.
+    :param timeout: Timeout das requisições, em segundos.
+    :param transport: Transporte do httpx (por exemplo, para usar um proxy ou em testes).
+    """
+
+    def __init__(
+        self,
+        store: MediaStore,
+        *,
+        max_connections: int = 32,
+        max_per_host: int = 4,
+        retries: int = 3,
+        timeout: float = 30.0,
+        headers: Optional[Dict[str, str]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.store = store
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.transport = transport
+        self.stats = MediaStats()
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def download(self, urls: Iterable[str]) -> List[MediaResult]:
+        """
+        Versão síncrona de `fetch_many`.
+        """
+        return asyncio.run(self.fetch_many(urls))
+
+    async def fetch_many(self, urls: Iterable[str]) -> List[MediaResult]:
+        """
+        Baixa as URLs. URLs repetidas são baixadas uma única vez.
+
+        :return: Um resultado por URL, na ordem recebida.
+        """
+        urls = list(urls)
+        # os semáforos pertencem ao loop de eventos em execução
+        self._hosts = {}
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        async with httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            limits=limits,
+            follow_redirects=True,
+            transport=self.transport,
+        ) as client:
+            unique = list(dict.fromkeys(urls))
+            results = await asyncio.gather(*(self.fetch(client, url) for url in unique))
+        by_url = dict(zip(unique, results))
+        return [by_url[url] for url in urls]
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        return semaphore
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> MediaResult:
+        """
+        Baixa uma URL, a menos que ela já esteja armazenada.
+        """
+        sha256 = self.store.lookup(url)
+        if sha256 is not None:
+            self.stats.cached += 1
+            return MediaResult(url, "cached", sha256, self.store.object_path(sha256))
+
+        # uma URL malformada ou um arquivo ilegível falha só a própria URL, sem
+        # derrubar o `asyncio.gather` do lote inteiro
+        partial = self.store.partial_path(url)
+        try:
+            limit = self._host_limit(url)
+        except ValueError as e:
+            return self._failed(url, f"{type(e).__name__}: {e}")
+        async with limit:
+            error = await self._download_with_retries(client, url, partial)
+        if error is not None:
+            return self._failed(url, error)
+
+        try:
+            digest, size, value = await asyncio.to_thread(_digest, partial)
+        except (OSError, ValueError) as e:
+            return self._failed(url, f"{type(e).__name__}: {e}")
+        sha256, duplicate = self.store.add(url, partial, digest, size, value)
+        if duplicate:
+            self.stats.duplicates += 1
+        else:
+            self.stats.stored += 1
+        return MediaResult(
+            url,
+            "duplicate" if duplicate else "stored",
+            sha256,
+            self.store.object_path(sha256),
+        )
+
+    def _failed(self, url: str, error: str) -> MediaResult:
+        self.stats.failed += 1
+        return MediaResult(url, "failed", error=error)
+
+    async def _download_with_retries(
+        self, client: httpx.AsyncClient, url: str, partial: str
+    ) -> Optional[str]:
+        """
+        :return: A descrição do erro, se o download falhou em todas as tentativas.
+        """
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(min(2**attempt * 0.1, 5.0))
+            try:
+                await self._download(client, url, partial)
+                return None
+            except httpx.HTTPStatusError as e:
+                error = f"HTTP {e.response.status_code}"
+                status = e.response.status_code
+                if status < 500 and status not in (408, 429):
+                    return error
+            except httpx.InvalidURL as e:
+                return f"{type(e).__name__}: {e}"
+            except (httpx.TransportError, _ResumeFailed) as e:
+                error = f"{type(e).__name__}: {e}"
+        return error
+
+    async def _download(
+        self, client: httpx.AsyncClient, url: str, partial: str
+    ) -> None:
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 416 or (
+                response.status_code == 206
+                and not response.headers.get("Content-Range", "").startswith(
+                    f"bytes {offset}-"
+                )
+            ):
+                os.remove(partial)
+                raise _ResumeFailed(f"cannot resume {url} at byte {offset}")
+            response.raise_for_status()
+            # servidores que ignoram o Range respondem 200 com o arquivo inteiro
+            mode = "ab" if response.status_code == 206 else "wb"
+            with open(partial, mode) as f:
+                # grava os dados conforme chegam, para retomar de onde a conexão caiu
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+                    self.stats.bytes_downloaded += len(chunk)
+
+
+def _digest(path: str) -> Tuple[str, int, Optional[int]]:
+    with open(path, "rb") as f:
+        data = f.read()
+    return hashlib.sha256(data).hexdigest(), len(data), dhash(data)
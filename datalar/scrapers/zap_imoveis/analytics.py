@@ -0,0 +1,361 @@
+"""
+Estatísticas de mercado vetorizadas sobre listagens coletadas do Zap Imóveis.
+
+As listagens são carregadas uma única vez em arrays colunares do NumPy (uma linha por
+informação de preço de cada listagem) e todos os agregados são calculados sobre esses
+arrays, sem laços em Python por linha.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Literal, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+
+GroupKey = Literal["state", "city", "neighborhood", "business_type"]
+
+BUSINESS_TYPES: Tuple[str, ...] = ("RENTAL", "SALE")
+
+METRICS = (
+    "price",
+    "monthly_condo_fee",
+    "yearly_iptu",
+    "usable_area",
+    "bedrooms",
+    "price_per_m2",
+)
+
+
+class _Categories:
+    """
+    Dicionário incremental que associa rótulos a códigos inteiros.
+    """
+
+    def __init__(self) -> None:
+        self.codes: Dict[Any, int] = {}
+        self.labels: List[Any] = []
+
+    def code(self, label: Any) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+@dataclass
+class GroupStats:
+    """
+    Resultado de uma agregação agrupada.
+    Cada posição dos arrays corresponde ao grupo de mesmo índice em `keys`.
+    """
+
+    by: Tuple[str, ...]
+    metric: str
+    keys: List[Tuple[Any, ...]]
+    count: np.ndarray
+    mean: np.ndarray
+    percentiles: Dict[float, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def median(self) -> np.ndarray:
+        if 50 not in self.percentiles:
+            raise KeyError("Median (50th percentile) was not computed for this group")
+        return self.percentiles[50]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Converte o resultado em uma lista de dicionários, útil para relatórios.
+        """
+        records = []
+        for i, key in enumerate(self.keys):
+            record: Dict[str, Any] = dict(zip(self.by, key))
+            record["count"] = int(self.count[i])
+            record["mean"] = float(self.mean[i])
+            for q, values in self.percentiles.items():
+                record[f"p{q:g}"] = float(values[i])
+            records.append(record)
+        return records
+
+
+class ListingFrame:
+    """
+    Representação colunar de um conjunto de listagens.
+
+    Cada linha corresponde a um par (listagem, informação de preço), já que uma mesma
+    listagem pode ser anunciada para venda e aluguel simultaneamente.
+    Valores ausentes são representados como `NaN`.
+    """
+
+    def __init__(
+        self,
+        *,
+        listing_ids: np.ndarray,
+        price: np.ndarray,
+        monthly_condo_fee: np.ndarray,
+        yearly_iptu: np.ndarray,
+        usable_area: np.ndarray,
+        bedrooms: np.ndarray,
+        business_type: np.ndarray,
+        state: np.ndarray,
+        city: np.ndarray,
+        neighborhood: np.ndarray,
+        labels: Dict[str, List[Any]],
+    ) -> None:
+        self.listing_ids = listing_ids
+        self.price = price
+        self.monthly_condo_fee = monthly_condo_fee
+        self.yearly_iptu = yearly_iptu
+        self.usable_area = usable_area
+        self.bedrooms = bedrooms
+        self.business_type = business_type
+        self.state = state
+        self.city = city
+        self.neighborhood = neighborhood
+        self.labels = labels
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @property
+    def price_per_m2(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.usable_area > 0, self.price / self.usable_area, np.nan)
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[ListingData]) -> ListingFrame:
+        """
+        Carrega objetos `ListingData` já validados.
+
+        :param listings: Listagens a serem carregadas.
+        :return: Um `ListingFrame` com uma linha por informação de preço.
+        """
+        rows = (
+            (
+                listing.id,
+                listing.usable_areas,
+                listing.bedrooms,
+                listing.address.state,
+                listing.address.city,
+                listing.address.neighborhood,
+                [
+                    (
+                        p.price,
+                        p.monthly_condo_fee,
+                        p.yearly_iptu,
+                        p.business_type,
+                    )
+                    for p in listing.pricing_infos
+                ],
+            )
+            for listing in listings
+        )
+        return cls._from_rows(rows)
+
+    @classmethod
+    def from_raw(cls, listings: Iterable[Dict[str, Any]]) -> ListingFrame:
+        """
+        Carrega listagens no formato bruto da API (chaves em camelCase), sem passar
+        pela validação do pydantic. É o caminho recomendado para relatórios sobre
+        grandes volumes de dados armazenados.
+
+        :param listings: Dicionários no formato de `search.result.listings[].listing`.
+        :return: Um `ListingFrame` com uma linha por informação de preço.
+        """
+        rows = (
+            (
+                listing.get("id"),
+                listing.get("usableAreas") or (),
+                listing.get("bedrooms") or (),
+                (listing.get("address") or {}).get("state"),
+                (listing.get("address") or {}).get("city"),
+                (listing.get("address") or {}).get("neighborhood"),
+                [
+                    (
+                        p.get("price"),
+                        p.get("monthlyCondoFee"),
+                        p.get("yearlyIptu"),
+                        p.get("businessType"),
+                    )
+                    for p in listing.get("pricingInfos") or ()
+                ],
+            )
+            for listing in listings
+        )
+        return cls._from_rows(rows)
+
+    @classmethod
+    def _from_rows(cls, rows: Iterable[tuple]) -> ListingFrame:
+        states, cities, neighborhoods = _Categories(), _Categories(), _Categories()
+        business_types = _Categories()
+        for business_type in BUSINESS_TYPES:
+            business_types.code(business_type)
+
+        ids: List[Any] = []
+        numeric: List[Tuple[Any, ...]] = []
+        codes: List[Tuple[int, int, int, int]] = []
+        for listing_id, areas, bedrooms, state, city, neighborhood, pricing in rows:
+            state_code = states.code(state)
+            city_code = cities.code((state, city))
+            neighborhood_code = neighborhoods.code((state, city, neighborhood))
+            area = areas[0] if areas else None
+            rooms = bedrooms[0] if bedrooms else None
+            for price, condo_fee, iptu, business_type in pricing:
+                ids.append(listing_id)
+                numeric.append((price, condo_fee, iptu, area, rooms))
+                codes.append(
+                    (
+                        business_types.code(business_type),
+                        state_code,
+                        city_code,
+                        neighborhood_code,
+                    )
+                )
+
+        values = np.array(numeric, dtype=np.float64).reshape(-1, 5)
+        code_arr = np.array(codes, dtype=np.int32).reshape(-1, 4)
+        return cls(
+            listing_ids=np.array(ids, dtype=object),
+            price=values[:, 0],
+            monthly_condo_fee=values[:, 1],
+            yearly_iptu=values[:, 2],
+            usable_area=values[:, 3],
+            bedrooms=values[:, 4],
+            business_type=code_arr[:, 0],
+            state=code_arr[:, 1],
+            city=code_arr[:, 2],
+            neighborhood=code_arr[:, 3],
+            labels={
+                "business_type": business_types.labels,
+                "state": states.labels,
+                "city": cities.labels,
+                "neighborhood": neighborhoods.labels,
+            },
+        )
+
+    def _metric(self, metric: str) -> np.ndarray:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        return getattr(self, metric)
+
+    def _mask(self, business_type: str | None) -> np.ndarray:
+        if business_type is None:
+            return np.ones(len(self), dtype=bool)
+        if business_type not in self.labels["business_type"]:
+            raise ValueError(f"Unknown business type {business_type!r}")
+        return self.business_type == self.labels["business_type"].index(business_type)
+
+    def group_stats(
+        self,
+        by: Sequence[GroupKey] = ("state", "city", "neighborhood", "business_type"),
+        metric: str = "price_per_m2",
+        percentiles: Sequence[float] = (25, 50, 75),
+        business_type: Literal["RENTAL", "SALE"] | None = None,
+    ) -> GroupStats:
+        """
+        Calcula contagem, média e percentis de uma métrica agrupada pelas chaves informadas.
+        Linhas com a métrica ausente (`NaN`) são ignoradas.
+
+        :param by: Dimensões de agrupamento. "city" e "neighborhood" já consideram as dimensões
+                   superiores (um bairro é identificado por estado, cidade e bairro).
+        :param metric: Métrica a ser agregada. Veja `METRICS`.
+        :param percentiles: Percentis a serem calculados (0 a 100), com interpolação linear.
+        :param business_type: Se informado, considera apenas linhas desse tipo de negócio.
+        :return: Um `GroupStats` com um item por grupo não vazio.
+        """
+        by = tuple(by)
+        if not by:
+            raise ValueError("At least one group key must be provided")
+        for key in by:
+            if key not in self.labels:
+                raise ValueError(f"Unknown group key {key!r}")
+
+        values = self._metric(metric)
+        mask = self._mask(business_type) & ~np.isnan(values)
+        values = values[mask]
+        dims = [getattr(self, key)[mask] for key in by]
+        shape = tuple(len(self.labels[key]) for key in by)
+
+        if values.size == 0:
+            empty = np.empty(0)
+            return GroupStats(
+                by=by,
+                metric=metric,
+                keys=[],
+                count=np.empty(0, dtype=np.int64),
+                mean=empty,
+                percentiles={q: empty for q in percentiles},
+            )
+
+        composite = np.ravel_multi_index(dims, shape)
+        order = np.lexsort((values, composite))
+        composite, values = composite[order], values[order]
+
+        starts = np.flatnonzero(np.r_[True, composite[1:] != composite[:-1]])
+        counts = np.diff(np.r_[starts, composite.size])
+        sums = np.add.reduceat(values, starts)
+
+        result: Dict[float, np.ndarray] = {}
+        for q in percentiles:
+            position = starts + (counts - 1) * (q / 100.0)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            fraction = position - low
+            result[q] = values[low] + (values[high] - values[low]) * fraction
+
+        group_codes = np.unravel_index(composite[starts], shape)
+        keys = [
+            tuple(
+                _display_label(key, self.labels[key][code], by)
+                for key, code in zip(by, codes)
+            )
+            for codes in zip(*(c.tolist() for c in group_codes))
+        ]
+        return GroupStats(
+            by=by,
+            metric=metric,
+            keys=keys,
+            count=counts,
+            mean=sums / counts,
+            percentiles=result,
+        )
+
+    def rental_yield(
+        self, by: Sequence[GroupKey] = ("state", "city", "neighborhood")
+    ) -> Dict[Tuple[Any, ...], float]:
+        """
+        Estima o rendimento bruto anual de aluguel por grupo, como a razão entre a mediana
+        do aluguel mensal por m² (multiplicada por 12) e a mediana do preço de venda por m².
+
+        :param by: Dimensões de agrupamento (não pode incluir "business_type").
+        :return: Um dicionário grupo -> rendimento (0.05 equivale a 5% ao ano). Grupos sem
+                 anúncios de venda e de aluguel são omitidos.
+        """
+        if "business_type" in by:
+            raise ValueError("Rental yield cannot be grouped by business_type")
+
+        rent = self.group_stats(by, percentiles=(50,), business_type="RENTAL")
+        sale = self.group_stats(by, percentiles=(50,), business_type="SALE")
+        sale_median = dict(zip(sale.keys, sale.median.tolist()))
+        return {
+            key: 12 * rent_median / sale_median[key]
+            for key, rent_median in zip(rent.keys, rent.median.tolist())
+            if sale_median.get(key)
+        }
+
+
+_PARENTS: Dict[str, Tuple[str, ...]] = {
+    "city": ("state",),
+    "neighborhood": ("state", "city"),
+}
+
+
+def _display_label(key: str, label: Any, by: Tuple[str, ...]) -> Any:
+    # cidades e bairros são identificados pela tupla completa (estado, cidade, bairro);
+    # quando os níveis superiores também fazem parte do agrupamento, basta o último nível
+    if isinstance(label, tuple) and all(p in by for p in _PARENTS[key]):
+        return label[-1]
+    return label
@@ -0,0 +1,409 @@
+"""
+Feed de alterações de listagens entre coletas (change data capture).
+
+A SDK retorna apenas fotografias do estado das listagens. O `ChangeFeed` compara a coleta
+atual com o estado armazenado da coleta anterior, pelo `id`, e emite eventos tipados:
+
+- `NEW`: listagem que não existia no estado anterior;
+- `PRICE_CHANGED`: algum preço de `pricing_infos` mudou (ou um tipo de negócio entrou/saiu);
+- `CHANGED`: `status` ou `updated_at` mudou, com os mesmos preços;
+- `REMOVED`: listagem do estado anterior ausente da coleta (apenas em coletas completas).
+
+Para funcionar com milhões de listagens, a comparação é feita por partições: a coleta é
+distribuída em arquivos por hash do `id`, e cada partição é ordenada e comparada com a
+partição armazenada (já ordenada) por intercalação. Apenas uma partição fica em memória
+por vez. O número de partições é gravado com cada geração do estado (`META.json`): se
+mudar entre coletas, o estado anterior é redistribuído antes da comparação. Os eventos
+vão para um log local somente de acréscimo (`ChangeLog`) e para os assinantes
+registrados.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+
+Prices = Tuple[Tuple[str, int], ...]
+
+
+class ChangeType(str, Enum):
+    NEW = "NEW"
+    PRICE_CHANGED = "PRICE_CHANGED"
+    CHANGED = "CHANGED"
+    REMOVED = "REMOVED"
+
+
+@dataclass(frozen=True)
+class ListingState:
+    """
+    Campos de uma listagem acompanhados pelo feed.
+
+    :ivar prices: Pares (tipo de negócio, preço), ordenados.
+    :ivar updated_at: Data da última atualização, em ISO 8601.
+    """
+
+    id: str
+    prices: Prices
+    status: str
+    updated_at: str
+
+    @classmethod
+    def from_listing(cls, listing: ListingData) -> ListingState:
+        prices = tuple(
+            sorted((p.business_type, p.price) for p in listing.pricing_infos)
+        )
+        return cls(listing.id, prices, listing.status, listing.updated_at.isoformat())
+
+    def to_row(self) -> list:
+        return [self.id, [list(p) for p in self.prices], self.status, self.updated_at]
+
+    @classmethod
+    def from_row(cls, row: list) -> ListingState:
+        return cls(row[0], tuple((b, p) for b, p in row[1]), row[2], row[3])
+
+    def price(self, business_type: str) -> Optional[int]:
+        return next((p for b, p in self.prices if b == business_type), None)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    Uma alteração de listagem. `old` é `None` em `NEW` e `new` é `None` em `REMOVED`.
+    """
+
+    type: ChangeType
+    listing_id: str
+    old: Optional[ListingState]
+    new: Optional[ListingState]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type.value,
+            "id": self.listing_id,
+            "old": self.old.to_row() if self.old else None,
+            "new": self.new.to_row() if self.new else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> ChangeEvent:
+        return cls(
+            ChangeType(data["type"]),
+            data["id"],
+            ListingState.from_row(data["old"]) if data["old"] else None,
+            ListingState.from_row(data["new"]) if data["new"] else None,
+        )
+
+
+def compare(
+    old: Optional[ListingState], new: Optional[ListingState]
+) -> Optional[ChangeEvent]:
+    """
+    Compara dois estados da mesma listagem.
+
+    :return: O evento correspondente, ou `None` se nada mudou.
+    """
+    if old is None and new is None:
+        return None
+    if old is None:
+        return ChangeEvent(ChangeType.NEW, new.id, None, new)
+    if new is None:
+        return ChangeEvent(ChangeType.REMOVED, old.id, old, None)
+    if old.prices != new.prices:
+        return ChangeEvent(ChangeType.PRICE_CHANGED, new.id, old, new)
+    if old.status != new.status or old.updated_at != new.updated_at:
+        return ChangeEvent(ChangeType.CHANGED, new.id, old, new)
+    return None
+
+
+class ChangeLog:
+    """
+    Log local de eventos, somente de acréscimo, em JSON Lines.
+
+    :param path: Caminho do arquivo de log.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def append(self, events: Iterable[ChangeEvent]) -> int:
+        """
+        Acrescenta os eventos ao log e força a gravação em disco.
+
+        :return: O deslocamento (em bytes) do fim do log.
+        """
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def read(self, offset: int = 0) -> Iterator[Tuple[int, ChangeEvent]]:
+        """
+        Lê os eventos a partir do deslocamento informado.
+
+        :return: Pares (deslocamento após o evento, evento); o deslocamento pode ser
+                 guardado pelo consumidor para retomar a leitura.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                yield offset, ChangeEvent.from_dict(json.loads(line))
+
+
+@dataclass
+class ChangeSummary:
+    listings: int = 0
+    counts: Dict[ChangeType, int] = field(
+        default_factory=lambda: {change: 0 for change in ChangeType}
+    )
+
+
+class ChangeFeed:
+    """
+    Compara coletas sucessivas e emite as alterações.
+
+    :param state_dir: Diretório onde o estado da última coleta é mantido.
+    :param partitions: Número de partições por hash do `id`. Cada partição precisa caber
+                       em memória: use mais partições para inventários maiores. Pode
+                       mudar entre coletas: o estado anterior é redistribuído.
+    :param log: Log onde os eventos são gravados, se houver.
+
+    Exemplo::
+
+        feed = ChangeFeed("state/", log=ChangeLog("changes.jsonl"))
+        feed.subscribe(lambda event: print(event.type, event.listing_id))
+        feed.diff(crawler.crawl())
+    """
+
+    def __init__(
+        self, state_dir: str, *, partitions: int = 64, log: Optional[ChangeLog] = None
+    ) -> None:
+        if partitions < 1:
+            raise ValueError("partitions must be greater than 0")
+        self.state_dir = state_dir
+        self.partitions = partitions
+        self.log = log
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        os.makedirs(state_dir, exist_ok=True)
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        """
+        Registra uma função chamada para cada evento, depois de gravado no log.
+        """
+        self._subscribers.append(callback)
+
+    def partition(self, listing_id: str) -> int:
+        # crc32 é estável entre processos (ao contrário de `hash`)
+        return zlib.crc32(listing_id.encode()) % self.partitions
+
+    def _current_generation(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.state_dir, "CURRENT"), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _partition_path(self, generation: str, index: int) -> str:
+        return os.path.join(self.state_dir, generation, f"part-{index:04d}.jsonl")
+
+    def _generation_partitions(self, generation: str) -> int:
+        """
+        Número de partições com que a geração foi gravada.
+        """
+        path = os.path.join(self.state_dir, generation, "META.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)["partitions"]
+        except FileNotFoundError:
+            # gerações gravadas antes do `META.json`: as partições são as do disco
+            directory = os.path.join(self.state_dir, generation)
+            return len(
+                [name for name in os.listdir(directory) if name.startswith("part-")]
+            )
+
+    def _write_meta(self, generation: str) -> None:
+        path = os.path.join(self.state_dir, generation, "META.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"partitions": self.partitions}, f)
+
+    def stored(self) -> Iterator[ListingState]:
+        """
+        Itera sobre o estado armazenado, partição a partição.
+        """
+        generation = self._current_generation()
+        if generation is None:
+            return
+        for index in range(self._generation_partitions(generation)):
+            yield from self._read_partition(self._partition_path(generation, index))
+
+    @staticmethod
+    def _read_partition(path: str) -> Iterator[ListingState]:
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                yield ListingState.from_row(json.loads(line))
+
+    def _spill(self, listings: Iterable[Any], spill_dir: str, prefix: str = "") -> int:
+        """
+        Distribui os estados da coleta em arquivos por partição.
+        """
+        files: Dict[int, IO[str]] = {}
+        count = 0
+        try:
+            for listing in listings:
+                state = (
+                    listing
+                    if isinstance(listing, ListingState)
+                    else ListingState.from_listing(listing)
+                )
+                index = self.partition(state.id)
+                f = files.get(index)
+                if f is None:
+                    path = os.path.join(spill_dir, f"{prefix}{index:04d}.jsonl")
+                    f = files[index] = open(path, "w", encoding="utf-8")
+                f.write(json.dumps(state.to_row(), ensure_ascii=False) + "\n")
+                count += 1
+        finally:
+            for f in files.values():
+                f.close()
+        return count
+
+    def _merge(
+        self, old: Iterator[ListingState], new: List[ListingState], complete: bool
+    ) -> Iterator[Tuple[Optional[ChangeEvent], Optional[ListingState]]]:
+        """
+        Intercala o estado armazenado (ordenado) com a coleta da partição (ordenada).
+
+        :return: Pares (evento ou `None`, estado a manter ou `None`).
+        """
+        old_state = next(old, None)
+        for new_state in new:
+            while old_state is not None and old_state.id < new_state.id:
+                if complete:
+                    yield compare(old_state, None), None
+                else:
+                    yield None, old_state
+                old_state = next(old, None)
+            if old_state is not None and old_state.id == new_state.id:
+                yield compare(old_state, new_state), new_state
+                old_state = next(old, None)
+            else:
+                yield compare(None, new_state), new_state
+        while old_state is not None:
+            yield (compare(old_state, None), None) if complete else (None, old_state)
+            old_state = next(old, None)
+
+    def diff(self, listings: Iterable[Any], *, complete: bool = True) -> ChangeSummary:
+        """
+        Compara a coleta com o estado armazenado, emite os eventos e substitui o estado.
+
+        O novo estado só é gravado depois que todos os eventos foram emitidos; se um
+        assinante falhar, o estado anterior é mantido e a comparação pode ser repetida.
+        Nesse caso os eventos das partições já processadas são emitidos de novo (entrega
+        pelo menos uma vez).
+
+        :param listings: As listagens da coleta (`ListingData` ou `ListingState`).
+        :param complete: Se a coleta cobre todo o inventário acompanhado. Coletas parciais
+                         não geram `REMOVED` e preservam o estado das listagens ausentes.
+        :return: O total de listagens e de eventos por tipo.
+        """
+        summary = ChangeSummary()
+        old_generation = self._current_generation()
+        generation = (
+            f"gen-{int(old_generation.split('-')[1]) + 1 if old_generation else 1}"
+        )
+        generation_dir = os.path.join(self.state_dir, generation)
+        shutil.rmtree(generation_dir, ignore_errors=True)
+        os.makedirs(generation_dir)
+
+        self._write_meta(generation)
+
+        with tempfile.TemporaryDirectory(dir=self.state_dir) as spill_dir:
+            repartition = (
+                old_generation is not None
+                and self._generation_partitions(old_generation) != self.partitions
+            )
+            if repartition:
+                # o estado anterior foi gravado com outro número de partições
+                self._spill(self.stored(), spill_dir, prefix="old-")
+            summary.listings = self._spill(listings, spill_dir)
+            for index in range(self.partitions):
+                spill = os.path.join(spill_dir, f"{index:04d}.jsonl")
+                # a última ocorrência de um id repetido na coleta prevalece
+                current = {state.id: state for state in self._read_partition(spill)}
+                new = sorted(current.values(), key=lambda state: state.id)
+                if repartition:
+                    old_spill = os.path.join(spill_dir, f"old-{index:04d}.jsonl")
+                    old = iter(
+                        sorted(
+                            self._read_partition(old_spill),
+                            key=lambda state: state.id,
+                        )
+                    )
+                elif old_generation:
+                    old = self._read_partition(
+                        self._partition_path(old_generation, index)
+                    )
+                else:
+                    old = iter(())
+                events = []
+                with open(
+                    self._partition_path(generation, index), "w", encoding="utf-8"
+                ) as out:
+                    for event, keep in self._merge(old, new, complete):
+                        if event is not None:
+                            events.append(event)
+                        if keep is not None:
+                            out.write(
+                                json.dumps(keep.to_row(), ensure_ascii=False) + "\n"
+                            )
+                self._emit(events, summary)
+
+        self._commit(generation, old_generation)
+        return summary
+
+    def _emit(self, events: List[ChangeEvent], summary: ChangeSummary) -> None:
+        if not events:
+            return
+        if self.log is not None:
+            self.log.append(events)
+        for event in events:
+            summary.counts[event.type] += 1
+            for callback in self._subscribers:
+                callback(event)
+
+    def _commit(self, generation: str, old_generation: Optional[str]) -> None:
+        current = os.path.join(self.state_dir, "CURRENT")
+        with open(current + ".tmp", "w", encoding="utf-8") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(current + ".tmp", current)
+        if old_generation:
+            shutil.rmtree(
+                os.path.join(self.state_dir, old_generation), ignore_errors=True
+            )
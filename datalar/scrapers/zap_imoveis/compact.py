@@ -0,0 +1,329 @@
+"""
+Representação compacta e somente leitura de listagens do Zap Imóveis.
+
+Objetos `ListingData` do pydantic ocupam alguns KB cada (dicionários de instância,
+modelos aninhados e listas). Para análises que mantêm milhões de listagens em memória,
+este módulo converte as listagens em dataclasses com `__slots__`, troca listas por
+tuplas e compartilha uma única instância de cada valor repetido (cidades, bairros,
+enums, comodidades, etc.).
+"""
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from datalar.scrapers.zap_imoveis.sdk.schemas import (
+    ListingData,
+    ListingDataAddress,
+    ListingDataAddressPoint,
+    ListingDataPricingInfos,
+    ListingDataRentalInfos,
+    PropertyDevelopersData,
+)
+
+
+class Interner:
+    """
+    Reaproveita instâncias de valores imutáveis repetidos.
+    Strings são internadas com `sys.intern`; tuplas e outros valores usam uma tabela própria.
+    """
+
+    def __init__(self) -> None:
+        self._values: Dict[Hashable, Hashable] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __call__(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if type(value) is str:
+            return sys.intern(value)
+        return self._values.setdefault(value, value)
+
+    def strings(self, values: Iterable[str]) -> Tuple[str, ...]:
+        return self(tuple(sys.intern(v) for v in values))
+
+
+@dataclass(frozen=True, slots=True)
+class CompactPricing:
+    business_type: str
+    price: int
+    monthly_condo_fee: Optional[int]
+    yearly_iptu: Optional[int]
+    iptu_period: Optional[str]
+    rental_period: Optional[str]
+    rental_warranties: Optional[Tuple[str, ...]]
+    monthly_rental_total_price: Optional[int]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactAddress:
+    country: str
+    state: str
+    city: str
+    neighborhood: str
+    zip_code: str
+    street: Optional[str]
+    street_number: Optional[str]
+    # (lon, lat, source, aproximate, aproximated_lat, aproximated_lon, radius)
+    point: Optional[Tuple[Any, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactListing:
+    """
+    Versão compacta de `ListingData`, com os mesmos nomes de campos.
+    Listas são representadas por tuplas e modelos aninhados por `CompactAddress` e
+    `CompactPricing`.
+    """
+
+    id: str
+    source_id: str
+    contract_type: str
+    display_address_type: str
+    construction_status: str
+    listing_type: str
+    status: str
+    portal: str
+    title: str
+    description: str
+    condominium_name: str
+    whatsapp_number: str
+    created_at: dt.datetime
+    updated_at: dt.datetime
+    units_on_the_floor: int
+    unit_floor: int
+    amenities: Tuple[str, ...]
+    merged_amenities: Tuple[str, ...]
+    stamps: Tuple[str, ...]
+    unit_types: Tuple[str, ...]
+    usage_types: Tuple[str, ...]
+    portals: Tuple[str, ...]
+    usable_areas: Tuple[int, ...]
+    total_areas: Tuple[int, ...]
+    floors: Tuple[int, ...]
+    parking_spaces: Tuple[int, ...]
+    suites: Tuple[int, ...]
+    bathrooms: Tuple[int, ...]
+    bedrooms: Tuple[int, ...]
+    # (name, logo_url)
+    property_developers: Tuple[Tuple[str, str], ...]
+    pricing_infos: Tuple[CompactPricing, ...]
+    address: CompactAddress
+
+    @classmethod
+    def from_listing(cls, listing: ListingData, intern: Interner) -> CompactListing:
+        """
+        Converte um `ListingData` para a representação compacta.
+
+        :param listing: A listagem a ser convertida.
+        :param intern: O `Interner` compartilhado pela coleção.
+        """
+        address = listing.address
+        point = address.point
+        return cls(
+            id=listing.id,
+            source_id=listing.source_id,
+            contract_type=intern(listing.contract_type),
+            display_address_type=intern(listing.display_address_type),
+            construction_status=intern(listing.construction_status),
+            listing_type=intern(listing.listing_type),
+            status=intern(listing.status),
+            portal=intern(listing.portal),
+            title=listing.title,
+            description=listing.description,
+            condominium_name=intern(listing.condominium_name),
+            whatsapp_number=intern(listing.whatsapp_number),
+            created_at=listing.created_at,
+            updated_at=listing.updated_at,
+            units_on_the_floor=listing.units_on_the_floor,
+            unit_floor=listing.unit_floor,
+            amenities=intern.strings(listing.amenities),
+            merged_amenities=intern.strings(listing.merged_amenities),
+            stamps=intern.strings(listing.stamps),
+            unit_types=intern.strings(listing.unit_types),
+            usage_types=intern.strings(listing.usage_types),
+            portals=intern.strings(listing.portals),
+            usable_areas=intern(tuple(listing.usable_areas)),
+            total_areas=intern(tuple(listing.total_areas)),
+            floors=intern(tuple(listing.floors)),
+            parking_spaces=intern(tuple(listing.parking_spaces)),
+            suites=intern(tuple(listing.suites)),
+            bathrooms=intern(tuple(listing.bathrooms)),
+            bedrooms=intern(tuple(listing.bedrooms)),
+            property_developers=intern(
+                tuple(
+                    (intern(d.name), intern(str(d.logo_url)))
+                    for d in listing.property_developers
+                )
+            ),
+            pricing_infos=tuple(
+                CompactPricing(
+                    business_type=intern(p.business_type),
+                    price=p.price,
+                    monthly_condo_fee=p.monthly_condo_fee,
+                    yearly_iptu=p.yearly_iptu,
+                    iptu_period=intern(p.iptu_period),
+                    rental_period=intern(p.rental_info.period) if p.rental_info else None,
+                    rental_warranties=(
+                        intern.strings(p.rental_info.warranties) if p.rental_info else None
+                    ),
+                    monthly_rental_total_price=(
+                        p.rental_info.monthly_rental_total_price if p.rental_info else None
+                    ),
+                )
+                for p in listing.pricing_infos
+            ),
+            address=CompactAddress(
+                country=intern(address.country),
+                state=intern(address.state),
+                city=intern(address.city),
+                neighborhood=intern(address.neighborhood),
+                zip_code=intern(address.zip_code),
+                street=intern(address.street),
+                street_number=address.street_number,
+                point=(
+                    (
+                        point.lon,
+                        point.lat,
+                        intern(point.source),
+                        point.aproximate,
+                        point.aproximated_lat,
+                        point.aproximated_lon,
+                        point.radius,
+                    )
+                    if point
+                    else None
+                ),
+            ),
+        )
+
+    def to_listing(self) -> ListingData:
+        """
+        Reconstrói o `ListingData` equivalente. Os dados não são validados novamente,
+        pois vieram de um `ListingData` válido.
+        """
+        address = self.address
+        point = address.point
+        return ListingData.model_construct(
+            id=self.id,
+            source_id=self.source_id,
+            contract_type=self.contract_type,
+            display_address_type=self.display_address_type,
+            construction_status=self.construction_status,
+            listing_type=self.listing_type,
+            status=self.status,
+            portal=self.portal,
+            title=self.title,
+            description=self.description,
+            condominium_name=self.condominium_name,
+            whatsapp_number=self.whatsapp_number,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            units_on_the_floor=self.units_on_the_floor,
+            unit_floor=self.unit_floor,
+            amenities=list(self.amenities),
+            merged_amenities=list(self.merged_amenities),
+            stamps=list(self.stamps),
+            unit_types=list(self.unit_types),
+            usage_types=list(self.usage_types),
+            portals=list(self.portals),
+            usable_areas=list(self.usable_areas),
+            total_areas=list(self.total_areas),
+            floors=list(self.floors),
+            parking_spaces=list(self.parking_spaces),
+            suites=list(self.suites),
+            bathrooms=list(self.bathrooms),
+            bedrooms=list(self.bedrooms),
+            property_developers=[
+                PropertyDevelopersData(name=name, logo_url=logo_url)
+                for name, logo_url in self.property_developers
+            ],
+            pricing_infos=[
+                ListingDataPricingInfos.model_construct(
+                    business_type=p.business_type,
+                    price=p.price,
+                    monthly_condo_fee=p.monthly_condo_fee,
+                    yearly_iptu=p.yearly_iptu,
+                    iptu_period=p.iptu_period,
+                    rental_info=(
+                        ListingDataRentalInfos.model_construct(
+                            period=p.rental_period,
+                            warranties=list(p.rental_warranties or ()),
+                            monthly_rental_total_price=p.monthly_rental_total_price,
+                        )
+                        if p.rental_period is not None
+                        else None
+                    ),
+                )
+                for p in self.pricing_infos
+            ],
+            address=ListingDataAddress.model_construct(
+                country=address.country,
+                state=address.state,
+                city=address.city,
+                neighborhood=address.neighborhood,
+                zip_code=address.zip_code,
+                street=address.street,
+                street_number=address.street_number,
+                point=(
+                    ListingDataAddressPoint.model_construct(
+                        **dict(zip(_POINT_FIELDS, point))
+                    )
+                    if point is not None
+                    else None
+                ),
+            ),
+        )
+
+
+_POINT_FIELDS = (
+    "lon",
+    "lat",
+    "source",
+    "aproximate",
+    "aproximated_lat",
+    "aproximated_lon",
+    "radius",
+)
+
+
+class CompactListings(Sequence[CompactListing]):
+    """
+    Coleção somente leitura de listagens compactas que compartilham o mesmo `Interner`.
+
+    Exemplo::
+
+        collection = CompactListings.from_listings(sdk.listings.search(...))
+        collection.extend(outra_pagina)
+        listings = collection.to_listings()
+    """
+
+    def __init__(self, intern: Interner | None = None) -> None:
+        self.intern = intern or Interner()
+        self._items: List[CompactListing] = []
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[ListingData]) -> CompactListings:
+        collection = cls()
+        collection.extend(listings)
+        return collection
+
+    def extend(self, listings: Iterable[ListingData]) -> None:
+        from_listing = CompactListing.from_listing
+        self._items.extend(from_listing(listing, self.intern) for listing in listings)
+
+    def to_listings(self) -> List[ListingData]:
+        return [item.to_listing() for item in self._items]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[CompactListing]:
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
@@ -0,0 +1,424 @@
+"""
+Coleta completa de listagens do Zap Imóveis.
+
+O `ListingsCrawler` usa o `QueryPlanner` para dividir a busca em sub-buscas que cabem na
+profundidade de paginação alcançável, executa as páginas de todas as sub-buscas em
+paralelo e remove listagens repetidas pelo `id`.
+
+Para coletas longas, `ListingsCrawler.pipeline` monta um `Pipeline` com estágios
+separados para as requisições, a validação, transformações e a escrita em lotes, cada um
+com a própria concorrência e com contrapressão da escrita até as requisições.
+
+Com `profile_dir`, `crawl` e `crawl_into` executam sob o `SamplingProfiler` e gravam, ao
+fim de cada coleta, o tempo por etapa e por estágio, os maiores alocadores e as pilhas
+para flame graphs em um subdiretório de `profile_dir` (veja `datalar.profiling`).
+
+Com `seen_filter` (um `BloomFilter` persistente dos ids de coletas anteriores), cada
+listagem é classificada como nova ou já vista sem consultar o banco: ids ausentes do
+filtro são com certeza novos e só os "talvez já vistos" são confirmados por `is_known`.
+Com `new_only`, apenas as listagens novas são entregues. Os ids só entram no filtro
+depois da entrega: em `crawl`, quando o consumidor pede a listagem seguinte; no pipeline,
+depois que o lote foi gravado pelo `sink`. Se o consumidor ou o `sink` falhar, as
+listagens não gravadas continuam novas na próxima coleta.
+
+Com `archive`, o pipeline grava o JSON bruto de cada listagem, como recebido da API, em
+um `RecordArchive`, para auditoria.
+"""
+from __future__ import annotations
+
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Set
+
+from datalar.archive import RecordArchive
+from datalar.bloom import BloomFilter
+from datalar.pipeline import Pipeline, Stage, StageKind, StageMetrics
+from datalar.profiling import Profile, SamplingProfiler
+from datalar.scrapers.zap_imoveis.planner import PlannedQuery, QueryPlanner, SearchQuery
+from datalar.scrapers.zap_imoveis.sdk.parsing import ParseStats, parse_listings_chunk
+from datalar.scrapers.zap_imoveis.sdk.schemas import (
+    FullSearchResponseFields,
+    ListingSearchFields,
+    ListingsSearchResponseFields,
+    ResultSearchResponseFields,
+    SearchResponseFields,
+)
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+    from datalar.scrapers.zap_imoveis.sdk.sdk import ZapGlueAPI
+
+MAX_PAGE_SIZE = 110
+
+
+def default_include_fields() -> FullSearchResponseFields:
+    """
+    Campos solicitados por padrão: todos os campos da listagem e o total de resultados.
+    """
+    return FullSearchResponseFields(
+        search=SearchResponseFields(
+            result=ResultSearchResponseFields(
+                listings=ListingsSearchResponseFields(
+                    listing=ListingSearchFields().include_all()
+                )
+            ),
+            total_count=True,
+        )
+    )
+
+
+@dataclass(frozen=True)
+class PageTask:
+    """
+    Uma página de uma sub-busca do plano.
+    """
+
+    query: SearchQuery
+    page: int
+    size: int
+
+    @property
+    def offset(self) -> int:
+        return (self.page - 1) * self.size
+
+
+@dataclass
+class CrawlStats:
+    planned_queries: int = 0
+    count_requests: int = 0
+    page_requests: int = 0
+    listings: int = 0
+    duplicates: int = 0
+    incomplete_queries: int = 0
+    # listagens ausentes das coletas anteriores (com `seen_filter`)
+    new_listings: int = 0
+    # consultas a `is_known` para ids que o `seen_filter` marcou como talvez já vistos
+    known_lookups: int = 0
+
+
+class ListingsCrawler:
+    """
+    Coleta todas as listagens de uma busca, contornando o limite de paginação.
+
+    :param sdk: Instância da SDK.
+    :param planner: Planejador de sub-buscas. Por padrão, um `QueryPlanner` com os
+                    parâmetros padrão.
+    :param page_size: Tamanho das páginas (máximo de 110).
+    :param max_workers: Número de páginas requisitadas em paralelo.
+    :param include_fields: Campos solicitados à API.
+    :param profile_dir: Perfila as coletas e grava cada perfil em um subdiretório
+                        (data e hora do início) deste diretório.
+    :param profile_interval: Intervalo entre as amostras do perfil, em segundos.
+    :param profile_memory: Registra também as alocações (`tracemalloc`).
+    :param seen_filter: Filtro dos ids já coletados, atualizado com as listagens
+                        entregues.
+    :param is_known: Confirma se um id marcado pelo filtro como talvez já visto foi
+                     de fato coletado antes (por exemplo, uma consulta ao banco). Sem
+                     ela, esses ids são considerados já vistos, e uma fração
+                     `error_rate` das listagens novas é tratada como já vista.
+    :ivar last_profile: O perfil da última coleta perfilada.
+    """
+
+    def __init__(
+        self,
+        sdk: ZapGlueAPI,
+        *,
+        planner: Optional[QueryPlanner] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_workers: int = 8,
+        include_fields: Optional[FullSearchResponseFields] = None,
+        profile_dir: Optional[str] = None,
+        profile_interval: float = 0.01,
+        profile_memory: bool = True,
+        seen_filter: Optional[BloomFilter] = None,
+        is_known: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}")
+        self.sdk = sdk
+        self.planner = planner or QueryPlanner(sdk)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.include_fields = include_fields or default_include_fields()
+        self.stats = CrawlStats()
+        self.profile_dir = profile_dir
+        self.profile_interval = profile_interval
+        self.profile_memory = profile_memory
+        self.last_profile: Optional[Profile] = None
+        self.seen_filter = seen_filter
+        self.is_known = is_known
+
+    def page_tasks(self, plan: List[PlannedQuery]) -> List[PageTask]:
+        """
+        Converte o plano em páginas, respeitando a profundidade alcançável.
+        """
+        tasks = []
+        for planned in plan:
+            reachable = min(planned.count, self.planner.max_results)
+            pages = math.ceil(reachable / self.page_size)
+            tasks.extend(
+                PageTask(planned.query, page, self.page_size)
+                for page in range(1, pages + 1)
+            )
+        return tasks
+
+    def fetch_page(self, task: PageTask) -> List[ListingData]:
+        return self.sdk.listings.search(
+            include_fields=self.include_fields,
+            page=task.page,
+            size=task.size,
+            _from=task.offset,
+            **task.query.search_params(),
+        )
+
+    def fetch_raw_page(self, task: PageTask) -> List[dict]:
+        """
+        Busca uma página sem validar as listagens.
+
+        :return: Os dicionários das listagens, como recebidos da API.
+        """
+        data = self.sdk.listings.search(
+            include_fields=self.include_fields,
+            page=task.page,
+            size=task.size,
+            _from=task.offset,
+            parse_data=False,
+            **task.query.search_params(),
+        )
+        try:
+            return [item["listing"] for item in data["search"]["result"]["listings"]]
+        except KeyError as e:
+            raise ValueError(f"Api response does not contain expected keys {e}") from e
+
+    def is_new(self, listing_id: str) -> bool:
+        """
+        Se o id não foi coletado antes, segundo o `seen_filter` (e `is_known`). O id não
+        é adicionado ao filtro: isso só acontece depois da entrega da listagem.
+        """
+        if listing_id not in self.seen_filter:
+            return True
+        if self.is_known is None:
+            return False
+        self.stats.known_lookups += 1
+        return not self.is_known(listing_id)
+
+    def _track_new(self, listing: ListingData, new_only: bool) -> bool:
+        # se a listagem deve ser entregue
+        if self.seen_filter is None:
+            return True
+        new = self.is_new(listing.id)
+        self.stats.new_listings += new
+        return new or not new_only
+
+    def _plan(self, query: SearchQuery | None) -> List[PlannedQuery]:
+        self.stats = CrawlStats()
+        requests_before = self.planner.requests
+        plan = self.planner.plan(query)
+        self.stats.planned_queries = len(plan)
+        self.stats.count_requests = self.planner.requests - requests_before
+        self.stats.incomplete_queries = sum(not p.complete for p in plan)
+        return plan
+
+    def crawl(
+        self, query: SearchQuery | None = None, *, new_only: bool = False
+    ) -> Iterator[ListingData]:
+        """
+        Coleta as listagens da busca informada, sem repetições.
+        As listagens são produzidas à medida que as páginas são concluídas.
+
+        :param query: A busca a ser coberta. Por padrão, todas as listagens.
+        :param new_only: Entrega apenas as listagens novas (requer `seen_filter`).
+        """
+        profiler = self._start_profiler()
+        try:
+            yield from self._crawl(query, new_only)
+        finally:
+            self._stop_profiler(profiler)
+
+    def _crawl(
+        self, query: SearchQuery | None, new_only: bool
+    ) -> Iterator[ListingData]:
+        if new_only and self.seen_filter is None:
+            raise ValueError("new_only requires a seen_filter")
+        plan = self._plan(query)
+        seen: Set[str] = set()
+        tasks = iter(self.page_tasks(plan))
+        pending: Set[Future] = set()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while True:
+                # no máximo `2 * max_workers` páginas submetidas e não consumidas
+                window = 2 * self.max_workers - len(pending)
+                pending.update(
+                    executor.submit(self.fetch_page, task)
+                    for task in islice(tasks, window)
+                )
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    listings = future.result()
+                    self.stats.page_requests += 1
+                    for listing in listings:
+                        if listing.id in seen:
+                            self.stats.duplicates += 1
+                            continue
+                        seen.add(listing.id)
+                        self.stats.listings += 1
+                        if self._track_new(listing, new_only):
+                            yield listing
+                            # o consumidor pediu a próxima: esta já foi processada
+                            if self.seen_filter is not None:
+                                self.seen_filter.add(listing.id)
+        finally:
+            # se o consumidor parar antes do fim ou uma página falhar, as páginas ainda
+            # não iniciadas são canceladas, sem esperar as em andamento
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def pipeline(
+        self,
+        sink: Callable[[List[ListingData]], Any],
+        *,
+        transform: Optional[Callable[[ListingData], Any]] = None,
+        transform_workers: int = 1,
+        parse_kind: StageKind = "thread",
+        parse_workers: int = 1,
+        sink_batch_size: int = 500,
+        sink_workers: int = 1,
+        new_only: bool = False,
+        archive: Optional[RecordArchive] = None,
+    ) -> Pipeline:
+        """
+        Monta o pipeline de coleta: `fetch` (páginas brutas, `max_workers` requisições
+        simultâneas) → `parse` (validação) → `collect` (remove repetições e atualiza
+        `stats`) → `transform` (opcional) → `sink` (lotes).
+
+        :param sink: Recebe listas de até `sink_batch_size` listagens (ou dos valores
+                     retornados por `transform`).
+        :param transform: Aplicada a cada listagem; retornar `None` descarta a listagem.
+        :param parse_kind: `thread` ou `process`. Processos validam em paralelo de fato,
+                           ao custo de serializar as páginas entre processos.
+        :param new_only: Entrega apenas as listagens novas (requer `seen_filter`).
+        :param archive: Recebe o JSON bruto de cada listagem, antes da validação
+                        (estágio `archive`, logo após `fetch`).
+
+        Com `seen_filter`, os ids seguem junto com as listagens até o `sink` e são
+        adicionados ao filtro depois que cada lote é gravado.
+        """
+        if new_only and self.seen_filter is None:
+            raise ValueError("new_only requires a seen_filter")
+        seen: Set[str] = set()
+        record_parse = self.sdk.listings._record_parse
+
+        def collect(result: tuple[List[ListingData], List[str], ParseStats]) -> list:
+            # um único worker: `seen` e `stats` não são compartilhados entre threads
+            parsed, errors, parse_stats = result
+            record_parse(parse_stats, errors)
+            self.stats.page_requests += 1
+            unique = []
+            for listing in parsed:
+                if listing.id in seen:
+                    self.stats.duplicates += 1
+                    continue
+                seen.add(listing.id)
+                self.stats.listings += 1
+                if self._track_new(listing, new_only):
+                    unique.append(listing)
+            if self.seen_filter is not None:
+                return [(listing.id, listing) for listing in unique]
+            return unique
+
+        stages = [Stage("fetch", self.fetch_raw_page, workers=self.max_workers)]
+        if archive is not None:
+
+            def archive_page(listings: List[dict]) -> List[dict]:
+                crawled_at = time.time()
+                for listing in listings:
+                    archive.append_json(str(listing["id"]), listing, crawled_at)
+                return listings
+
+            stages.append(Stage("archive", archive_page))
+        stages += [
+            Stage(
+                "parse",
+                partial(parse_listings_chunk, mode=self.sdk.config.PARSE_MODE),
+                workers=parse_workers,
+                kind=parse_kind,
+            ),
+            Stage("collect", collect, flatten=True),
+        ]
+        if self.seen_filter is not None:
+            transform, sink = self._tracked(transform, sink)
+        if transform is not None:
+            stages.append(Stage("transform", transform, workers=transform_workers))
+        stages.append(
+            Stage("sink", sink, workers=sink_workers, batch_size=sink_batch_size)
+        )
+        return Pipeline(stages)
+
+    def _tracked(
+        self,
+        transform: Optional[Callable[[ListingData], Any]],
+        sink: Callable[[List[Any]], Any],
+    ) -> tuple[Optional[Callable], Callable]:
+        """
+        Versões de `transform` e `sink` para pares (id, listagem): os ids de cada lote
+        entram no `seen_filter` apenas depois que `sink` grava o lote.
+        """
+        seen_filter = self.seen_filter
+
+        def tracked_sink(batch: List[tuple[str, Any]]) -> Any:
+            result = sink([value for _, value in batch])
+            seen_filter.update(listing_id for listing_id, _ in batch)
+            return result
+
+        if transform is None:
+            return None, tracked_sink
+
+        def tracked_transform(item: tuple[str, ListingData]) -> Optional[tuple]:
+            listing_id, listing = item
+            value = transform(listing)
+            return None if value is None else (listing_id, value)
+
+        return tracked_transform, tracked_sink
+
+    def crawl_into(
+        self,
+        sink: Callable[[List[ListingData]], Any],
+        query: SearchQuery | None = None,
+        **options,
+    ) -> List[StageMetrics]:
+        """
+        Coleta as listagens da busca com o pipeline de `pipeline` e as entrega a `sink`.
+
+        :param options: Os demais argumentos de `pipeline`.
+        :return: As métricas de cada estágio.
+        """
+        profiler = self._start_profiler()
+        try:
+            plan = self._plan(query)
+            return self.pipeline(sink, **options).run(self.page_tasks(plan))
+        finally:
+            self._stop_profiler(profiler)
+
+    def _start_profiler(self) -> Optional[SamplingProfiler]:
+        if self.profile_dir is None:
+            return None
+        return SamplingProfiler(
+            self.profile_interval, trace_memory=self.profile_memory
+        ).start()
+
+    def _stop_profiler(self, profiler: Optional[SamplingProfiler]) -> None:
+        if profiler is None:
+            return
+        self.last_profile = profiler.stop()
+        started = datetime.fromtimestamp(self.last_profile.started_at)
+        self.last_profile.write(
+            os.path.join(self.profile_dir, started.strftime("%Y%m%dT%H%M%S%f"))
+        )
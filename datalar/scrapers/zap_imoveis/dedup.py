@@ -0,0 +1,274 @@
+"""
+Deduplicação de imóveis anunciados mais de uma vez.
+
+Um mesmo imóvel costuma aparecer sob vários `ListingData.id` (anunciantes diferentes,
+republicações, etc.). Este módulo mantém um índice incremental que:
+
+1. agrupa candidatos por bloco (CEP, ou endereço quando não há CEP, e número de quartos);
+2. compara títulos e descrições por MinHash, usando LSH por bandas para encontrar
+   candidatos em tempo sublinear;
+3. confirma a duplicidade pela área útil e pela similaridade de Jaccard estimada;
+4. atribui um identificador canônico a cada grupo de listagens duplicadas.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold_text(text: str) -> str:
+    """
+    Normaliza um texto para comparação: remove acentos e converte para minúsculas.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+class MinHasher:
+    """
+    Gera assinaturas MinHash a partir de shingles de palavras de um texto.
+
+    :param num_perm: Número de permutações (tamanho da assinatura).
+    :param shingle_size: Quantidade de palavras em cada shingle.
+    :param seed: Semente das permutações. Índices que compartilham assinaturas
+                 devem usar a mesma semente.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        words = _WORD_RE.findall(fold_text(text))
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {
+            " ".join(words[i : i + self.shingle_size])
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Calcula a assinatura MinHash do texto.
+
+        :return: Um array `uint64` de tamanho `num_perm`. Textos vazios geram uma
+                 assinatura com o valor máximo em todas as posições.
+        """
+        return self.shingles_signature(self.shingles(text))
+
+    def shingles_signature(self, shingles: Set[str]) -> np.ndarray:
+        """
+        Calcula a assinatura MinHash de um conjunto de shingles já extraído.
+        """
+        if not shingles:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (
+                int.from_bytes(
+                    hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little"
+                )
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        ) % _MERSENNE_PRIME
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+@dataclass(frozen=True)
+class DedupMatch:
+    """
+    Resultado da inclusão de uma listagem no índice.
+    """
+
+    listing_id: str
+    canonical_id: str
+    matched_id: Optional[str] = None
+    similarity: float = 0.0
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.matched_id is not None
+
+
+class DedupIndex:
+    """
+    Índice incremental de deduplicação de listagens.
+
+    Cada nova listagem é comparada apenas com as listagens do mesmo bloco que colidem
+    em ao menos uma banda do LSH, portanto o custo de inclusão não cresce com o tamanho
+    do índice. O identificador canônico de um grupo é o `id` da primeira listagem do
+    grupo incluída no índice.
+
+    :param threshold: Similaridade de Jaccard mínima (estimada) entre os textos.
+    :param area_tolerance: Diferença relativa máxima entre as áreas úteis.
+    :param num_perm: Tamanho das assinaturas MinHash.
+    :param bands: Número de bandas do LSH. Deve dividir `num_perm`.
+    :param min_shingles: Número mínimo de shingles do texto para a listagem ser
+                         comparada. Textos vazios ou muito curtos (até `shingle_size`
+                         palavras geram um único shingle) têm assinaturas iguais ou
+                         pouco informativas; essas listagens são consideradas únicas.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.6,
+        area_tolerance: float = 0.05,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        seed: int = 1,
+        min_shingles: int = 2,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.area_tolerance = area_tolerance
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_shingles = min_shingles
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+
+        self._buckets: Dict[Tuple[Hashable, int, bytes], List[int]] = {}
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._signatures: List[np.ndarray] = []
+        self._areas: List[Optional[float]] = []
+        self._parents: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, listing_id: str) -> bool:
+        return listing_id in self._positions
+
+    @staticmethod
+    def block_key(listing: ListingData) -> Hashable:
+        """
+        Chave de bloco da listagem: CEP (ou endereço completo, se não houver CEP)
+        e número de quartos.
+        """
+        address = listing.address
+        zip_code = re.sub(r"\D", "", address.zip_code or "")
+        location: Hashable = zip_code or (
+            address.state,
+            fold_text(address.city),
+            fold_text(address.neighborhood),
+            fold_text(address.street or ""),
+        )
+        return location, tuple(listing.bedrooms)
+
+    def add(self, listing: ListingData) -> DedupMatch:
+        """
+        Inclui uma listagem no índice e retorna o seu identificador canônico.
+        Listagens já indexadas não são reprocessadas.
+
+        :param listing: A listagem a ser indexada.
+        :return: Um `DedupMatch` indicando o id canônico e, se houver, a listagem
+                 duplicada que foi encontrada.
+        """
+        if listing.id in self._positions:
+            return DedupMatch(listing.id, self.canonical_id(listing.id))
+
+        block = self.block_key(listing)
+        shingles = self.hasher.shingles(f"{listing.title}\n{listing.description}")
+        signature = self.hasher.shingles_signature(shingles)
+        area = float(listing.usable_areas[0]) if listing.usable_areas else None
+        band_keys = [
+            (block, band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+        if len(shingles) < self.min_shingles:
+            # textos vazios ou curtos colidiriam entre si: a listagem fica fora do LSH
+            band_keys = []
+
+        matches: List[int] = []
+        best: Optional[int] = None
+        best_similarity = 0.0
+        seen: Set[int] = set()
+        for key in band_keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if not self._areas_match(area, self._areas[candidate]):
+                    continue
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity < self.threshold:
+                    continue
+                matches.append(candidate)
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+
+        position = len(self._ids)
+        self._ids.append(listing.id)
+        self._positions[listing.id] = position
+        self._signatures.append(signature)
+        self._areas.append(area)
+        self._parents.append(position)
+        for key in band_keys:
+            self._buckets.setdefault(key, []).append(position)
+
+        if best is None:
+            return DedupMatch(listing.id, listing.id)
+
+        # a nova listagem pode ligar grupos antes separados; o grupo mais antigo prevalece
+        roots = {self._find(match) for match in matches}
+        root = min(roots)
+        for other in roots:
+            self._parents[other] = root
+        self._parents[position] = root
+        return DedupMatch(
+            listing.id,
+            self._ids[root],
+            matched_id=self._ids[best],
+            similarity=best_similarity,
+        )
+
+    def canonical_id(self, listing_id: str) -> str:
+        """
+        Retorna o identificador canônico de uma listagem já indexada.
+
+        :raises KeyError: Se a listagem não estiver no índice.
+        """
+        return self._ids[self._find(self._positions[listing_id])]
+
+    def duplicates(self, listing_id: str) -> Set[str]:
+        """
+        Retorna os ids de todas as listagens do mesmo grupo, incluindo a própria.
+        Esta operação percorre o índice inteiro e é destinada a inspeções pontuais.
+        """
+        root = self._find(self._positions[listing_id])
+        return {
+            self._ids[i] for i in range(len(self._ids)) if self._find(i) == root
+        }
+
+    def _areas_match(self, a: Optional[float], b: Optional[float]) -> bool:
+        if a is None or b is None:
+            return a is b
+        return abs(a - b) <= self.area_tolerance * max(a, b)
+
+    def _find(self, position: int) -> int:
+        parents = self._parents
+        root = position
+        while parents[root] != root:
+            root = parents[root]
+        while parents[position] != root:
+            parents[position], position = root, parents[position]
+        return root
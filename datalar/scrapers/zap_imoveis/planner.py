@@ -0,0 +1,220 @@
+"""
+Planejamento de buscas que contornam o limite de profundidade da paginação.
+
+A API de busca deixa de retornar resultados a partir de um certo deslocamento (`from`),
+então cidades grandes não podem ser enumeradas apenas paginando. O `QueryPlanner`
+divide recursivamente uma busca (tipo de negócio, tipo de listagem, localidade, faixas
+de preço e de área) até que o total reportado de cada sub-busca caiba na profundidade
+alcançável.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass, replace
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.sdk import ZapGlueAPI
+
+BUSINESS_TYPES = ("SALE", "RENT")
+LISTING_TYPES = ("USED", "DEVELOPMENT")
+
+MAX_REACHABLE_RESULTS = 5_000
+MAX_PRICE = 1_000_000_000
+MAX_USABLE_AREA = 1_000_000
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """
+    Filtros de uma busca de listagens. Campos `None` não restringem a busca; `business_type`
+    e `listing_type` indefinidos são expandidos pelo planejador.
+    """
+
+    business_type: Optional[Literal["SALE", "RENT"]] = None
+    listing_type: Optional[Literal["DEVELOPMENT", "USED"]] = None
+    price_min: Optional[int] = None
+    price_max: Optional[int] = None
+    usable_area_min: Optional[int] = None
+    usable_area_max: Optional[int] = None
+    address_state: Optional[str] = None
+    address_city: Optional[str] = None
+    address_neighborhood: Optional[str] = None
+
+    def search_params(self) -> Dict[str, Any]:
+        """
+        Parâmetros nomeados para `Listings.search`/`Listings.count`.
+        """
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+    @property
+    def has_location(self) -> bool:
+        return any((self.address_state, self.address_city, self.address_neighborhood))
+
+
+@dataclass(frozen=True)
+class PlannedQuery:
+    """
+    Uma sub-busca final do plano e o total de listagens reportado para ela.
+    `complete` é falso quando a sub-busca não pôde ser dividida o suficiente para caber
+    na profundidade alcançável; nesse caso apenas os primeiros resultados serão coletados.
+    """
+
+    query: SearchQuery
+    count: int
+    complete: bool = True
+
+
+def _split_range(low: int, high: int) -> Optional[tuple]:
+    """
+    Divide o intervalo fechado [low, high] em duas metades fechadas.
+    Preços e áreas têm distribuição assimétrica, então o ponto de corte é a média
+    geométrica dos extremos.
+    """
+    if high <= low:
+        return None
+    middle = int(math.sqrt(max(low, 1) * high))
+    middle = min(max(middle, low), high - 1)
+    return (low, middle), (middle + 1, high)
+
+
+class QueryPlanner:
+    """
+    Divide buscas até que cada sub-busca caiba na profundidade de paginação alcançável.
+
+    A ordem de divisão é: tipo de negócio e tipo de listagem (sem consultar a API),
+    localidades informadas, faixas de preço e, por fim, faixas de área útil. Se a soma
+    dos totais das localidades for menor que o total da busca (listagens fora das
+    localidades), a busca é dividida por preço, sem localidade. Uma sub-busca só é
+    dividida quando o total reportado excede `max_results`, de modo que o número de
+    requisições de contagem é proporcional ao número de sub-buscas finais.
+
+    :param sdk: Instância da SDK usada para consultar os totais.
+    :param max_results: Profundidade máxima alcançável pela paginação.
+    :param locations: Localidades (filtros `address_*`) usadas para dividir buscas sem localidade.
+    """
+
+    def __init__(
+        self,
+        sdk: ZapGlueAPI,
+        *,
+        max_results: int = MAX_REACHABLE_RESULTS,
+        locations: Sequence[Dict[str, str]] = (),
+        max_price: int = MAX_PRICE,
+        max_usable_area: int = MAX_USABLE_AREA,
+    ) -> None:
+        self.sdk = sdk
+        self.max_results = max_results
+        self.locations = list(locations)
+        self.max_price = max_price
+        self.max_usable_area = max_usable_area
+        self.requests = 0
+
+    def count(self, query: SearchQuery) -> int:
+        self.requests += 1
+        return self.sdk.listings.count(**query.search_params())
+
+    def plan(self, query: SearchQuery | None = None) -> List[PlannedQuery]:
+        """
+        Gera o plano de sub-buscas para a busca informada.
+
+        :param query: A busca a ser coberta. Por padrão, todas as listagens.
+        :return: As sub-buscas finais com total maior que zero.
+        """
+        plan: List[PlannedQuery] = []
+        # (busca, total já consultado, se ainda pode ser dividida por localidade)
+        stack: List[Tuple[SearchQuery, Optional[int], bool]] = [
+            (expanded, None, True)
+            for expanded in self._expand_types(query or SearchQuery())
+        ]
+        while stack:
+            current, count, by_location = stack.pop()
+            if count is None:
+                count = self.count(current)
+            if count == 0:
+                continue
+            if count <= self.max_results:
+                plan.append(PlannedQuery(current, count))
+                continue
+            if by_location and self.locations and not current.has_location:
+                children = self.split(current)
+                counts = [self.count(child) for child in children]
+                if sum(counts) >= count:
+                    stack.extend(
+                        (child, child_count, True)
+                        for child, child_count in reversed(list(zip(children, counts)))
+                    )
+                    continue
+                # as localidades não cobrem toda a busca: dividi-la por localidade
+                # perderia as listagens fora delas
+                self.sdk.logger.warning(
+                    f"Locations cover {sum(counts)} of the {count} results of "
+                    f"{current}; splitting it by price instead"
+                )
+                by_location = False
+            children = self.split(current, by_location=False)
+            if children is None:
+                self.sdk.logger.warning(
+                    f"Query {current} reports {count} results and cannot be split further"
+                )
+                plan.append(PlannedQuery(current, count, complete=False))
+                continue
+            stack.extend((child, None, by_location) for child in reversed(children))
+        return plan
+
+    def _expand_types(self, query: SearchQuery) -> Iterable[SearchQuery]:
+        business_types = (
+            (query.business_type,) if query.business_type else BUSINESS_TYPES
+        )
+        listing_types = (query.listing_type,) if query.listing_type else LISTING_TYPES
+        for business_type in business_types:
+            for listing_type in listing_types:
+                yield replace(
+                    query, business_type=business_type, listing_type=listing_type
+                )
+
+    def split(
+        self, query: SearchQuery, *, by_location: bool = True
+    ) -> Optional[List[SearchQuery]]:
+        """
+        Divide a busca na próxima dimensão disponível.
+
+        :param by_location: Considera a divisão pelas localidades informadas.
+        :return: As sub-buscas, ou `None` se a busca não puder mais ser dividida.
+        """
+        if by_location and self.locations and not query.has_location:
+            return [replace(query, **location) for location in self.locations]
+
+        price = _split_range(query.price_min or 0, query.price_max or self.max_price)
+        if price is not None:
+            (low, middle), (upper, high) = price
+            # a última faixa continua aberta quando a busca original não tinha limite superior
+            return [
+                replace(query, price_min=low, price_max=middle),
+                replace(query, price_min=upper, price_max=query.price_max and high),
+            ]
+
+        area = _split_range(
+            query.usable_area_min or 0, query.usable_area_max or self.max_usable_area
+        )
+        if area is not None:
+            (low, middle), (upper, high) = area
+            return [
+                replace(query, usable_area_min=low, usable_area_max=middle),
+                replace(
+                    query,
+                    usable_area_min=upper,
+                    usable_area_max=query.usable_area_max and high,
+                ),
+            ]
+        return None
@@ -0,0 +1,406 @@
+"""
+Agendamento recorrente das coletas, com frequência adaptada a cada segmento.
+
+Um segmento é uma busca (`SearchQuery`), por exemplo uma cidade em uma faixa de preço.
+Segmentos mudam em ritmos muito diferentes, então coletar todos na mesma cadência
+desperdiça requisições. O `RefreshScheduler`:
+
+1. a cada coleta de um segmento, estima a fração das listagens que muda por hora, a
+   partir dos eventos do `ChangeFeed` do segmento (listagens novas, removidas e
+   alteradas desde a coleta anterior), suavizada por média móvel exponencial. Na
+   primeira coleta, sem estado anterior, usa as listagens com `updated_at` recente;
+2. define o intervalo até a próxima coleta para que, em média, no máximo
+   `target_change` das listagens do segmento mudem entre duas coletas;
+3. executa os segmentos vencidos em ordem de prioridade (alterações esperadas por
+   requisição) dentro de um orçamento global de requisições por janela de tempo.
+
+O estado dos segmentos e o histórico das coletas ficam em um arquivo SQLite local; o
+estado das listagens de cada segmento, em um `ChangeFeed` por segmento. As listagens são
+processadas à medida que a coleta avança, sem manter o segmento inteiro em memória.
+
+Exemplo::
+
+    scheduler = RefreshScheduler(ListingsCrawler(sdk), "schedule.db", budget=20_000)
+    scheduler.add_segments(SearchQuery(address_city=city) for city in cities)
+    scheduler.run_forever(stop_event)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from itertools import chain
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List, Optional
+
+from datalar.scrapers.zap_imoveis.changes import ChangeFeed
+from datalar.scrapers.zap_imoveis.planner import SearchQuery
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.crawler import ListingsCrawler
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    interval REAL NOT NULL,
+    next_run REAL NOT NULL,
+    last_run REAL,
+    change_rate REAL,
+    listings INTEGER,
+    cost INTEGER,
+    runs INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS runs (
+    key TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    listings INTEGER NOT NULL,
+    changes INTEGER NOT NULL,
+    requests INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+"""
+
+
+def segment_key(query: SearchQuery) -> str:
+    return json.dumps(query.search_params(), sort_keys=True, ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    Estado de agendamento de um segmento.
+
+    :ivar interval: Intervalo atual entre coletas, em segundos.
+    :ivar change_rate: Fração estimada das listagens que muda por hora (`None` antes
+                       da primeira coleta).
+    :ivar cost: Requisições gastas na última coleta.
+    """
+
+    key: str
+    query: SearchQuery
+    interval: float
+    next_run: float
+    last_run: Optional[float]
+    change_rate: Optional[float]
+    listings: Optional[int]
+    cost: Optional[int]
+    runs: int
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Segment:
+        key, query, *values = row
+        return cls(key, SearchQuery(**json.loads(query)), *values)
+
+
+@dataclass(frozen=True)
+class SegmentRun:
+    segment: Segment
+    listings: int
+    changes: int
+    requests: int
+    error: Optional[str] = None
+
+
+class RefreshScheduler:
+    """
+    Agenda e executa as coletas dos segmentos.
+
+    :param crawler: O `ListingsCrawler` usado nas coletas.
+    :param path: Arquivo SQLite com o estado do agendamento.
+    :param budget: Número máximo de requisições por `budget_window`.
+    :param budget_window: Janela do orçamento, em segundos.
+    :param min_interval: Menor intervalo entre coletas de um segmento, em segundos.
+    :param max_interval: Maior intervalo entre coletas de um segmento, em segundos.
+    :param initial_interval: Janela usada para estimar a taxa de alteração na primeira
+                             coleta (listagens atualizadas nesse período).
+    :param target_change: Fração das listagens que pode mudar entre duas coletas.
+    :param alpha: Peso da última observação na média da taxa de alteração.
+    :param default_cost: Custo assumido, em requisições, de um segmento nunca coletado.
+    :param on_listings: Chamada com a busca e lotes de até `batch_size` listagens, à
+                        medida que a coleta avança.
+    :param batch_size: Tamanho dos lotes entregues a `on_listings`.
+    :param changes_dir: Diretório com o estado (`ChangeFeed`) de cada segmento. Por
+                        padrão, `<path>.changes`.
+    :param change_partitions: Partições do `ChangeFeed` de cada segmento.
+    :param clock: Relógio de parede (substituível em testes).
+    """
+
+    def __init__(
+        self,
+        crawler: ListingsCrawler,
+        path: str,
+        *,
+        budget: int = 10_000,
+        budget_window: float = 60 * 60,
+        min_interval: float = 15 * 60,
+        max_interval: float = 7 * 24 * 60 * 60,
+        initial_interval: float = 24 * 60 * 60,
+        target_change: float = 0.05,
+        alpha: float = 0.3,
+        default_cost: int = 10,
+        on_listings: Optional[Callable[[SearchQuery, List[ListingData]], Any]] = None,
+        batch_size: int = 500,
+        changes_dir: Optional[str] = None,
+        change_partitions: int = 8,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be positive and <= max_interval")
+        self.crawler = crawler
+        self.budget = budget
+        self.budget_window = budget_window
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.target_change = target_change
+        self.alpha = alpha
+        self.default_cost = default_cost
+        self.on_listings = on_listings
+        self.batch_size = batch_size
+        self.changes_dir = changes_dir or f"{path}.changes"
+        self.change_partitions = change_partitions
+        self.clock = clock
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add_segment(self, query: SearchQuery) -> Segment:
+        """
+        Registra o segmento, se ainda não existir. Segmentos novos vencem imediatamente.
+        """
+        key = segment_key(query)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO segments (key, query, interval, next_run) "
+            "VALUES (?, ?, ?, ?)",
+            (key, key, self.initial_interval, self.clock()),
+        )
+        return self.segment(query)
+
+    def add_segments(self, queries: Iterable[SearchQuery]) -> None:
+        for query in queries:
+            self.add_segment(query)
+
+    def remove_segment(self, query: SearchQuery) -> None:
+        key = segment_key(query)
+        self._conn.execute("DELETE FROM segments WHERE key = ?", (key,))
+        shutil.rmtree(self._feed_dir(key), ignore_errors=True)
+
+    def _feed_dir(self, key: str) -> str:
+        return os.path.join(self.changes_dir, hashlib.sha1(key.encode()).hexdigest())
+
+    def feed(self, segment: Segment) -> ChangeFeed:
+        """
+        O `ChangeFeed` com o estado das listagens do segmento.
+        """
+        return ChangeFeed(
+            self._feed_dir(segment.key), partitions=self.change_partitions
+        )
+
+    def segment(self, query: SearchQuery) -> Optional[Segment]:
+        row = self._conn.execute(
+            "SELECT * FROM segments WHERE key = ?", (segment_key(query),)
+        ).fetchone()
+        return Segment.from_row(row) if row else None
+
+    def segments(self) -> List[Segment]:
+        return [
+            Segment.from_row(row)
+            for row in self._conn.execute("SELECT * FROM segments ORDER BY next_run")
+        ]
+
+    def spent(self, now: Optional[float] = None) -> int:
+        """
+        Requisições gastas na janela do orçamento.
+        """
+        now = self.clock() if now is None else now
+        (spent,) = self._conn.execute(
+            "SELECT COALESCE(SUM(requests), 0) FROM runs WHERE started_at > ?",
+            (now - self.budget_window,),
+        ).fetchone()
+        return spent
+
+    def priority(self, segment: Segment, now: float) -> float:
+        """
+        Alterações esperadas desde a última coleta por requisição gasta.
+        Segmentos nunca coletados têm prioridade máxima.
+        """
+        if segment.last_run is None or segment.change_rate is None:
+            return math.inf
+        hours = (now - segment.last_run) / 3600
+        expected = segment.change_rate * (segment.listings or 0) * hours
+        return expected / max(segment.cost or self.default_cost, 1)
+
+    def due(self, now: Optional[float] = None) -> List[Segment]:
+        """
+        Segmentos vencidos, do mais para o menos prioritário.
+        """
+        now = self.clock() if now is None else now
+        rows = self._conn.execute(
+            "SELECT * FROM segments WHERE next_run <= ?", (now,)
+        ).fetchall()
+        segments = [Segment.from_row(row) for row in rows]
+        return sorted(
+            segments, key=lambda s: (-self.priority(s, now), s.next_run, s.key)
+        )
+
+    def plan(self, now: Optional[float] = None) -> List[Segment]:
+        """
+        Segmentos vencidos que cabem no orçamento restante, em ordem de prioridade.
+        A seleção para no primeiro segmento que não cabe, para que segmentos caros não
+        sejam preteridos indefinidamente por segmentos baratos. Um segmento mais caro que
+        o orçamento inteiro é executado sozinho, quando a janela está sem gastos.
+        """
+        now = self.clock() if now is None else now
+        available = self.budget - self.spent(now)
+        selected = []
+        for segment in self.due(now):
+            cost = segment.cost or self.default_cost
+            oversized = cost > self.budget and available == self.budget
+            if cost > available and not (oversized and not selected):
+                break
+            selected.append(segment)
+            available -= cost
+        return selected
+
+    def interval_for(self, change_rate: float) -> float:
+        if change_rate <= 0:
+            return self.max_interval
+        interval = self.target_change / change_rate * 3600
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def run_segment(self, segment: Segment) -> SegmentRun:
+        """
+        Coleta o segmento, atualiza a taxa de alteração e agenda a próxima coleta.
+        Se o planejamento não conseguir cobrir o segmento inteiro, a coleta é parcial: as
+        listagens ausentes não contam como removidas.
+        Em caso de erro, o segmento é reagendado com o intervalo atual e o estado do
+        `ChangeFeed` do segmento é mantido.
+        """
+        started_at = self.clock()
+        since = segment.last_run or started_at - self.initial_interval
+        error = None
+        # listagens coletadas e atualizadas desde `since`
+        counts = {"listings": 0, "updated": 0}
+        try:
+            listings = self._stream(segment, since, counts)
+            # a busca é planejada na primeira iteração da coleta; só depois dela se sabe
+            # se a coleta cobre o segmento inteiro e pode gerar `REMOVED`
+            first = next(listings, None)
+            complete = not self.crawler.stats.incomplete_queries
+            if first is not None:
+                listings = chain([first], listings)
+            summary = self.feed(segment).diff(listings, complete=complete)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        stats = self.crawler.stats
+        requests = stats.count_requests + stats.page_requests
+        finished_at = self.clock()
+        listings = counts["listings"]
+
+        changes = 0
+        if error is None:
+            # sem coleta anterior, todas as listagens seriam novas para o feed
+            changes = (
+                counts["updated"]
+                if segment.last_run is None
+                else sum(summary.counts.values())
+            )
+            hours = max(started_at - since, 1.0) / 3600
+            observed = changes / max(listings, 1) / hours
+            rate = (
+                observed
+                if segment.change_rate is None
+                else self.alpha * observed + (1 - self.alpha) * segment.change_rate
+            )
+            interval = self.interval_for(rate)
+            self._conn.execute(
+                "UPDATE segments SET interval = ?, next_run = ?, last_run = ?, "
+                "change_rate = ?, listings = ?, cost = ?, runs = runs + 1 "
+                "WHERE key = ?",
+                (
+                    interval,
+                    finished_at + interval,
+                    started_at,
+                    rate,
+                    listings,
+                    requests,
+                    segment.key,
+                ),
+            )
+        else:
+            self._conn.execute(
+                "UPDATE segments SET next_run = ? WHERE key = ?",
+                (finished_at + segment.interval, segment.key),
+            )
+        self._conn.execute(
+            "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                segment.key,
+                started_at,
+                finished_at,
+                listings,
+                changes,
+                requests,
+                error,
+            ),
+        )
+        return SegmentRun(segment, listings, changes, requests, error)
+
+    def _stream(
+        self, segment: Segment, since: float, counts: dict
+    ) -> Iterator[ListingData]:
+        """
+        Itera sobre as listagens da coleta do segmento, contando-as e entregando-as em
+        lotes a `on_listings`.
+        """
+        batch: List[ListingData] = []
+        for listing in self.crawler.crawl(segment.query):
+            counts["listings"] += 1
+            counts["updated"] += listing.updated_at.timestamp() > since
+            if self.on_listings is not None:
+                batch.append(listing)
+                if len(batch) >= self.batch_size:
+                    self.on_listings(segment.query, batch)
+                    batch = []
+            yield listing
+        if batch:
+            self.on_listings(segment.query, batch)
+
+    def run_pending(self) -> List[SegmentRun]:
+        """
+        Executa os segmentos selecionados por `plan`.
+        """
+        return [self.run_segment(segment) for segment in self.plan()]
+
+    def next_wakeup(self) -> float:
+        """
+        Momento do próximo vencimento de um segmento.
+        """
+        (next_run,) = self._conn.execute(
+            "SELECT MIN(next_run) FROM segments"
+        ).fetchone()
+        return next_run if next_run is not None else self.clock() + self.max_interval
+
+    def run_forever(self, stop: threading.Event, poll_interval: float = 60.0) -> None:
+        """
+        Executa as coletas até que `stop` seja sinalizado. Entre as rodadas, espera o
+        próximo vencimento (ou a liberação do orçamento), no máximo `poll_interval`.
+        """
+        while not stop.is_set():
+            if self.run_pending():
+                continue
+            # nada vencido, ou os vencidos não cabem no orçamento restante
+            wait = self.next_wakeup() - self.clock()
+            stop.wait(min(wait, poll_interval) if wait > 0 else poll_interval)
+
+    def close(self) -> None:
+        self._conn.close()
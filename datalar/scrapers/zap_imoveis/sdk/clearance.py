@@ -0,0 +1,261 @@
+"""
+Cache compartilhado dos cookies de liberação do Cloudflare.
+
+Resolver o desafio do Cloudflare é a etapa mais lenta e mais sujeita a bloqueios das
+requisições feitas pelo cloudscraper. Os cookies obtidos (`cf_clearance`, `__cf_bm`, ...)
+só valem junto com o User-Agent que os obteve e a partir do mesmo IP de saída, então o
+`ClearanceCache` guarda o par cookies/User-Agent por IP de saída (o proxy, ou `direct`)
+num banco SQLite local, compartilhado entre threads e processos, e o reaplica às novas
+sessões até a expiração.
+
+Perto da expiração, um único processo é escolhido para renovar a liberação (resolvendo o
+desafio novamente) enquanto os demais continuam usando a liberação vigente. A expiração
+da última liberação vista fica em memória: fora da margem de renovação, as respostas não
+escrevem no banco.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# chave usada para requisições feitas sem proxy
+DIRECT = "direct"
+
+# prefixos dos cookies definidos pelo Cloudflare
+CLEARANCE_COOKIE_PREFIXES = ("cf_", "__cf", "_cf")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clearance (
+    key TEXT PRIMARY KEY,
+    cookies TEXT NOT NULL,
+    user_agent TEXT NOT NULL,
+    obtained_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    refresh_claimed_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+def clearance_key(proxy_url: Optional[str]) -> str:
+    """
+    Chave do cache para um IP de saída: a URL do proxy sem credenciais, ou `DIRECT`.
+    """
+    if not proxy_url:
+        return DIRECT
+    parts = urlsplit(proxy_url)
+    netloc = parts.hostname or ""
+    if parts.port:
+        netloc = f"{netloc}:{parts.port}"
+    return urlunsplit((parts.scheme, netloc, parts.path, "", ""))
+
+
+@dataclass(frozen=True)
+class Clearance:
+    """
+    Liberação obtida por uma sessão: cookies do Cloudflare e o User-Agent que os obteve.
+    """
+
+    cookies: List[Dict[str, Any]]
+    user_agent: str
+    obtained_at: float
+    expires_at: float
+
+    def fingerprint(self) -> tuple:
+        return self.user_agent, tuple((c["name"], c["value"]) for c in self.cookies)
+
+
+class ClearanceCache:
+    """
+    Armazena liberações do Cloudflare num arquivo SQLite compartilhado.
+
+    :param path: Caminho do banco SQLite. Vários processos podem usar o mesmo arquivo.
+    :param default_ttl: Validade assumida quando o cookie `cf_clearance` não informa
+                        expiração, em segundos.
+    :param refresh_margin: Antecedência, em segundos, com que a liberação passa a ser
+                           renovada antes de expirar.
+    :param refresh_claim: Tempo, em segundos, durante o qual apenas o processo que
+                          assumiu a renovação tenta renová-la.
+    :param clock: Relógio de parede (compartilhado entre processos; substituível em testes).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        default_ttl: float = 30 * 60,
+        refresh_margin: float = 5 * 60,
+        refresh_claim: float = 60,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.refresh_claim = refresh_claim
+        self.clock = clock
+        self._local = threading.local()
+        # (impressão digital, expiração) da última liberação vista por chave, para
+        # evitar escritas repetidas
+        self._known: Dict[str, Tuple[tuple, float]] = {}
+        # impressão digital da última liberação recusada por chave
+        self._rejected: Dict[str, tuple] = {}
+        with self._connection() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Clearance]:
+        """
+        Retorna a liberação vigente para a chave, ou `None` se não houver ou se já expirou.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT cookies, user_agent, obtained_at, expires_at FROM clearance "
+                "WHERE key = ? AND expires_at > ?",
+                (key, self.clock()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return Clearance(json.loads(row[0]), row[1], row[2], row[3])
+
+    def put(self, key: str, clearance: Clearance) -> None:
+        self._connection().execute(
+            "INSERT INTO clearance (key, cookies, user_agent, obtained_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+            "cookies = excluded.cookies, user_agent = excluded.user_agent, "
+            "obtained_at = excluded.obtained_at, expires_at = excluded.expires_at, "
+            "refresh_claimed_until = 0",
+            (
+                key,
+                json.dumps(clearance.cookies),
+                clearance.user_agent,
+                clearance.obtained_at,
+                clearance.expires_at,
+            ),
+        )
+        self._known[key] = (clearance.fingerprint(), clearance.expires_at)
+
+    def invalidate(self, key: str, session: Any = None) -> None:
+        """
+        Remove a liberação da chave, por exemplo quando ela foi recusada pelo Cloudflare.
+        A liberação recusada não volta ao cache, mesmo que uma sessão ainda a tenha.
+
+        :param session: Sessão que usou a liberação recusada; os cookies do Cloudflare
+                        são removidos dela para que o desafio seja resolvido novamente.
+        """
+        self._connection().execute("DELETE FROM clearance WHERE key = ?", (key,))
+        known = self._known.pop(key, None)
+        if known is not None:
+            self._rejected[key] = known[0]
+        clearance = self.from_session(session) if session is not None else None
+        if clearance is not None:
+            self._rejected[key] = clearance.fingerprint()
+            self._drop_cookies(session, clearance)
+
+    def claim_refresh(self, key: str) -> bool:
+        """
+        Tenta assumir a renovação da liberação da chave, se ela estiver perto de expirar.
+        A operação é atômica: apenas um processo a assume por vez.
+
+        :return: `True` se o chamador deve renovar a liberação.
+        """
+        now = self.clock()
+        cursor = self._connection().execute(
+            "UPDATE clearance SET refresh_claimed_until = ? "
+            "WHERE key = ? AND expires_at - ? <= ? AND refresh_claimed_until <= ?",
+            (now + self.refresh_claim, key, self.refresh_margin, now, now),
+        )
+        return cursor.rowcount == 1
+
+    def apply(self, session: Any, key: str) -> bool:
+        """
+        Aplica a liberação em cache a uma nova sessão do cloudscraper.
+        Se a liberação estiver perto de expirar e este processo assumir a renovação, a
+        sessão é mantida sem ela para que o desafio seja resolvido novamente.
+
+        :return: `True` se a liberação foi aplicada.
+        """
+        clearance = self.get(key)
+        if clearance is None or (
+            clearance.expires_at - self.clock() <= self.refresh_margin
+            and self.claim_refresh(key)
+        ):
+            return False
+        session.headers["User-Agent"] = clearance.user_agent
+        for cookie in clearance.cookies:
+            session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain") or "",
+                path=cookie.get("path") or "/",
+                expires=cookie.get("expires"),
+            )
+        self._known[key] = (clearance.fingerprint(), clearance.expires_at)
+        return True
+
+    def update(self, session: Any, key: str) -> None:
+        """
+        Guarda a liberação atual da sessão, se ela mudou desde a última vista.
+        Sessões de longa duração (como as dos proxies) têm os cookies descartados quando
+        este processo assume a renovação, para resolver o desafio na próxima requisição.
+        A renovação só é disputada no banco dentro de `refresh_margin` da expiração.
+        """
+        clearance = self.from_session(session)
+        if clearance is None:
+            return
+        fingerprint = clearance.fingerprint()
+        if self._rejected.get(key) == fingerprint:
+            # a sessão ainda tem a liberação recusada pelo Cloudflare
+            self._drop_cookies(session, clearance)
+            return
+        known = self._known.get(key)
+        if known is None or known[0] != fingerprint:
+            self.put(key, clearance)
+        elif known[1] - self.clock() <= self.refresh_margin and self.claim_refresh(key):
+            self._drop_cookies(session, clearance)
+
+    @staticmethod
+    def _drop_cookies(session: Any, clearance: Clearance) -> None:
+        for cookie in clearance.cookies:
+            session.cookies.clear(cookie["domain"], cookie["path"], cookie["name"])
+
+    def from_session(self, session: Any) -> Optional[Clearance]:
+        """
+        Extrai a liberação dos cookies da sessão, ou `None` se não houver `cf_clearance`.
+        """
+        cookies = [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path,
+                "expires": c.expires,
+            }
+            for c in session.cookies
+            if c.name.startswith(CLEARANCE_COOKIE_PREFIXES)
+        ]
+        clearance = next((c for c in cookies if c["name"] == "cf_clearance"), None)
+        if clearance is None:
+            return None
+        now = self.clock()
+        expires_at = clearance["expires"] or now + self.default_ttl
+        return Clearance(cookies, session.headers["User-Agent"], now, expires_at)
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
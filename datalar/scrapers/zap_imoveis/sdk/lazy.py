@@ -0,0 +1,90 @@
+"""
+Visão preguiçosa (lazy) de listagens da API do Zap Imóveis.
+
+Muitos consumidores leem apenas alguns campos de cada listagem (por exemplo `id`,
+`updated_at` e o preço). `LazyListingData` expõe os mesmos atributos de `ListingData`,
+mas valida e converte cada campo somente no primeiro acesso.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Union
+
+from pydantic import TypeAdapter
+
+from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+from datalar.scrapers.zap_imoveis.sdk.utils import normalize_keys, snake_to_camel
+
+_ADAPTERS: Dict[str, TypeAdapter] = {}
+
+
+def _adapter(name: str) -> TypeAdapter:
+    adapter = _ADAPTERS.get(name)
+    if adapter is None:
+        adapter = _ADAPTERS[name] = TypeAdapter(ListingData.model_fields[name].annotation)
+    return adapter
+
+
+class LazyListingData:
+    """
+    Listagem validada sob demanda.
+
+    :param raw: O objeto `listing` de um item de `search.result.listings`, como dicionário
+                (chaves em camelCase ou já normalizadas) ou como JSON (`str`/`bytes`).
+                JSON só é decodificado no primeiro acesso a um campo.
+
+    Exemplo::
+
+        listing = LazyListingData(item["listing"])
+        listing.id            # valida apenas o campo `id`
+        listing.materialize() # valida a listagem inteira e retorna um `ListingData`
+    """
+
+    __slots__ = ("_raw", "_values")
+
+    def __init__(self, raw: Union[Dict[str, Any], str, bytes]) -> None:
+        self._raw = raw
+        self._values: Dict[str, Any] = {}
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """
+        Os dados brutos da listagem, decodificados se necessário.
+        """
+        if not isinstance(self._raw, dict):
+            self._raw = json.loads(self._raw)
+        return self._raw
+
+    def __getattr__(self, name: str) -> Any:
+        field = ListingData.model_fields.get(name)
+        if field is None:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            )
+
+        values = self._values
+        if name in values:
+            return values[name]
+
+        raw = self.raw
+        key = snake_to_camel(name)
+        if key in raw:
+            value = _adapter(name).validate_python(normalize_keys(raw[key]))
+        elif name in raw:
+            value = _adapter(name).validate_python(normalize_keys(raw[name]))
+        elif field.is_required():
+            raise AttributeError(f"Listing data does not contain required field '{name}'")
+        else:
+            value = field.get_default(call_default_factory=True)
+
+        values[name] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(id={self.raw.get('id')!r})"
+
+    def materialize(self) -> ListingData:
+        """
+        Valida todos os campos e retorna o `ListingData` completo.
+        """
+        return ListingData(**normalize_keys(self.raw))
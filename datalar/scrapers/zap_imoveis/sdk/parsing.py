@@ -0,0 +1,250 @@
+"""
+Validação das listagens: modos de tolerância a mudanças no schema e execução paralela.
+
+No modo `strict`, uma listagem com qualquer campo inválido é descartada. No modo
+`tolerant`, valores de `Literal` desconhecidos (por exemplo, um novo `construction_status`)
+viram `UNKNOWN` e outros valores inválidos são removidos, para que campos opcionais
+assumam o valor padrão; a listagem só é descartada se ainda assim não for válida. Em
+ambos os modos, os erros são contados por campo em `ParseStats`.
+
+A validação dos modelos pydantic é a etapa de maior custo de CPU depois que as páginas são
+baixadas de forma concorrente. Este módulo cria o executor configurado em
+`SDKConfig.PARSE_EXECUTOR` e define a função de validação por lote, no nível do módulo
+para que possa ser enviada a processos.
+
+Em builds com free-threading (Python 3.13t+ com o GIL desabilitado), threads validam em
+paralelo de fato; nos demais builds, o modo `thread` apenas sobrepõe a validação à espera
+da rede, e o modo `process` é o que distribui a validação entre os núcleos. Cada chamada
+espera todos os seus lotes serem validados: a sobreposição com a rede vem de chamadores
+concorrentes (por exemplo, os workers do crawler), não da próxima página do mesmo
+chamador.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from datalar.scrapers.zap_imoveis.sdk.schemas import (
+    TOLERANT_CONTEXT,
+    UNKNOWN,
+    ListingData,
+)
+from datalar.scrapers.zap_imoveis.sdk.utils import normalize_keys
+
+ParseExecutorKind = Literal["inline", "thread", "process", "auto"]
+PARSE_EXECUTORS = ("inline", "thread", "process", "auto")
+ParseMode = Literal["strict", "tolerant"]
+
+# lotes menores não compensam o custo de despacho (e de serialização, entre processos)
+MIN_CHUNK_SIZE = 16
+
+
+def free_threading_enabled() -> bool:
+    """
+    Indica se o interpretador está rodando sem o GIL (build free-threaded, 3.13+).
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def resolve_executor_kind(kind: ParseExecutorKind) -> str:
+    """
+    Resolve o modo `auto`: threads quando o GIL está desabilitado, processos caso contrário.
+    """
+    if kind not in PARSE_EXECUTORS:
+        raise ValueError(
+            f"Invalid parse executor {kind!r}, expected one of {PARSE_EXECUTORS}"
+        )
+    if kind == "auto":
+        return "thread" if free_threading_enabled() else "process"
+    return kind
+
+
+def create_parse_executor(
+    kind: ParseExecutorKind, workers: Optional[int] = None
+) -> Optional[Executor]:
+    """
+    Cria o executor de validação.
+
+    :param kind: `inline` (sem executor), `thread`, `process` ou `auto`.
+    :param workers: Número de workers. Por padrão, o número de CPUs disponíveis.
+    :return: O executor, ou `None` no modo `inline`.
+    """
+    kind = resolve_executor_kind(kind)
+    if kind == "inline":
+        return None
+    workers = workers or os.cpu_count() or 1
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zap-parse")
+
+    import multiprocessing
+
+    # "spawn" evita herdar, via fork, o estado das threads de rede do processo pai
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@dataclass
+class ParseStats:
+    """
+    Contadores da validação das listagens.
+
+    :ivar parsed: Listagens válidas sem nenhuma correção.
+    :ivar recovered: Listagens mantidas após correções do modo `tolerant`.
+    :ivar dropped: Listagens descartadas.
+    :ivar field_errors: Erros por campo, com os índices de listas omitidos
+                        (por exemplo, `pricing_infos.business_type`).
+    """
+
+    parsed: int = 0
+    recovered: int = 0
+    dropped: int = 0
+    field_errors: Counter = field(default_factory=Counter)
+
+    def merge(self, other: ParseStats) -> None:
+        self.parsed += other.parsed
+        self.recovered += other.recovered
+        self.dropped += other.dropped
+        self.field_errors.update(other.field_errors)
+
+
+def _field_path(loc: Tuple[Any, ...]) -> str:
+    return ".".join(str(part) for part in loc if not isinstance(part, int))
+
+
+def _resolve(data: Any, loc: Tuple[Any, ...]) -> List[Any]:
+    """
+    O maior prefixo de `loc` presente em `data`. Os itens restantes são campos ausentes
+    ou rótulos de uniões (por exemplo, `function-wrap[...]`).
+    """
+    path, container = [], data
+    for part in loc:
+        try:
+            container = container[part]
+        except (KeyError, IndexError, TypeError):
+            break
+        path.append(part)
+    return path
+
+
+def _walk(data: Any, path: List[Any]) -> Any:
+    for part in path:
+        data = data[part]
+    return data
+
+
+def _repair(data: Dict[str, Any], errors: List[Dict[str, Any]]) -> bool:
+    """
+    Corrige `data` no lugar a partir dos erros de validação: valores de `Literal`
+    desconhecidos viram `UNKNOWN` e os demais valores inválidos são removidos. Um item de
+    lista sem um campo obrigatório (ausente ou removido numa correção anterior) é
+    removido da lista, sem afetar o restante da listagem.
+
+    :return: `False` se algum erro não puder ser corrigido (campo obrigatório ausente
+             fora de uma lista).
+    """
+    removals: Dict[Tuple[int, Any], Tuple[Any, Any]] = {}
+    for error in errors:
+        path = _resolve(data, error["loc"])
+        if error["type"] == "literal_error" and path:
+            _walk(data, path[:-1])[path[-1]] = UNKNOWN
+            continue
+        if error["type"] == "missing":
+            indices = [i for i, part in enumerate(path) if isinstance(part, int)]
+            if not indices:
+                return False
+            # remove o item da lista mais interna que contém o campo ausente
+            path = path[: indices[-1] + 1]
+        elif not path:
+            return False
+        container = _walk(data, path[:-1])
+        removals[id(container), path[-1]] = (container, path[-1])
+    # remove de trás para frente para manter válidos os índices de listas
+    for container, key in sorted(
+        removals.values(),
+        key=lambda item: item[1] if isinstance(item[1], int) else -1,
+        reverse=True,
+    ):
+        del container[key]
+    return True
+
+
+def parse_listing(
+    listing: Dict[str, Any],
+    mode: ParseMode = "strict",
+    stats: Optional[ParseStats] = None,
+) -> ListingData:
+    """
+    Valida um objeto `listing` da API.
+
+    :param listing: O objeto `listing` (chaves em camelCase ou já normalizadas).
+    :param mode: `strict` ou `tolerant` (ver a documentação do módulo).
+    :param stats: Contadores a atualizar.
+    :return: A listagem validada.
+    :raises ValidationError: Se a listagem não puder ser validada no modo escolhido.
+    """
+    stats = stats if stats is not None else ParseStats()
+    data = normalize_keys(listing)
+    try:
+        parsed = ListingData(**data)
+    except ValidationError as e:
+        errors = e.errors()
+        stats.field_errors.update(_field_path(error["loc"]) for error in errors)
+        if mode != "tolerant" or not _repair(data, errors):
+            stats.dropped += 1
+            raise
+        # a remoção de um campo obrigatório inválido dentro de um item de lista só
+        # aparece na nova validação (campo ausente): a segunda correção remove o item
+        for attempt in range(2):
+            try:
+                parsed = ListingData.model_validate(data, context=TOLERANT_CONTEXT)
+                break
+            except ValidationError as retry:
+                if attempt or not _repair(data, retry.errors()):
+                    stats.dropped += 1
+                    raise
+        stats.recovered += 1
+        return parsed
+    stats.parsed += 1
+    return parsed
+
+
+def parse_listings_chunk(
+    listings: Sequence[Dict[str, Any]],
+    mode: ParseMode = "strict",
+) -> Tuple[List[ListingData], List[str], ParseStats]:
+    """
+    Valida um lote de objetos `listing` da API.
+
+    :param listings: Os objetos `listing` (chaves em camelCase).
+    :param mode: `strict` ou `tolerant`.
+    :return: As listagens válidas, as mensagens de erro das descartadas e os contadores.
+    """
+    parsed, errors, stats = [], [], ParseStats()
+    for listing in listings:
+        try:
+            parsed.append(parse_listing(listing, mode, stats))
+        except ValidationError as e:
+            errors.append(f"Error parsing listing {listing.get('id')!r}: {e}")
+        except Exception as e:
+            stats.dropped += 1
+            errors.append(f"Error parsing listing data: {e}")
+    return parsed, errors, stats
+
+
+def split_chunks(items: Sequence[Any], parts: int) -> List[Sequence[Any]]:
+    """
+    Divide `items` em até `parts` lotes contíguos de pelo menos `MIN_CHUNK_SIZE` itens.
+    """
+    if not items:
+        return []
+    parts = max(1, min(parts, len(items) // MIN_CHUNK_SIZE))
+    size = -(-len(items) // parts)
+    return [items[i : i + size] for i in range(0, len(items), size)]
@@ -1,14 +1,48 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, TypedDict, Union
-
-import cloudscraper
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypedDict,
+    Union,
+)
 
 if TYPE_CHECKING:
+    # cloudscraper (e, por consequência, requests e os interpretadores JS) só é
+    # importado na primeira requisição, para não pesar no import da SDK
+    import cloudscraper
+    import httpx
+
     from datalar.scrapers.zap_imoveis.sdk.sdk import ZapGlueAPI
 
 
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+@lru_cache(maxsize=1)
+def accepted_encodings() -> str:
+    """
+    Codificações de conteúdo aceitas nas respostas, em ordem de preferência.
+    Brotli e zstd só são anunciados se houver decodificador instalado, já que tanto o
+    requests (cloudscraper) quanto o httpx dependem dos pacotes `brotli` e `zstandard`.
+    """
+    encodings = []
+    if find_spec("zstandard"):
+        encodings.append("zstd")
+    if find_spec("brotli") or find_spec("brotlicffi"):
+        encodings.append("br")
+    encodings.extend(("gzip", "deflate"))
+    return ", ".join(encodings)
+
+
 class BaseHTTPError(Exception):
     """Classe base para erros HTTP personalizados."""
 
@@ -85,6 +119,7 @@ class Route(ABC):
         H = {
             # "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:141.0) Gecko/20100101 Firefox/141.0",
             "Accept": "*/*",
+            "Accept-Encoding": accepted_encodings(),
             "x-domain": ".zapimoveis.com.br",
         }
         return H
@@ -140,32 +175,150 @@ class Route(ABC):
         resource_name: str = "",
         params: Dict[str, Any] | None = None,
         timeout: Optional[float] = None,
-    ) -> cloudscraper.requests.Response:
+        stream: bool = False,
+    ) -> Union[cloudscraper.requests.Response, httpx.Response]:
         """
         Realiza uma requisição GET para o recurso especificado.
+        Com `SDKConfig.HTTP2` habilitado, a requisição é feita pelo cliente HTTP/2
+        compartilhado da SDK; caso contrário, por uma nova sessão do cloudscraper.
+        Com `SDKConfig.PROXY_POOL`, a requisição passa pelo proxy mais saudável do pool,
+        usando a sessão fixa desse proxy. Com `SDKConfig.SINGLE_FLIGHT`, requisições
+        idênticas simultâneas compartilham uma única chamada e a mesma resposta.
 
         :param resource_name: O nome do recurso para o qual a requisição deve ser feita.
         :param params: Parâmetros de consulta opcionais para a requisição.
         :param timeout: Tempo limite opcional para a requisição.
+        :param stream: Se verdadeiro, o corpo da resposta não é lido antecipadamente; use
+                       `iter_content` para consumi-lo e feche a resposta ao final.
         :return: A resposta HTTP da requisição.
+        :raises NoProxyAvailableError: Se `SDKConfig.PROXY_POOL` não tiver proxy disponível.
         """
         url = self.build_url(resource_name=resource_name)
         headers = self.build_headers()
+        timeout = timeout or self.sdk.config.DEFAULT_TIMEOUT
 
-        scapper = cloudscraper.create_scraper()
-        resp = scapper.get(
-            url,
-            headers=headers,
-            params=params,
-            timeout=timeout or self.sdk.config.DEFAULT_TIMEOUT,
-        )
+        # respostas em modo stream só podem ser consumidas uma vez, então não são compartilhadas
+        if self.sdk.config.SINGLE_FLIGHT and not stream:
+            from datalar.scrapers.zap_imoveis.sdk.singleflight import request_key
+
+            return self.sdk.single_flight.do(
+                request_key("GET", url, params),
+                lambda: self._request(url, headers, params, timeout, stream),
+            )
+        return self._request(url, headers, params, timeout, stream)
+
+    def _request(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        params: Dict[str, Any] | None,
+        timeout: float,
+        stream: bool,
+    ) -> Union[cloudscraper.requests.Response, httpx.Response]:
+        pool = self.sdk.config.PROXY_POOL
+        if pool is None:
+            resp = self._send(url, headers, params, timeout, stream)
+        else:
+            with pool.lease() as lease:
+                session = lease.session(self.sdk.create_proxy_session)
+                resp = self._send(
+                    url, headers, params, timeout, stream, session, lease.proxy.proxies
+                )
+                lease.report(resp.status_code)
+                if stream:
+                    # em modo stream, o corpo ainda será lido pela sessão do proxy: a
+                    # reserva só termina quando a resposta for fechada
+                    lease.detach()
+                    self._close_with(resp, lease.close)
 
         if self.sdk.config.LOG_REQUESTS:
             self.log_request("GET", url, headers, params)
 
         if self.sdk.config.RAISE_FOR_STATUS:
-            self.raise_for_status(resp)
-
-        if self.sdk.config.LOG_RESPONSES:
+            streaming_error = stream and resp.status_code not in (200, 201, 204)
+            try:
+                if streaming_error and self.sdk.config.HTTP2:
+                    # o httpx em modo stream exige ler a resposta antes de acessar `text`
+                    resp.read()
+                self.raise_for_status(resp)
+            except Exception:
+                if stream:
+                    resp.close()
+                raise
+
+        # o log da resposta exige o corpo inteiro, então é ignorado em modo stream
+        if self.sdk.config.LOG_RESPONSES and not stream:
             self.log_response(resp)
         return resp
+
+    def _send(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        params: Dict[str, Any] | None,
+        timeout: float,
+        stream: bool,
+        session: Any = None,
+        proxies: Dict[str, str] | None = None,
+    ) -> Union[cloudscraper.requests.Response, httpx.Response]:
+        if self.sdk.config.HTTP2:
+            # o proxy de um cliente httpx é definido na criação da sessão
+            client = session or self.sdk.http_client
+            request = client.build_request(
+                "GET", url, headers=headers, params=params, timeout=timeout
+            )
+            return client.send(request, stream=stream)
+
+        if session is None:
+            session = self.sdk.create_scraper()
+        resp = session.get(
+            url,
+            headers=headers,
+            params=params,
+            timeout=timeout,
+            stream=stream,
+            proxies=proxies,
+        )
+
+        cache = self.sdk.config.CLEARANCE_CACHE
+        if cache is not None:
+            from datalar.scrapers.zap_imoveis.sdk.clearance import clearance_key
+
+            key = clearance_key(proxies and proxies["https"])
+            if resp.status_code == 403:
+                # a liberação foi recusada: sai do cache e da sessão, e a próxima
+                # requisição resolve o desafio novamente
+                cache.invalidate(key, session)
+            else:
+                cache.update(session, key)
+        return resp
+
+    @staticmethod
+    def _close_with(
+        response: Union[cloudscraper.requests.Response, httpx.Response],
+        callback: Callable[[], None],
+    ) -> None:
+        """
+        Faz `response.close()` chamar também `callback`.
+        """
+        close = response.close
+
+        def close_and_release() -> None:
+            try:
+                close()
+            finally:
+                callback()
+
+        response.close = close_and_release
+
+    @staticmethod
+    def iter_content(
+        response: Union[cloudscraper.requests.Response, httpx.Response],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Itera sobre o corpo (já descomprimido) de uma resposta obtida com `stream=True`.
+        """
+        if hasattr(response, "iter_bytes"):
+            return response.iter_bytes(chunk_size)
+        return response.iter_content(chunk_size)
@@ -1,13 +1,39 @@
-from typing import Literal
+import os
+import threading
+from concurrent.futures import Executor
+from functools import partial
+from typing import TYPE_CHECKING, Iterator, Literal, Optional, Union
 
+from datalar.scrapers.zap_imoveis.sdk.lazy import LazyListingData
+from datalar.scrapers.zap_imoveis.sdk.parsing import (
+    MIN_CHUNK_SIZE,
+    ParseStats,
+    parse_listings_chunk,
+    split_chunks,
+)
 from datalar.scrapers.zap_imoveis.sdk.routes.base import Route
-from datalar.scrapers.zap_imoveis.sdk.schemas import FullSearchResponseFields, ListingData
+from datalar.scrapers.zap_imoveis.sdk.schemas import (
+    FullSearchResponseFields,
+    ListingData,
+    SearchResponseFields,
+)
+from datalar.scrapers.zap_imoveis.sdk.streaming import iter_json_array
+from datalar.scrapers.zap_imoveis.sdk.utils import normalize_keys
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.sdk import ZapGlueAPI
 
 
 class Listings(Route):
 
     resource_base_url = "listings"
 
+    def __init__(self, sdk: "ZapGlueAPI") -> None:
+        super().__init__(sdk)
+        # contadores da validação das listagens (ver `SDKConfig.PARSE_MODE`)
+        self.parse_stats = ParseStats()
+        self._parse_stats_lock = threading.Lock()
+
     def search(
         self,
         *,
@@ -18,7 +44,23 @@ class Listings(Route):
         size: int = 10,
         _from: int = 0,
         parse_data: bool = True,
+        lazy: bool = False,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        usable_area_min: Optional[int] = None,
+        usable_area_max: Optional[int] = None,
+        address_state: Optional[str] = None,
+        address_city: Optional[str] = None,
+        address_neighborhood: Optional[str] = None,
+        stream: bool = False,
     ):
+        """
+        Busca listagens.
+
+        Com `stream=True`, o corpo da resposta é decodificado incrementalmente e o retorno é
+        um gerador que produz cada listagem assim que ela é recebida, sem manter a resposta
+        inteira em memória. Nesse modo `parse_data` é ignorado.
+        """
         assert size > 0, "Size must be greater than 0"
         assert size <= 110, "Size must be less than or equal to 110"
 
@@ -34,6 +76,19 @@ class Listings(Route):
             "page": page,
             "from": _from,
         }
+        filters = {
+            "priceMin": price_min,
+            "priceMax": price_max,
+            "usableAreasMin": usable_area_min,
+            "usableAreasMax": usable_area_max,
+            "addressState": address_state,
+            "addressCity": address_city,
+            "addressNeighborhood": address_neighborhood,
+        }
+        payload.update({k: v for k, v in filters.items() if v is not None})
+
+        if stream:
+            return self._stream_listings(self.get(params=payload, stream=True), lazy=lazy)
 
         resp = self.get(
             params=payload,
@@ -41,43 +96,116 @@ class Listings(Route):
         data = resp.json()
         if not parse_data:
             return data
-        return self._parse_listing_data(data)
-        
-    def _parse_listing_data(self, data: dict) -> list[ListingData]:
+        return self._parse_listing_data(data, lazy=lazy)
+
+    def count(self, **filters) -> int:
+        """
+        Retorna o total de listagens reportado pela API para uma busca, sem recuperar as listagens.
+
+        :param filters: Os mesmos filtros aceitos por `search` (business_type, listing_type,
+                        price_min, address_city, etc.).
+        :return: O valor de `search.totalCount` da resposta.
+        """
+        data = self.search(
+            include_fields=FullSearchResponseFields(
+                search=SearchResponseFields(total_count=True)
+            ),
+            size=1,
+            parse_data=False,
+            **filters,
+        )
+        try:
+            return int(data["search"]["totalCount"])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Api response does not contain expected keys {e}") from e
+
+    def _parse_listing_data(
+        self, data: dict, lazy: bool = False
+    ) -> list[ListingData] | list[LazyListingData]:
         try:
             listings = data["search"]["result"]["listings"]
+            if lazy:
+                return [LazyListingData(listing["listing"]) for listing in listings]
+
+            executor = self.sdk.parse_executor
+            if executor is not None and len(listings) >= 2 * MIN_CHUNK_SIZE:
+                return self._parse_in_executor(
+                    executor, [listing["listing"] for listing in listings]
+                )
 
             parsed_data = []
             for listing in listings:
-                try:
-                    normalized_data = self._normalize_keys(listing['listing'])
-                    parsed_data.append(ListingData(**normalized_data))
-                except Exception as e:
-                    import ipdb; ipdb.set_trace()
-                    self.sdk.logger.error(f"Error parsing listing data: {e}")
-                    continue
+                parsed = self._parse_listing(listing['listing'])
+                if parsed is not None:
+                    parsed_data.append(parsed)
             return parsed_data
 
         except KeyError as e:
             raise ValueError(f"Api response does not contain expected keys {e}") from e
 
+    def _parse_in_executor(
+        self, executor: Executor, listings: list[dict]
+    ) -> list[ListingData]:
+        """
+        Valida as listagens em lotes no executor de validação, preservando a ordem.
+
+        A chamada bloqueia até que todos os lotes sejam validados, então não se sobrepõe
+        à busca da próxima página do mesmo chamador; o ganho vem de dividir páginas com
+        pelo menos `2 * MIN_CHUNK_SIZE` listagens entre os workers e de chamadores
+        concorrentes compartilharem o executor (veja `benchmarks/bench_parse.py
+        --callers`).
+        """
+        workers = self.sdk.config.PARSE_WORKERS or os.cpu_count() or 1
+        parse_chunk = partial(parse_listings_chunk, mode=self.sdk.config.PARSE_MODE)
+        parsed_data = []
+        for parsed, errors, stats in executor.map(
+            parse_chunk, split_chunks(listings, workers)
+        ):
+            parsed_data.extend(parsed)
+            self._record_parse(stats, errors)
+        return parsed_data
+
+    def _parse_listing(self, listing: dict) -> Optional[ListingData]:
+        parsed, errors, stats = parse_listings_chunk(
+            [listing], mode=self.sdk.config.PARSE_MODE
+        )
+        self._record_parse(stats, errors)
+        return parsed[0] if parsed else None
+
+    def _record_parse(self, stats: ParseStats, errors: list[str]) -> None:
+        with self._parse_stats_lock:
+            self.parse_stats.merge(stats)
+        for error in errors:
+            self.sdk.logger.error(error)
+
+    def _stream_listings(
+        self, resp, lazy: bool = False
+    ) -> Iterator[Union[ListingData, LazyListingData]]:
+        """
+        Decodifica as listagens de uma resposta obtida com `stream=True`, uma a uma.
+        A resposta é fechada ao final da iteração (ou quando o gerador é descartado).
+        """
+        try:
+            items = iter_json_array(
+                self.iter_content(resp), ("search", "result", "listings")
+            )
+            for item in items:
+                if lazy:
+                    yield LazyListingData(item["listing"])
+                    continue
+                parsed = self._parse_listing(item["listing"])
+                if parsed is not None:
+                    yield parsed
+        except KeyError as e:
+            raise ValueError(f"Api response does not contain expected keys {e}") from e
+        finally:
+            resp.close()
+
     def _normalize_keys(self, data: dict) -> dict:
         """
         Normaliza as chaves do dicionário de dados para o formato esperado pelo modelo ListingData.
         """
-        normalized_data = {}
-        for key, value in data.items():
-            # Converte chaves camelCase para snake_case
-            for char in key:
-                if char.isupper():
-                    key = key.replace(char, f"_{char.lower()}")
-
-            if isinstance(value, dict):
-                value = self._normalize_keys(value)
-            if isinstance(value, list):
-                value = [self._normalize_keys(item) if isinstance(item, dict) else item for item in value]
-            normalized_data[key] = value
-        return normalized_data
+        return normalize_keys(data)
 if __name__ == "__main__":
     from datalar.scrapers.zap_imoveis.sdk.sdk import ZapGlueAPI, SDKConfig
     sdk = ZapGlueAPI(SDKConfig(RAISE_FOR_STATUS=False))
@@ -1,7 +1,34 @@
 import datetime as dt
-from typing import Literal, Optional, Union
+from typing import Annotated, Any, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    HttpUrl,
+    ValidationInfo,
+    ValidatorFunctionWrapHandler,
+    WrapValidator,
+)
+
+# Valor atribuído aos campos `Literal` quando a API retorna um valor ainda não mapeado
+# (ver `SDKConfig.PARSE_MODE`).
+UNKNOWN = "UNKNOWN"
+# Contexto de validação do modo `tolerant`
+TOLERANT_CONTEXT = {"tolerant": True}
+
+
+def _accept_unknown(
+    value: Any, handler: ValidatorFunctionWrapHandler, info: ValidationInfo
+) -> Any:
+    # `UNKNOWN` só é aceito no modo `tolerant`: no `strict`, continua inválido
+    if value == UNKNOWN and info.context and info.context.get("tolerant"):
+        return value
+    return handler(value)
+
+
+# Marca os campos `Literal` que aceitam `UNKNOWN` no modo `tolerant`
+TOLERANT = WrapValidator(_accept_unknown)
 
 
 class BaseFieldsModel(BaseModel):
@@ -10,6 +37,9 @@ class BaseFieldsModel(BaseModel):
     This model can be extended to create specific field models for different objects.
     """
 
+    # O schema de validação só é construído na primeira instanciação, reduzindo o custo de import.
+    model_config = ConfigDict(defer_build=True)
+
     def include_all(self):
         """
         Retorna uma nova instância do modelo contendo todos os campos.
@@ -626,7 +656,16 @@ class FullSearchResponseFields(BaseFieldsModel):
     )
 
 
-class PropertyDevelopersData(BaseModel):
+class BaseDataModel(BaseModel):
+    """
+    Base para os modelos que representam os dados retornados pela API.
+    """
+
+    # O schema de validação só é construído na primeira validação, reduzindo o custo de import.
+    model_config = ConfigDict(defer_build=True)
+
+
+class PropertyDevelopersData(BaseDataModel):
     """
     Representa os dados de um desenvolvedor de propriedades.
     Esta classe é usada para definir a estrutura dos dados retornados pela API.
@@ -639,13 +678,13 @@ class PropertyDevelopersData(BaseModel):
     )
 
 
-class ListingDataRentalInfos(BaseModel):
+class ListingDataRentalInfos(BaseDataModel):
     """
     Representa as informações de aluguel de uma listagem de imóvel.
     Esta classe é usada para definir a estrutura dos dados retornados pela API.
     """
 
-    period: Literal["MONTHLY", "YEARLY", "DAILY","Period_NONE"] = Field(
+    period: Annotated[Literal["MONTHLY", "YEARLY", "DAILY","Period_NONE"], TOLERANT] = Field(
         ...,
         description="Período do aluguel. Pode ser 'MONTHLY' (mensal) ou 'YEARLY' (anual).",
     )
@@ -659,13 +698,13 @@ class ListingDataRentalInfos(BaseModel):
     )
 
 
-class ListingDataPricingInfos(BaseModel):
+class ListingDataPricingInfos(BaseDataModel):
     """
     Representa as informações de preços de uma listagem de imóvel.
     Esta classe é usada para definir a estrutura dos dados retornados pela API.
     """
 
-    iptu_period: Literal["MONTHLY", "YEARLY", "Period_NONE"] | None = Field(
+    iptu_period: Annotated[Literal["MONTHLY", "YEARLY", "Period_NONE"], TOLERANT] | None = Field(
         None,
         description="Período do IPTU. Pode ser 'MONTHLY' (mensal) ou 'YEARLY' (anual).",
     )
@@ -681,7 +720,7 @@ class ListingDataPricingInfos(BaseModel):
         None,
         description="Taxa de condomínio mensal.",
     )
-    business_type: Literal["RENTAL", "SALE"] = Field(
+    business_type: Annotated[Literal["RENTAL", "SALE"], TOLERANT] = Field(
         ...,
         description="Tipo de negócio. Pode ser 'RENTAL' (aluguel) ou 'SALE' (venda).",
     )
@@ -691,7 +730,7 @@ class ListingDataPricingInfos(BaseModel):
     )
 
 
-class ListingDataAddressPoint(BaseModel):
+class ListingDataAddressPoint(BaseDataModel):
     """
     Representa o ponto geográfico de um endereço de listagem de imóvel.
     Esta classe é usada para definir a estrutura dos dados retornados pela API.
@@ -744,7 +783,7 @@ class ListingDataAddressPoint(BaseModel):
         return v
 
 
-class ListingDataAddress(BaseModel):
+class ListingDataAddress(BaseDataModel):
     """
     Representa o endereço de uma listagem de imóvel.
     Esta classe é usada para definir a estrutura dos dados retornados pela API.
@@ -784,7 +823,7 @@ class ListingDataAddress(BaseModel):
     )
 
 
-class ListingData(BaseModel):
+class ListingData(BaseDataModel):
     """
     Representa os dados de uma listagem de imóvel.
     Esta classe é usada para definir a estrutura dos dados retornados pela API.
@@ -795,7 +834,7 @@ class ListingData(BaseModel):
     Alguns campos foram ignorados por ser considerados desnecessários ou irrelevantes para a maioria dos casos de uso.
     """
 
-    contract_type: Literal["REAL_ESTATE", "OWNER", "PROPERY_DEVELOPER"] = Field(
+    contract_type: Annotated[Literal["REAL_ESTATE", "OWNER", "PROPERY_DEVELOPER"], TOLERANT] = Field(
         ...,
         description="Tipo de contrato de quem publicou o Imóvel. Pode ser 'REAL_STATE' (Imobiliária) ou 'OWNER' (Proprietário).",
     )
@@ -805,7 +844,7 @@ class ListingData(BaseModel):
     )
     source_id: str = Field(..., description="ID da fonte de dados da listagem.")
 
-    display_address_type: Literal["ALL", "STREET", "NEIGHBORHOOD"] = Field(
+    display_address_type: Annotated[Literal["ALL", "STREET", "NEIGHBORHOOD"], TOLERANT] = Field(
         ...,
         description="Como o endereço deve ser exibido. Pode ser 'ALL' (exibir endereço completo), 'STREET' (exibir apenas a rua) ou 'NEIGHBORHOOD' (exibir apenas o bairro).",
     )
@@ -817,10 +856,11 @@ class ListingData(BaseModel):
         ...,
         description="Lista de áreas utilizáveis da propriedade, em metros quadrados.",
     )
-    construction_status: Literal[
-        "PLAN_ONLY", "UNDER_CONSTRUCTION", "BUILT", "ConstructionStatus_NONE"
+    construction_status: Annotated[
+        Literal["PLAN_ONLY", "UNDER_CONSTRUCTION", "BUILT", "ConstructionStatus_NONE"],
+        TOLERANT,
     ] = Field(..., description="Status de construção da propriedade.")
-    listing_type: Literal["USED", "DEVELOPMENT"] = Field(
+    listing_type: Annotated[Literal["USED", "DEVELOPMENT"], TOLERANT] = Field(
         ...,
         description="Tipo de listagem. Pode ser 'USED' (Imóvel pronto) ou 'DEVELOPMENT' (Imóvel na planta/em desenvolvimento/ recentemente lançado).",
     )
@@ -835,7 +875,7 @@ class ListingData(BaseModel):
         ..., description="Lista de andares disponíveis na propriedade."
     )
     unit_types: list[
-        Literal[
+        Annotated[Literal[
             "APARTMENT",
             "OFFICE",
             "ALLOTMENT_LAND",
@@ -849,7 +889,7 @@ class ListingData(BaseModel):
             "BUSINESS",
             "COMMERCIAL_BUILDING",
             "COMMERCIAL_PROPERTY"
-        ]
+        ], TOLERANT]
     ] = Field(..., description="Lista de tipos de unidades relacionados á propriedade.")
     condominium_name: str = Field(
         "", description="Nome do condomínio, se aplicável à propriedade."
@@ -902,7 +942,7 @@ class ListingData(BaseModel):
         [],
         description="Lista de comodidades mescladas, que podem ser agrupadas ou combinadas.",
     )
-    status: Literal["ACTIVE",] = Field(
+    status: Annotated[Literal["ACTIVE",], TOLERANT] = Field(
         ...,
         description="Status atual da listagem. Pode ser 'ACTIVE' (ativa) ou outros status definidos pela API.",
     )
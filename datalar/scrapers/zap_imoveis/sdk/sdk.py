@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Literal, Optional
-
-from loguru._logger import Logger
+from typing import TYPE_CHECKING, Any, Literal, Optional, Sequence, Union
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    import httpx
+    from loguru._logger import Logger
+
+    from datalar.scrapers.zap_imoveis.sdk.clearance import ClearanceCache
+    from datalar.scrapers.zap_imoveis.sdk.proxies import Proxy, ProxyPool
+    from datalar.scrapers.zap_imoveis.sdk.singleflight import SingleFlight
+
     from datalar.scrapers.zap_imoveis.sdk.routes.listings import Listings
 
+# User-Agent de navegador usado pelo cliente HTTP/2; o cloudscraper gera o próprio.
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:141.0) Gecko/20100101 Firefox/141.0"
+)
+
 
 @dataclass(init=True)
 class SDKConfig:
@@ -21,10 +34,38 @@ class SDKConfig:
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
     DEFAULT_TIMEOUT: int = 10
     RAISE_FOR_STATUS: bool = True
+    # Usa um cliente httpx com HTTP/2, multiplexando as requisições concorrentes
+    # em poucas conexões, no lugar do cloudscraper (HTTP/1.1, uma conexão por requisição).
+    HTTP2: bool = False
+    HTTP2_MAX_CONNECTIONS: int = 4
+    # Distribui as requisições entre proxies (um `ProxyPool` ou uma lista de URLs).
+    PROXY_POOL: Union[ProxyPool, Sequence[str], None] = None
+    # Reaproveita as liberações do Cloudflare entre sessões, threads e processos
+    # (um `ClearanceCache` ou o caminho do arquivo SQLite compartilhado).
+    CLEARANCE_CACHE: Union[ClearanceCache, str, None] = None
+    # Requisições GET idênticas e simultâneas compartilham uma única chamada à API.
+    SINGLE_FLIGHT: bool = False
+    # Executor da validação das listagens: "inline" (na thread da requisição), "thread",
+    # "process" ou "auto" (threads em builds free-threaded, processos caso contrário).
+    PARSE_EXECUTOR: Literal["inline", "thread", "process", "auto"] = "inline"
+    PARSE_WORKERS: Optional[int] = None
+    # "strict" descarta listagens com qualquer campo inválido; "tolerant" converte valores
+    # desconhecidos de enums para "UNKNOWN" e remove os demais valores inválidos, mantendo
+    # o restante da listagem. Os erros por campo ficam em `listings.parse_stats`.
+    PARSE_MODE: Literal["strict", "tolerant"] = "strict"
 
     logger: Optional[Logger] = None
 
     def __post_init__(self):
+        if self.PROXY_POOL is not None and not hasattr(self.PROXY_POOL, "lease"):
+            from datalar.scrapers.zap_imoveis.sdk.proxies import ProxyPool
+
+            self.PROXY_POOL = ProxyPool(self.PROXY_POOL)
+        if isinstance(self.CLEARANCE_CACHE, str):
+            from datalar.scrapers.zap_imoveis.sdk.clearance import ClearanceCache
+
+            self.CLEARANCE_CACHE = ClearanceCache(self.CLEARANCE_CACHE)
+
         if not self.logger:
             import sys
 
@@ -42,9 +83,118 @@ class ZapGlueAPI:
         self.config = config or SDKConfig()
         self.logger = self.config.logger
 
+        self._http_client: httpx.Client | None = None
+        self._single_flight: SingleFlight | None = None
+        self._parse_executor: Executor | None = None
+        self._lock = threading.Lock()
+
         # routes
         self._listings: Listings | None = None
 
+    @property
+    def http_client(self) -> httpx.Client:
+        """
+        Cliente HTTP/2 compartilhado pelas rotas quando `SDKConfig.HTTP2` está habilitado.
+        O cliente é seguro para uso entre threads e é criado no primeiro acesso.
+        """
+        if not self._http_client:
+            # como no `single_flight`, threads concorrentes devem compartilhar um único
+            # cliente (e seu pool de conexões)
+            with self._lock:
+                if not self._http_client:
+                    self._http_client = self.create_http_client()
+        return self._http_client
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        """
+        Coalescedor das requisições simultâneas idênticas (`SDKConfig.SINGLE_FLIGHT`).
+        Suas estatísticas ficam em `single_flight.stats`.
+        """
+        if not self._single_flight:
+            from datalar.scrapers.zap_imoveis.sdk.singleflight import SingleFlight
+
+            # a criação é protegida para que threads concorrentes usem o mesmo coalescedor
+            with self._lock:
+                if not self._single_flight:
+                    self._single_flight = SingleFlight()
+        return self._single_flight
+
+    @property
+    def parse_executor(self) -> Executor | None:
+        """
+        Executor usado para validar as listagens em paralelo (`SDKConfig.PARSE_EXECUTOR`),
+        ou `None` no modo "inline".
+        """
+        if self._parse_executor is None and self.config.PARSE_EXECUTOR != "inline":
+            from datalar.scrapers.zap_imoveis.sdk.parsing import create_parse_executor
+
+            with self._lock:
+                if self._parse_executor is None:
+                    self._parse_executor = create_parse_executor(
+                        self.config.PARSE_EXECUTOR, self.config.PARSE_WORKERS
+                    )
+        return self._parse_executor
+
+    def create_http_client(self, proxy: Optional[str] = None) -> httpx.Client:
+        """
+        Cria um cliente HTTP/2 com as configurações da SDK.
+
+        :param proxy: URL do proxy pelo qual as requisições do cliente devem passar.
+        """
+        import httpx
+
+        return httpx.Client(
+            http2=True,
+            headers={"User-Agent": DEFAULT_USER_AGENT},
+            timeout=self.config.DEFAULT_TIMEOUT,
+            limits=httpx.Limits(max_connections=self.config.HTTP2_MAX_CONNECTIONS),
+            proxy=proxy,
+        )
+
+    def create_proxy_session(self, proxy: Proxy) -> Any:
+        """
+        Cria a sessão fixa de um proxy do `SDKConfig.PROXY_POOL`: um cliente HTTP/2 com
+        `SDKConfig.HTTP2`, ou uma sessão do cloudscraper, que guarda os cookies de
+        liberação obtidos por esse proxy.
+        """
+        if self.config.HTTP2:
+            return self.create_http_client(proxy=proxy.url)
+
+        session = self.create_scraper(proxy.url)
+        session.proxies.update(proxy.proxies)
+        return session
+
+    def create_scraper(self, proxy: Optional[str] = None) -> Any:
+        """
+        Cria uma sessão do cloudscraper, aplicando a liberação do Cloudflare em cache
+        (`SDKConfig.CLEARANCE_CACHE`) para o IP de saída, se houver.
+
+        :param proxy: URL do proxy usado pela sessão.
+        """
+        import cloudscraper
+
+        session = cloudscraper.create_scraper()
+        if self.config.CLEARANCE_CACHE is not None:
+            from datalar.scrapers.zap_imoveis.sdk.clearance import clearance_key
+
+            self.config.CLEARANCE_CACHE.apply(session, clearance_key(proxy))
+        return session
+
+    def close(self) -> None:
+        """
+        Encerra as conexões abertas pelo cliente HTTP/2 e pelas sessões dos proxies, e o
+        executor de validação, se houver.
+        """
+        if self._http_client:
+            self._http_client.close()
+            self._http_client = None
+        if self.config.PROXY_POOL is not None:
+            self.config.PROXY_POOL.close()
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown()
+            self._parse_executor = None
+
     @property
     def listings(self) -> Listings:
         if not self._listings:
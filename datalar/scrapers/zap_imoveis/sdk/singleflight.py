@@ -0,0 +1,133 @@
+"""
+Coalescência de requisições idênticas simultâneas (single-flight).
+
+Quando várias threads (ou tarefas asyncio) fazem a mesma requisição ao mesmo tempo, apenas
+a primeira chega à API; as demais aguardam e recebem o mesmo resultado (ou a mesma
+exceção). Requisições feitas depois que a primeira terminou não são afetadas: não há
+cache de resultados.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def request_key(
+    method: str, url: str, params: Optional[Mapping[str, Any]] = None
+) -> Hashable:
+    """
+    Chave que identifica requisições equivalentes: método, URL e parâmetros ordenados.
+    """
+    items = tuple(sorted((k, repr(v)) for k, v in (params or {}).items()))
+    return method.upper(), url, items
+
+
+@dataclass
+class SingleFlightStats:
+    """
+    :ivar calls: Total de chamadas recebidas.
+    :ivar executions: Chamadas que efetivamente executaram a função.
+    :ivar coalesced: Chamadas que aguardaram uma execução já em andamento.
+    """
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Single-flight para threads.
+
+    Exemplo::
+
+        flight = SingleFlight()
+        resp = flight.do(request_key("GET", url, params), lambda: session.get(url, params=params))
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = SingleFlightStats()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Executa `fn`, ou aguarda a execução em andamento com a mesma chave.
+
+        :param key: Chave da chamada (ver `request_key`).
+        :param fn: Função sem argumentos que realiza a chamada.
+        :return: O resultado compartilhado da execução.
+        """
+        with self._lock:
+            self.stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.executions += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight para tarefas asyncio de um mesmo loop de eventos.
+
+    O cancelamento de uma das tarefas que aguardam não cancela a execução compartilhada.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = SingleFlightStats()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa `fn()`, ou aguarda a execução em andamento com a mesma chave.
+
+        :param key: Chave da chamada (ver `request_key`).
+        :param fn: Função sem argumentos que retorna o awaitable da chamada.
+        :return: O resultado compartilhado da execução.
+        """
+        self.stats.calls += 1
+        future = self._calls.get(key)
+        if future is None:
+            self.stats.executions += 1
+            future = self._calls[key] = asyncio.ensure_future(fn())
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(future)
@@ -0,0 +1,198 @@
+"""
+Decodificação incremental de respostas JSON.
+
+Permite extrair os itens de um array aninhado (como `search.result.listings`) à medida
+que o corpo da resposta é recebido, sem manter a resposta inteira em memória: apenas o
+item em decodificação fica no buffer.
+
+Antes de decodificar um valor, um varredor que reconhece strings e aninhamento localiza o
+fim do valor, lendo mais blocos se necessário; cada caractere é varrido uma única vez e
+o valor é decodificado uma única vez, já completo. Os membros que não levam ao array são
+apenas varridos, sem decodificação.
+"""
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Sequence
+
+_WHITESPACE = " \t\n\r"
+# delimitadores de estrutura fora de strings
+_STRUCTURE = re.compile(r'["{}\[\]]')
+# fim de string ou escape dentro de strings
+_STRING_SPECIAL = re.compile(r'["\\]')
+# fim de um número, `true`, `false` ou `null`
+_SCALAR_END = re.compile(r"[\s,:\]}]")
+
+
+class _StreamReader:
+    """
+    Buffer de texto alimentado por blocos de bytes, com decodificação de valores JSON
+    completos via `json.JSONDecoder.raw_decode`.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._eof = False
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self, size: int = 1) -> bool:
+        """
+        Lê blocos para o buffer, descartando o que já foi consumido, até acrescentar ao
+        menos `size` caracteres (ou o fluxo terminar).
+
+        :return: `False` se o fluxo terminou sem acrescentar nada.
+        """
+        parts = []
+        read = 0
+        while not self._eof and read < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._decoder.decode(b"", final=True)
+            else:
+                text = self._decoder.decode(chunk)
+            parts.append(text)
+            read += len(text)
+        if not read:
+            return False
+        self.buf = self.buf[self.pos :] + "".join(parts)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Retorna o próximo caractere que não seja espaço, sem consumi-lo.
+
+        :raises ValueError: Se o fluxo terminar.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                f"Expected {char!r} in JSON stream, found {found!r} at position {self.pos}"
+            )
+        self.pos += 1
+
+    def end(self) -> int:
+        """
+        Posição logo após o próximo valor JSON, lendo blocos até que ele esteja completo
+        no buffer. O valor não é validado nem decodificado.
+
+        :raises ValueError: Se o fluxo terminar antes do fim do valor.
+        """
+        if self.peek() not in '{["':
+            # um número pode continuar no próximo bloco: espera um delimitador
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match is not None:
+                    return match.start()
+                if not self._fill():
+                    return len(self.buf)
+        depth = 0
+        in_string = False
+        # deslocamento já varrido a partir de `pos`, preservado entre os blocos
+        offset = 0
+        while True:
+            buf = self.buf
+            i = self.pos + offset
+            while True:
+                if in_string:
+                    match = _STRING_SPECIAL.search(buf, i)
+                    if match is None:
+                        i = len(buf)
+                        break
+                    i = match.start()
+                    if buf[i] == "\\":
+                        if i + 1 == len(buf):
+                            # o caractere escapado está no próximo bloco
+                            break
+                        i += 2
+                        continue
+                    in_string = False
+                    i += 1
+                    if depth == 0:
+                        return i
+                    continue
+                match = _STRUCTURE.search(buf, i)
+                if match is None:
+                    i = len(buf)
+                    break
+                i = match.end()
+                char = match.group()
+                if char == '"':
+                    in_string = True
+                elif char in "{[":
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return i
+            offset = i - self.pos
+            # o buffer ao menos dobra a cada leitura: as cópias custam O(n) no total
+            if not self._fill(len(buf) - self.pos):
+                raise ValueError("Unexpected end of JSON stream")
+
+    def value(self) -> Any:
+        """
+        Decodifica o próximo valor JSON completo, lendo mais blocos se necessário.
+        """
+        self.end()
+        value, self.pos = self._json.raw_decode(self.buf, self.pos)
+        return value
+
+    def skip(self) -> None:
+        """
+        Avança até depois do próximo valor JSON, sem decodificá-lo.
+        """
+        self.pos = self.end()
+
+
+def iter_json_array(chunks: Iterable[bytes], path: Sequence[str]) -> Iterator[Any]:
+    """
+    Decodifica incrementalmente os itens do array localizado em `path`.
+
+    Os membros anteriores ao array são varridos e descartados, sem decodificação; os
+    posteriores não são lidos.
+
+    :param chunks: Blocos de bytes do corpo da resposta, em ordem (UTF-8).
+    :param path: Chaves dos objetos até o array, por exemplo `("search", "result", "listings")`.
+    :return: Um iterador sobre os itens do array, já decodificados.
+    :raises KeyError: Se alguma chave do caminho não existir.
+    :raises ValueError: Se o JSON estiver malformado ou truncado.
+    """
+    reader = _StreamReader(chunks)
+    reader.expect("{")
+    for depth, key in enumerate(path):
+        while True:
+            char = reader.peek()
+            if char == ",":
+                reader.pos += 1
+                continue
+            if char == "}":
+                raise KeyError(".".join(path[: depth + 1]))
+            member = reader.value()
+            reader.expect(":")
+            if member == key:
+                break
+            reader.skip()
+        reader.expect("{" if depth < len(path) - 1 else "[")
+
+    while True:
+        char = reader.peek()
+        if char == "]":
+            return
+        if char == ",":
+            reader.pos += 1
+            continue
+        yield reader.value()
@@ -0,0 +1,38 @@
+"""
+Funções auxiliares compartilhadas pela SDK do Zap Imóveis.
+"""
+from functools import lru_cache
+from typing import Any
+
+
+@lru_cache(maxsize=1024)
+def camel_to_snake(key: str) -> str:
+    """
+    Converte uma chave em camelCase (formato da API) para snake_case (formato dos modelos).
+    """
+    for char in key:
+        if char.isupper():
+            key = key.replace(char, f"_{char.lower()}")
+    return key
+
+
+@lru_cache(maxsize=1024)
+def snake_to_camel(key: str) -> str:
+    """
+    Converte uma chave em snake_case para camelCase, o formato utilizado pela API.
+    """
+    key = key.replace("_", " ").title().replace(" ", "")
+    return key[0].lower() + key[1:] if key else key
+
+
+def normalize_keys(data: Any) -> Any:
+    """
+    Normaliza recursivamente as chaves dos dicionários de dados para o formato esperado
+    pelos modelos (camelCase -> snake_case). Listas são percorridas e demais valores
+    são retornados sem alterações.
+    """
+    if isinstance(data, dict):
+        return {camel_to_snake(key): normalize_keys(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [normalize_keys(item) if isinstance(item, dict) else item for item in data]
+    return data
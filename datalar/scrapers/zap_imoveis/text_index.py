@@ -0,0 +1,326 @@
+"""
+Índice invertido de texto completo sobre as listagens do Zap Imóveis.
+
+Indexa `title`, `description`, `amenities` e `merged_amenities` e responde buscas por
+palavras-chave ("varanda gourmet", "aceita pet") ordenadas por BM25, sem varrer as
+listagens:
+
+1. o texto é normalizado com `fold_text` (sem acentos, minúsculas), dividido em palavras,
+   sem stopwords do português, e cada palavra é reduzida por um stemmer leve (plurais e
+   vogal temática), para que "varandas" encontre "varanda" e "aceita" encontre "aceito";
+2. cada termo tem uma lista de postings (documento, frequência) codificada com deltas e
+   varints em um `bytearray`, o que mantém o índice de um inventário nacional em poucas
+   centenas de MB;
+3. listagens podem ser adicionadas, atualizadas e removidas a qualquer momento. Versões
+   antigas ficam marcadas como removidas e são descartadas por `compact`, chamado
+   automaticamente quando passam de uma fração do índice.
+"""
+from __future__ import annotations
+
+import re
+from array import array
+from dataclasses import dataclass
+from math import log
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from datalar.scrapers.zap_imoveis.dedup import fold_text
+
+if TYPE_CHECKING:
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+
+_WORD_RE = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+    a ao aos as ate com como da das de dela dele do dos e ela ele em entre era essa
+    esse esta este eu foi ha isso isto ja la mais mas me mesmo muito na nas nem no nos
+    num numa o os ou para pela pelas pelo pelos por pra qual quando que se sem ser seu
+    sua suas seus so tambem tem to um uma umas uns voce
+    """.split())
+
+# sufixos de plural, do mais longo para o mais curto: (sufixo, substituição)
+_PLURALS = (
+    ("oes", "ao"),
+    ("aes", "ao"),
+    ("ais", "al"),
+    ("eis", "el"),
+    ("ois", "ol"),
+    ("ns", "m"),
+    ("res", "r"),
+    ("zes", "z"),
+    ("ses", "s"),
+    ("s", ""),
+)
+
+# peso de cada campo na frequência dos termos (o título descreve melhor o imóvel)
+FIELD_WEIGHTS = {"title": 2, "description": 1, "amenities": 1}
+
+
+def stem(word: str) -> str:
+    """
+    Stemmer leve para o português: remove o plural e a vogal temática final.
+    Espera uma palavra já normalizada por `fold_text`.
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement in _PLURALS:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)] + replacement
+            break
+    if len(word) > 4 and word[-1] in "aeo":
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide o texto nos termos indexados, na ordem em que aparecem.
+    """
+    return [
+        stem(word)
+        for word in _WORD_RE.findall(fold_text(text))
+        if word not in STOPWORDS
+    ]
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_postings(docs: Iterable[int], frequencies: Iterable[int]) -> bytearray:
+    """
+    Codifica uma lista de postings ordenada por documento.
+    """
+    out = bytearray()
+    previous = 0
+    for doc, frequency in zip(docs, frequencies):
+        encode_varint(doc - previous, out)
+        encode_varint(frequency, out)
+        previous = doc
+    return out
+
+
+def decode_postings(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decodifica uma lista de postings: pares (delta do documento, frequência) em varints.
+    A decodificação é vetorizada, sem laço em Python por posting.
+
+    :return: Os documentos e as frequências, em arrays `int64`.
+    """
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not raw.size:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    # cada varint termina no primeiro byte sem o bit de continuação
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # posição de cada byte dentro do seu varint
+    position = np.arange(raw.size) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.int64) << (7 * position)
+    values = np.add.reduceat(parts, starts)
+    return np.cumsum(values[0::2]), values[1::2]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    listing_id: str
+    score: float
+
+
+class TextIndex:
+    """
+    Índice invertido incremental com ranqueamento BM25.
+
+    :param k1: Saturação da frequência dos termos do BM25.
+    :param b: Normalização pelo tamanho do documento do BM25.
+    :param max_deleted_ratio: Fração de documentos removidos a partir da qual o índice é
+                              compactado automaticamente.
+
+    Exemplo::
+
+        index = TextIndex()
+        for listing in crawler.crawl():
+            index.add(listing)
+        index.search("varanda gourmet", limit=20)
+    """
+
+    def __init__(
+        self, k1: float = 1.2, b: float = 0.75, max_deleted_ratio: float = 0.25
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self.max_deleted_ratio = max_deleted_ratio
+        # documento interno -> id da listagem (None se removido)
+        self._ids: List[Optional[str]] = []
+        self._docs: Dict[str, int] = {}
+        self._lengths = array("I")
+        self._alive = bytearray()
+        self._postings: Dict[str, bytearray] = {}
+        self._last_doc: Dict[str, int] = {}
+        self._total_length = 0
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, listing_id: str) -> bool:
+        return listing_id in self._docs
+
+    @staticmethod
+    def listing_fields(listing: ListingData) -> Dict[str, str]:
+        amenities = dict.fromkeys(listing.amenities + listing.merged_amenities)
+        return {
+            "title": listing.title,
+            "description": listing.description,
+            "amenities": " ".join(amenities),
+        }
+
+    def add(self, listing: ListingData) -> None:
+        """
+        Indexa a listagem, substituindo a versão anterior com o mesmo `id`, se houver.
+        """
+        self.add_text(listing.id, self.listing_fields(listing))
+
+    def add_many(self, listings: Iterable[ListingData]) -> None:
+        for listing in listings:
+            self.add(listing)
+
+    def add_text(self, listing_id: str, fields: Dict[str, str]) -> None:
+        """
+        Indexa campos de texto arbitrários sob o id informado.
+
+        :param fields: Nome do campo -> texto. Campos fora de `FIELD_WEIGHTS` têm peso 1.
+        """
+        self.remove(listing_id)
+        frequencies: Dict[str, int] = {}
+        length = 0
+        for name, text in fields.items():
+            weight = FIELD_WEIGHTS.get(name, 1)
+            for term in tokenize(text or ""):
+                frequencies[term] = frequencies.get(term, 0) + weight
+                length += weight
+
+        doc = len(self._ids)
+        self._ids.append(listing_id)
+        self._alive.append(1)
+        self._docs[listing_id] = doc
+        self._lengths.append(length)
+        self._total_length += length
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = bytearray()
+            # documentos são sempre crescentes, então o delta é positivo
+            encode_varint(doc - self._last_doc.get(term, 0), postings)
+            encode_varint(frequency, postings)
+            self._last_doc[term] = doc
+
+    def remove(self, listing_id: str) -> bool:
+        """
+        Remove a listagem do índice.
+
+        :return: `True` se a listagem estava indexada.
+        """
+        doc = self._docs.pop(listing_id, None)
+        if doc is None:
+            return False
+        self._ids[doc] = None
+        self._alive[doc] = 0
+        self._total_length -= self._lengths[doc]
+        self._deleted += 1
+        if self._deleted > self.max_deleted_ratio * len(self._ids):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """
+        Reescreve o índice sem os documentos removidos.
+        """
+        alive = self._alive_mask()
+        # novo número de cada documento mantido
+        remap = np.cumsum(alive) - 1
+        ids = [listing_id for listing_id in self._ids if listing_id is not None]
+
+        postings: Dict[str, bytearray] = {}
+        last_doc: Dict[str, int] = {}
+        for term, data in self._postings.items():
+            docs, frequencies = decode_postings(data)
+            keep = alive[docs]
+            if not keep.any():
+                continue
+            docs = remap[docs[keep]].tolist()
+            postings[term] = encode_postings(docs, frequencies[keep].tolist())
+            last_doc[term] = docs[-1]
+
+        self._lengths = array("I", np.asarray(self._lengths)[alive].tolist())
+        self._ids = ids
+        self._alive = bytearray(b"\x01") * len(ids)
+        self._docs = {listing_id: doc for doc, listing_id in enumerate(ids)}
+        self._postings = postings
+        self._last_doc = last_doc
+        self._deleted = 0
+
+    def _alive_mask(self) -> np.ndarray:
+        return np.frombuffer(self._alive, dtype=np.bool_)
+
+    def document_frequency(self, term: str) -> int:
+        """
+        Número de listagens que contêm o termo (já normalizado por `tokenize`).
+        """
+        docs, _ = decode_postings(self._postings.get(term, b""))
+        return int(self._alive_mask()[docs].sum())
+
+    def search(
+        self, query: str, limit: int = 10, match_all: bool = False
+    ) -> List[SearchHit]:
+        """
+        Busca as listagens mais relevantes para a consulta.
+
+        :param query: Palavras-chave, normalizadas como o texto indexado.
+        :param limit: Número máximo de resultados.
+        :param match_all: Se `True`, retorna apenas listagens com todos os termos.
+        :return: Os resultados, do mais para o menos relevante.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._docs or limit < 1:
+            return []
+
+        alive = self._alive_mask()
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+        documents = len(self._docs)
+        average_length = self._total_length / documents or 1.0
+        k1, b = self.k1, self.b
+        scores = np.zeros(len(self._ids))
+        matches = np.zeros(len(self._ids), dtype=np.int32)
+        for term in terms:
+            docs, frequencies = decode_postings(self._postings.get(term, b""))
+            keep = alive[docs]
+            docs, frequencies = docs[keep], frequencies[keep]
+            if not docs.size:
+                if match_all:
+                    return []
+                continue
+            idf = log(1 + (documents - docs.size + 0.5) / (docs.size + 0.5))
+            norm = k1 * (1 - b + b * lengths[docs] / average_length)
+            # cada documento aparece uma única vez por termo
+            scores[docs] += idf * frequencies * (k1 + 1) / (frequencies + norm)
+            matches[docs] += 1
+
+        candidates = np.flatnonzero(matches == len(terms) if match_all else matches > 0)
+        if candidates.size > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [SearchHit(self._ids[doc], float(scores[doc])) for doc in ranked]
+
+    def index_size(self) -> int:
+        """
+        Tamanho das listas de postings, em bytes.
+        """
+        return sum(len(data) for data in self._postings.values())
@@ -0,0 +1,277 @@
+"""
+Coleta distribuída: as páginas do plano de uma coleta viram tarefas de uma `WorkQueue`.
+
+`enqueue_crawl` planeja a busca (como `ListingsCrawler.crawl`) e enfileira uma tarefa por
+página, com ids determinísticos: enfileirar o mesmo plano de novo não duplica tarefas.
+Cada máquina executa quantos `CrawlWorker` quiser, todos retirando tarefas da mesma fila.
+
+Exemplo::
+
+    queue = RedisWorkQueue.from_url("redis://broker:6379/0")
+    enqueue_crawl(queue, ListingsCrawler(sdk), SearchQuery(address_state="SP"))
+
+    # em cada máquina
+    CrawlWorker(queue, ListingsCrawler(sdk), sink=store.write).run(stop_event)
+
+Para coletas de vários dias, o `WorkerSupervisor` executa os workers em processos e os
+substitui quando são reciclados: com um `MemoryGuard`, o worker encerra entre duas
+páginas ao atingir o teto de memória ou o número máximo de páginas. A página em
+andamento é o checkpoint: ela é concluída antes da reciclagem ou, se faltar memória
+durante o processamento (`MemoryError`), devolvida à fila com `fail`, para outro worker
+continuar de onde este parou. A tentativa é contada: uma página que sempre esgota a
+memória vai para a fila de tarefas mortas após `max_attempts` tentativas.
+
+Exemplo::
+
+    def make_worker():  # executada em cada processo novo
+        queue = RedisWorkQueue.from_url("redis://broker:6379/0")
+        return CrawlWorker(
+            queue, ListingsCrawler(sdk), sink=store.write,
+            guard=MemoryGuard(max_rss=2 * 2**30, max_pages=10_000),
+        )
+
+    WorkerSupervisor(make_worker, processes=4).run()
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from datalar.scrapers.zap_imoveis.crawler import PageTask
+from datalar.scrapers.zap_imoveis.planner import SearchQuery
+
+if TYPE_CHECKING:
+    from datalar.memory import MemoryGuard
+    from datalar.scrapers.zap_imoveis.crawler import ListingsCrawler
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+    from datalar.workqueue import Task, WorkQueue
+
+# código de saída de um processo reciclado (EX_TEMPFAIL)
+RECYCLE_EXIT_CODE = 75
+
+
+def shard_payload(task: PageTask) -> Dict[str, Any]:
+    return {"query": task.query.search_params(), "page": task.page, "size": task.size}
+
+
+def shard_id(payload: Dict[str, Any]) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def page_task(payload: Dict[str, Any]) -> PageTask:
+    return PageTask(SearchQuery(**payload["query"]), payload["page"], payload["size"])
+
+
+def enqueue_crawl(
+    queue: WorkQueue, crawler: ListingsCrawler, query: SearchQuery | None = None
+) -> List[str]:
+    """
+    Planeja a busca e enfileira uma tarefa por página.
+
+    :return: Os ids das tarefas.
+    """
+    plan = crawler._plan(query)
+    ids = []
+    for task in crawler.page_tasks(plan):
+        payload = shard_payload(task)
+        ids.append(queue.put(payload, shard_id(payload)))
+    return ids
+
+
+class CrawlWorker:
+    """
+    Executa as tarefas de páginas de uma `WorkQueue`.
+
+    :param queue: A fila compartilhada.
+    :param crawler: O crawler usado para buscar as páginas.
+    :param sink: Recebe as listagens de cada página. Deve ser idempotente: uma página
+                 pode ser processada mais de uma vez (entrega "pelo menos uma vez").
+    :param retry_delay: Segundos até uma página com erro voltar à fila.
+    :param idle_wait: Segundos de espera quando a fila está vazia.
+    :param guard: Limites de memória e de páginas; ao atingi-los, `run` retorna e
+                  `recycle_reason` indica o motivo.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        crawler: ListingsCrawler,
+        sink: Callable[[List[ListingData]], Any],
+        *,
+        retry_delay: float = 30.0,
+        idle_wait: float = 1.0,
+        guard: Optional[MemoryGuard] = None,
+    ) -> None:
+        self.queue = queue
+        self.crawler = crawler
+        self.sink = sink
+        self.retry_delay = retry_delay
+        self.idle_wait = idle_wait
+        self.guard = guard
+        self.recycle_reason: Optional[str] = None
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+        self.processed = 0
+        self.failed = 0
+
+    def process(self, task: Task) -> bool:
+        """
+        Busca a página da tarefa e entrega as listagens ao `sink`. O arrendamento é
+        renovado periodicamente enquanto a página é processada.
+
+        Sem memória (`MemoryError`), a tarefa falha (a tentativa é contada) e o worker é
+        marcado para reciclagem.
+
+        :return: Se a tarefa foi concluída.
+        """
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(task, stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            listings = self.crawler.fetch_page(page_task(task.payload))
+            self.sink(listings)
+        except MemoryError:
+            self.failed += 1
+            self.recycle_reason = "MemoryError while processing a page"
+            self.queue.fail(task, self.recycle_reason, self.retry_delay)
+            return False
+        except Exception as e:
+            self.failed += 1
+            self.queue.fail(task, f"{type(e).__name__}: {e}", self.retry_delay)
+            return False
+        finally:
+            stop.set()
+            heartbeat.join()
+        self.processed += 1
+        self.queue.complete(task, {"listings": len(listings), "worker": self.worker_id})
+        return True
+
+    def _heartbeat(self, task: Task, stop: threading.Event) -> None:
+        interval = max((task.lease_expires_at - self.queue.clock()) / 3, 0.1)
+        while not stop.wait(interval):
+            if not self.queue.extend(task):
+                return
+
+    def run(
+        self,
+        stop: Optional[threading.Event] = None,
+        max_tasks: Optional[int] = None,
+        *,
+        drain: bool = False,
+    ) -> int:
+        """
+        Processa tarefas até `stop` ser sinalizado, até `max_tasks` tarefas, até o worker
+        precisar ser reciclado ou, sem `stop` ou com `drain`, até a fila ficar vazia.
+
+        :return: O número de tarefas processadas (concluídas ou com erro).
+        """
+        handled = 0
+        while stop is None or not stop.is_set():
+            if max_tasks is not None and handled >= max_tasks:
+                break
+            task = self.queue.lease()
+            if task is None:
+                if stop is None or drain:
+                    break
+                stop.wait(self.idle_wait)
+                continue
+            self.process(task)
+            handled += 1
+            if self.recycle_reason is None and self.guard is not None:
+                self.recycle_reason = self.guard.observe()
+            if self.recycle_reason is not None:
+                break
+        return handled
+
+
+def _run_worker_process(
+    make_worker: Callable[[], CrawlWorker], stop: Any, drain: bool
+) -> None:
+    worker = make_worker()
+    worker.run(stop, drain=drain)
+    sys.exit(RECYCLE_EXIT_CODE if worker.recycle_reason is not None else 0)
+
+
+class WorkerSupervisor:
+    """
+    Mantém `processes` processos de `CrawlWorker`, substituindo os reciclados.
+
+    :param make_worker: Cria o worker dentro do processo filho (com a própria fila,
+                        crawler e sink). Com o método `spawn`, deve ser importável.
+    :param processes: Número de processos simultâneos.
+    :param drain: Encerra quando a fila esvaziar. Caso contrário, os processos aguardam
+                  novas tarefas até `run` ser interrompido por `stop`.
+    :param max_crashes: Saídas inesperadas (exceções, processos encerrados pelo sistema)
+                        toleradas; até esse limite, os processos são substituídos. As
+                        tarefas desses processos voltam à fila quando o arrendamento
+                        expira.
+    :param start_method: Método do `multiprocessing`. O padrão, `spawn`, cria processos
+                         que não herdam a memória do supervisor.
+    """
+
+    def __init__(
+        self,
+        make_worker: Callable[[], CrawlWorker],
+        processes: int = 1,
+        *,
+        drain: bool = True,
+        max_crashes: int = 10,
+        start_method: str = "spawn",
+    ) -> None:
+        self.make_worker = make_worker
+        self.processes = processes
+        self.drain = drain
+        self.max_crashes = max_crashes
+        self._context = multiprocessing.get_context(start_method)
+        self.started = 0
+        self.recycled = 0
+        self.crashes = 0
+
+    def _start(self, stop: Any) -> multiprocessing.process.BaseProcess:
+        process = self._context.Process(
+            target=_run_worker_process,
+            args=(self.make_worker, stop, self.drain),
+            name=f"crawl-worker-{self.started}",
+        )
+        process.start()
+        self.started += 1
+        return process
+
+    def run(
+        self, stop: Optional[threading.Event] = None, poll_interval: float = 0.5
+    ) -> None:
+        """
+        Executa os processos até todos encerrarem sem pedir reciclagem (fila vazia, com
+        `drain`) ou até `stop` ser sinalizado. Ao sinalizar `stop`, os processos terminam
+        a página em andamento antes de encerrar.
+        """
+        stop = stop or threading.Event()
+        child_stop = self._context.Event()
+        running = [self._start(child_stop) for _ in range(self.processes)]
+        while running:
+            if stop.is_set():
+                child_stop.set()
+            for process in list(running):
+                if process.is_alive():
+                    continue
+                process.join()
+                running.remove(process)
+                if child_stop.is_set() or process.exitcode == 0:
+                    continue
+                if process.exitcode == RECYCLE_EXIT_CODE:
+                    self.recycled += 1
+                else:
+                    self.crashes += 1
+                    if self.crashes > self.max_crashes:
+                        continue
+                running.append(self._start(child_stop))
+            if running:
+                running[0].join(poll_interval)
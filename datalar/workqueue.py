@@ -0,0 +1,546 @@
+"""
+Fila de trabalho distribuída para as partes (shards) de uma coleta.
+
+Produtores enfileiram tarefas (dicionários serializáveis em JSON) e workers em qualquer
+número de máquinas as retiram com um arrendamento (lease): a tarefa fica invisível para os
+demais workers até o fim do prazo (`visibility_timeout`). Se o worker morrer ou não
+concluir a tarefa no prazo, ela volta a ficar disponível. Não há coordenador central:
+cada worker disputa as tarefas diretamente no backend.
+
+- `fail` devolve a tarefa à fila (com atraso opcional) até `max_attempts` tentativas;
+  depois disso, ela vai para a fila de mensagens mortas (dead-letter);
+- o resultado de uma tarefa é gravado uma única vez: se dois workers processarem a mesma
+  tarefa (por exemplo, após um arrendamento expirado), apenas o primeiro `complete`
+  grava o resultado e os demais recebem `False`;
+- enfileirar com um `task_id` já existente não cria uma tarefa nova;
+- `release` devolve uma tarefa à fila sem contar a tentativa, para um worker que vai
+  encerrar (por exemplo, reciclado por uso de memória) repassar o trabalho a outro.
+
+A entrega é "pelo menos uma vez": o processamento das tarefas deve ser idempotente.
+
+Há dois backends: `SQLiteWorkQueue`, para workers em uma única máquina (inclusive em
+processos diferentes), e `RedisWorkQueue`, para várias máquinas, que usa apenas comandos
+atômicos simples do Redis (sem scripts Lua), compatíveis com servidores alternativos.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+TaskState = Literal["pending", "leased", "done", "dead"]
+
+
+@dataclass(frozen=True)
+class Task:
+    """
+    Uma tarefa arrendada por um worker.
+
+    :ivar attempts: Número de arrendamentos da tarefa, incluindo o atual.
+    :ivar lease_token: Identifica o arrendamento atual; operações com um token antigo
+                       (arrendamento expirado e concedido a outro worker) são ignoradas.
+    """
+
+    id: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    lease_token: str
+    lease_expires_at: float
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    id: str
+    payload: Dict[str, Any]
+    attempts: int
+    error: Optional[str]
+
+
+class WorkQueue:
+    """
+    Interface das filas de trabalho.
+
+    :param visibility_timeout: Prazo padrão dos arrendamentos, em segundos.
+    :param max_attempts: Número padrão de tentativas antes de uma tarefa ir para a fila
+                         de mensagens mortas.
+    :param clock: Relógio de parede, compartilhado entre as máquinas (substituível em
+                  testes).
+    """
+
+    def __init__(
+        self,
+        *,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+    def put(
+        self,
+        payload: Dict[str, Any],
+        task_id: Optional[str] = None,
+        *,
+        max_attempts: Optional[int] = None,
+        delay: float = 0.0,
+    ) -> str:
+        """
+        Enfileira uma tarefa.
+
+        :param task_id: Identificador da tarefa. Se já existir uma tarefa com o mesmo id,
+                        nada é feito. Por padrão, um UUID.
+        :param delay: Segundos até a tarefa ficar disponível.
+        :return: O id da tarefa.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def lease(self, visibility_timeout: Optional[float] = None) -> Optional[Task]:
+        """
+        Arrenda a próxima tarefa disponível.
+
+        :return: A tarefa, ou `None` se não houver tarefas disponíveis.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def extend(self, task: Task, visibility_timeout: Optional[float] = None) -> bool:
+        """
+        Renova o arrendamento de uma tarefa em andamento.
+
+        :return: `False` se o arrendamento já foi perdido.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def complete(self, task: Task, result: Any = None) -> bool:
+        """
+        Grava o resultado da tarefa e a encerra. Aceito mesmo com o arrendamento expirado,
+        desde que nenhum resultado tenha sido gravado antes.
+
+        :return: `False` se a tarefa já tinha um resultado.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def fail(self, task: Task, error: str, retry_delay: float = 0.0) -> TaskState:
+        """
+        Registra uma falha: a tarefa volta para a fila após `retry_delay` segundos, ou vai
+        para a fila de mensagens mortas se já esgotou as tentativas.
+
+        :return: O novo estado da tarefa (ignorado se o arrendamento já foi perdido).
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def release(self, task: Task) -> bool:
+        """
+        Devolve a tarefa à fila imediatamente, sem contar a tentativa atual.
+
+        :return: `False` se o arrendamento já foi perdido.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def result(self, task_id: str) -> Any:
+        """
+        O resultado gravado da tarefa, ou `None`.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def dead_letters(self) -> List[DeadLetter]:
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def requeue(self, task_id: str) -> bool:
+        """
+        Devolve uma tarefa da fila de mensagens mortas à fila, com as tentativas zeradas.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def counts(self) -> Dict[TaskState, int]:
+        """
+        Número de tarefas em cada estado.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    lease_expires_at REAL,
+    error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_pending ON tasks (state, available_at);
+CREATE INDEX IF NOT EXISTS tasks_leased ON tasks (state, lease_expires_at);
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Fila de trabalho em um arquivo SQLite, para workers em uma única máquina. Pode ser
+    compartilhada entre threads (uma conexão por thread) e processos.
+
+    :param path: Caminho do arquivo do banco.
+    """
+
+    def __init__(self, path: str, **options: Any) -> None:
+        super().__init__(**options)
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, payload, task_id=None, *, max_attempts=None, delay=0.0) -> str:
+        task_id = task_id or uuid.uuid4().hex
+        now = self.clock()
+        self._connection().execute(
+            "INSERT OR IGNORE INTO tasks "
+            "(id, payload, state, max_attempts, available_at, created_at) "
+            "VALUES (?, ?, 'pending', ?, ?, ?)",
+            (
+                task_id,
+                json.dumps(payload),
+                max_attempts or self.max_attempts,
+                now + delay,
+                now,
+            ),
+        )
+        return task_id
+
+    def lease(self, visibility_timeout=None) -> Optional[Task]:
+        now = self.clock()
+        expires_at = now + (visibility_timeout or self.visibility_timeout)
+        token = uuid.uuid4().hex
+        # arrendamentos expirados de tarefas sem tentativas restantes
+        self._connection().execute(
+            "UPDATE tasks SET state = 'dead', error = 'lease expired', finished_at = ? "
+            "WHERE state = 'leased' AND lease_expires_at <= ? "
+            "AND attempts >= max_attempts",
+            (now, now),
+        )
+        # um único UPDATE: o SQLite serializa as escritas entre processos
+        row = (
+            self._connection()
+            .execute(
+                "UPDATE tasks SET state = 'leased', attempts = attempts + 1, "
+                "lease_token = ?, lease_expires_at = ? "
+                "WHERE id = (SELECT id FROM tasks WHERE "
+                "(state = 'pending' AND available_at <= ?) "
+                "OR (state = 'leased' AND lease_expires_at <= ?) "
+                "ORDER BY available_at LIMIT 1) "
+                "RETURNING id, payload, attempts, max_attempts",
+                (token, expires_at, now, now),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        task_id, payload, attempts, max_attempts = row
+        return Task(
+            task_id, json.loads(payload), attempts, max_attempts, token, expires_at
+        )
+
+    def extend(self, task, visibility_timeout=None) -> bool:
+        expires_at = self.clock() + (visibility_timeout or self.visibility_timeout)
+        cursor = self._connection().execute(
+            "UPDATE tasks SET lease_expires_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (expires_at, task.id, task.lease_token),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task, result=None) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE tasks SET state = 'done', result = ?, lease_token = NULL, "
+            "finished_at = ? WHERE id = ? AND state != 'done'",
+            (json.dumps(result), self.clock(), task.id),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task, error, retry_delay=0.0) -> TaskState:
+        now = self.clock()
+        state: TaskState = "dead" if task.attempts >= task.max_attempts else "pending"
+        self._connection().execute(
+            "UPDATE tasks SET state = ?, error = ?, available_at = ?, "
+            "lease_token = NULL, finished_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (
+                state,
+                error,
+                now + retry_delay,
+                now if state == "dead" else None,
+                task.id,
+                task.lease_token,
+            ),
+        )
+        return state
+
+    def release(self, task) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE tasks SET state = 'pending', attempts = attempts - 1, "
+            "available_at = ?, lease_token = NULL "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (self.clock(), task.id, task.lease_token),
+        )
+        return cursor.rowcount == 1
+
+    def result(self, task_id) -> Any:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT result FROM tasks WHERE id = ? AND state = 'done'", (task_id,)
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def dead_letters(self) -> List[DeadLetter]:
+        rows = self._connection().execute(
+            "SELECT id, payload, attempts, error FROM tasks WHERE state = 'dead'"
+        )
+        return [DeadLetter(id, json.loads(p), a, e) for id, p, a, e in rows]
+
+    def requeue(self, task_id) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE tasks SET state = 'pending', attempts = 0, available_at = ?, "
+            "finished_at = NULL WHERE id = ? AND state = 'dead'",
+            (self.clock(), task_id),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self) -> Dict[TaskState, int]:
+        counts = dict.fromkeys(("pending", "leased", "done", "dead"), 0)
+        counts.update(
+            self._connection().execute(
+                "SELECT state, COUNT(*) FROM tasks GROUP BY state"
+            )
+        )
+        return counts
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _text(value: Any) -> Optional[str]:
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Fila de trabalho em um servidor Redis (ou compatível), para workers em várias máquinas.
+
+    Cada tarefa é um hash; as tarefas disponíveis e as arrendadas ficam em sorted sets
+    ordenados pelo momento de disponibilidade e de expiração. Um worker arrenda uma
+    tarefa removendo-a do conjunto de disponíveis com `ZREM`, que só retorna 1 para um
+    dos workers concorrentes.
+
+    :param client: Um cliente `redis.Redis` (ou com a mesma interface).
+    :param namespace: Prefixo das chaves, permitindo várias filas no mesmo servidor.
+    """
+
+    def __init__(self, client: Any, namespace: str = "datalar:queue", **options: Any):
+        super().__init__(**options)
+        self.client = client
+        self.namespace = namespace
+        self._pending = f"{namespace}:pending"
+        self._leased = f"{namespace}:leased"
+        self._dead = f"{namespace}:dead"
+        self._done = f"{namespace}:done"
+        self._results = f"{namespace}:results"
+
+    @classmethod
+    def from_url(cls, url: str, **options: Any) -> RedisWorkQueue:
+        """
+        Cria a fila a partir de uma URL (`redis://host:6379/0`). Requer o pacote `redis`
+        (`poetry install -E redis`).
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "RedisWorkQueue.from_url requires the 'redis' package"
+            ) from e
+        namespace = options.pop("namespace", "datalar:queue")
+        return cls(redis.Redis.from_url(url), namespace, **options)
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.namespace}:task:{task_id}"
+
+    def put(self, payload, task_id=None, *, max_attempts=None, delay=0.0) -> str:
+        task_id = task_id or uuid.uuid4().hex
+        key = self._key(task_id)
+        # HSETNX no campo `payload` decide, atomicamente, quem cria a tarefa
+        if not self.client.hsetnx(key, "payload", json.dumps(payload)):
+            return task_id
+        self.client.hset(
+            key,
+            mapping={
+                "attempts": 0,
+                "max_attempts": max_attempts or self.max_attempts,
+                "state": "pending",
+            },
+        )
+        self.client.zadd(self._pending, {task_id: self.clock() + delay})
+        return task_id
+
+    def _reclaim(self, now: float) -> None:
+        """
+        Devolve à fila as tarefas com arrendamento expirado.
+        """
+        for task_id in self.client.zrangebyscore(self._leased, "-inf", now):
+            task_id = _text(task_id)
+            # apenas um worker consegue remover a tarefa dos arrendamentos
+            if not self.client.zrem(self._leased, task_id):
+                continue
+            key = self._key(task_id)
+            attempts, max_attempts, state = self.client.hmget(
+                key, "attempts", "max_attempts", "state"
+            )
+            state = _text(state)
+            if state in ("done", "dead"):
+                continue
+            # `pending`: o worker caiu antes de marcar a tarefa como arrendada
+            if state == "leased" and int(attempts) >= int(max_attempts):
+                self.client.hset(
+                    key, mapping={"state": "dead", "error": "lease expired"}
+                )
+                self.client.sadd(self._dead, task_id)
+            else:
+                self.client.hset(key, "state", "pending")
+                self.client.zadd(self._pending, {task_id: now})
+            # um `complete` atrasado pode ter gravado o resultado depois da leitura do
+            # estado; a verificação vem depois da escrita para não deixar janela
+            if self.client.hexists(self._results, task_id):
+                self._mark_done(task_id)
+
+    def lease(self, visibility_timeout=None) -> Optional[Task]:
+        now = self.clock()
+        self._reclaim(now)
+        expires_at = now + (visibility_timeout or self.visibility_timeout)
+        candidates = self.client.zrangebyscore(self._pending, "-inf", now, 0, 16)
+        for task_id in candidates:
+            task_id = _text(task_id)
+            # entra nos arrendamentos antes de sair dos disponíveis: se o worker cair
+            # entre os dois comandos, a tarefa continua recuperável
+            self.client.zadd(self._leased, {task_id: expires_at})
+            if not self.client.zrem(self._pending, task_id):
+                continue
+            key = self._key(task_id)
+            token = uuid.uuid4().hex
+            attempts = self.client.hincrby(key, "attempts", 1)
+            self.client.hset(key, mapping={"state": "leased", "lease_token": token})
+            payload, max_attempts = self.client.hmget(key, "payload", "max_attempts")
+            return Task(
+                task_id,
+                json.loads(payload),
+                attempts,
+                int(max_attempts),
+                token,
+                expires_at,
+            )
+        return None
+
+    def _owns(self, task: Task) -> bool:
+        key = self._key(task.id)
+        state, token = self.client.hmget(key, "state", "lease_token")
+        return _text(state) == "leased" and _text(token) == task.lease_token
+
+    def extend(self, task, visibility_timeout=None) -> bool:
+        if not self._owns(task):
+            return False
+        expires_at = self.clock() + (visibility_timeout or self.visibility_timeout)
+        self.client.zadd(self._leased, {task.id: expires_at})
+        return True
+
+    def complete(self, task, result=None) -> bool:
+        committed = self.client.hsetnx(self._results, task.id, json.dumps(result))
+        # mesmo sem gravar o resultado, limpa a tarefa caso um `_reclaim` concorrente a
+        # tenha devolvido à fila depois do primeiro `complete`
+        self._mark_done(task.id)
+        return bool(committed)
+
+    def _mark_done(self, task_id: str) -> None:
+        key = self._key(task_id)
+        self.client.hset(key, "state", "done")
+        self.client.hdel(key, "lease_token")
+        self.client.zrem(self._leased, task_id)
+        self.client.zrem(self._pending, task_id)
+        self.client.srem(self._dead, task_id)
+        self.client.sadd(self._done, task_id)
+
+    def fail(self, task, error, retry_delay=0.0) -> TaskState:
+        state: TaskState = "dead" if task.attempts >= task.max_attempts else "pending"
+        if not self._owns(task) or not self.client.zrem(self._leased, task.id):
+            return state
+        key = self._key(task.id)
+        self.client.hset(key, mapping={"state": state, "error": error})
+        self.client.hdel(key, "lease_token")
+        if state == "dead":
+            self.client.sadd(self._dead, task.id)
+        else:
+            self.client.zadd(self._pending, {task.id: self.clock() + retry_delay})
+        return state
+
+    def release(self, task) -> bool:
+        if not self._owns(task) or not self.client.zrem(self._leased, task.id):
+            return False
+        key = self._key(task.id)
+        self.client.hincrby(key, "attempts", -1)
+        self.client.hset(key, "state", "pending")
+        self.client.hdel(key, "lease_token")
+        self.client.zadd(self._pending, {task.id: self.clock()})
+        return True
+
+    def result(self, task_id) -> Any:
+        value = self.client.hget(self._results, task_id)
+        return json.loads(value) if value is not None else None
+
+    def dead_letters(self) -> List[DeadLetter]:
+        letters = []
+        for task_id in sorted(_text(t) for t in self.client.smembers(self._dead)):
+            payload, attempts, error = self.client.hmget(
+                self._key(task_id), "payload", "attempts", "error"
+            )
+            letters.append(
+                DeadLetter(task_id, json.loads(payload), int(attempts), _text(error))
+            )
+        return letters
+
+    def requeue(self, task_id) -> bool:
+        if not self.client.srem(self._dead, task_id):
+            return False
+        self.client.hset(
+            self._key(task_id), mapping={"state": "pending", "attempts": 0}
+        )
+        self.client.zadd(self._pending, {task_id: self.clock()})
+        return True
+
+    def counts(self) -> Dict[TaskState, int]:
+        return {
+            "pending": self.client.zcard(self._pending),
+            "leased": self.client.zcard(self._leased),
+            "done": self.client.scard(self._done),
+            "dead": self.client.scard(self._dead),
+        }
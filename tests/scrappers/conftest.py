@@ -0,0 +1,49 @@
+import copy
+
+import pytest
+
+from benchmarks.samples import LISTING, PROPERTY
+
+
+def _deep_update(data: dict, overrides: dict) -> dict:
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            _deep_update(data[key], value)
+        else:
+            data[key] = value
+    return data
+
+
+@pytest.fixture
+def make_raw_listing():
+    """
+    Retorna uma fábrica de listagens no formato bruto da API (camelCase).
+    Os argumentos nomeados sobrescrevem (recursivamente) os valores padrão.
+    """
+
+    def factory(**overrides) -> dict:
+        return _deep_update(copy.deepcopy(LISTING), overrides)
+
+    return factory
+
+
+@pytest.fixture
+def make_listing(make_raw_listing):
+    """
+    Retorna uma fábrica de objetos `ListingData` já validados.
+    """
+    from datalar.scrapers.zap_imoveis.sdk.schemas import ListingData
+    from datalar.scrapers.zap_imoveis.sdk.utils import normalize_keys
+
+    def factory(**overrides):
+        return ListingData(**normalize_keys(make_raw_listing(**overrides)))
+
+    return factory
+
+
+@pytest.fixture
+def property_row() -> dict:
+    """
+    Retorna um registro válido de `PropertySchema`, como armazenado.
+    """
+    return dict(PROPERTY)
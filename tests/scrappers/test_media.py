@@ -0,0 +1,133 @@
+import io
+
+import httpx
+import pytest
+
+from datalar.scrapers.media import MediaDownloader, MediaStore, dhash, hamming
+
+PHOTO = bytes(range(256)) * 64
+
+
+class StandInCDN:
+    """
+    Servidor de mídias em memória, com suporte a `Range`, que pode interromper a primeira
+    resposta de uma URL no meio do corpo.
+    """
+
+    def __init__(self, files, fail_once=()):
+        self.files = files
+        self.fail_once = set(fail_once)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.requests.append((url, request.headers.get("Range")))
+        if url not in self.files:
+            return httpx.Response(404)
+        body = self.files[url]
+        if url in self.fail_once:
+            self.fail_once.discard(url)
+
+            async def interrupted():
+                yield body[: len(body) // 2]
+                raise httpx.ReadError("connection reset")
+
+            return httpx.Response(200, content=interrupted())
+        range_header = request.headers.get("Range")
+        if range_header:
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            return httpx.Response(
+                206,
+                content=body[start:],
+                headers={"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"},
+            )
+        return httpx.Response(200, content=body)
+
+
+def make_downloader(tmp_path, cdn):
+    return MediaDownloader(
+        MediaStore(str(tmp_path)), transport=httpx.MockTransport(cdn), retries=2
+    )
+
+
+def test_downloader_should_store_by_content_and_skip_known_urls(tmp_path):
+    cdn = StandInCDN(
+        {
+            "https://a.test/1.jpg": PHOTO,
+            "https://b.test/copy.jpg": PHOTO,
+            "https://a.test/2.jpg": b"other",
+        }
+    )
+    downloader = make_downloader(tmp_path, cdn)
+
+    results = downloader.download(
+        ["https://a.test/1.jpg", "https://b.test/copy.jpg", "https://a.test/2.jpg"]
+        + ["https://a.test/1.jpg", "https://a.test/missing.jpg"]
+    )
+
+    statuses = [r.status for r in results]
+    assert sorted(statuses[:3]) == ["duplicate", "stored", "stored"]
+    assert results[0] == results[3]
+    assert results[4].status == "failed" and results[4].error == "HTTP 404"
+    assert results[0].sha256 == results[1].sha256
+    with open(results[0].path, "rb") as f:
+        assert f.read() == PHOTO
+    assert len(cdn.requests) == 4
+
+    again = downloader.download(["https://b.test/copy.jpg"])
+    assert again[0].status == "cached"
+    assert len(cdn.requests) == 4
+    assert downloader.stats.cached == 1
+    assert downloader.stats.duplicates == 1
+
+
+def test_downloader_should_resume_interrupted_download(tmp_path):
+    url = "https://a.test/big.jpg"
+    cdn = StandInCDN({url: PHOTO}, fail_once=[url])
+    downloader = make_downloader(tmp_path, cdn)
+
+    [result] = downloader.download([url])
+
+    assert result.status == "stored"
+    with open(result.path, "rb") as f:
+        assert f.read() == PHOTO
+    assert cdn.requests == [(url, None), (url, f"bytes={len(PHOTO) // 2}-")]
+    assert downloader.stats.bytes_downloaded == len(PHOTO)
+
+
+def _image(size, fmt, **options):
+    Image = pytest.importorskip("PIL.Image")
+    image = Image.new("RGB", (64, 48))
+    image.putdata([(x * 4, y * 5, (x + y) % 256) for y in range(48) for x in range(64)])
+    out = io.BytesIO()
+    image.resize(size).save(out, fmt, **options)
+    return out.getvalue()
+
+
+def test_perceptual_hash_should_dedupe_recompressed_photos(tmp_path):
+    original = _image((64, 48), "PNG")
+    resized = _image((320, 240), "JPEG", quality=70)
+
+    assert hamming(dhash(original), dhash(resized)) <= 3
+    assert dhash(b"not an image") is None
+
+    cdn = StandInCDN(
+        {"https://a.test/1.png": original, "https://b.test/1.jpg": resized}
+    )
+    results = make_downloader(tmp_path, cdn).download(list(cdn.files))
+
+    assert [r.status for r in results] == ["stored", "duplicate"]
+    assert results[0].sha256 == results[1].sha256
+
+
+def test_downloader_should_fail_only_the_malformed_url_in_a_batch(tmp_path):
+    cdn = StandInCDN({"https://a.test/1.jpg": PHOTO, "https://b.test/2.jpg": b"other"})
+    downloader = make_downloader(tmp_path, cdn)
+
+    results = downloader.download(
+        ["https://a.test/1.jpg", "http://[bad/x.jpg", "https://b.test/2.jpg"]
+    )
+
+    assert [r.status for r in results] == ["stored", "failed", "stored"]
+    assert results[1].error.startswith("ValueError")
+    assert downloader.stats.failed == 1
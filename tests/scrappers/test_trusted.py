@@ -0,0 +1,53 @@
+import datetime as dt
+
+from datalar.scrapers.schemas import PropertySchema, PropertyType
+from datalar.scrapers.trusted import load_trusted, trusted_loader
+from datalar.scrapers.zap_imoveis.sdk.schemas import (
+    ListingData,
+    ListingDataAddressPoint,
+    ListingDataPricingInfos,
+)
+
+
+def test_loader_should_build_validators_upfront():
+    from pydantic_core import SchemaValidator
+
+    loader = trusted_loader(ListingData)
+
+    assert isinstance(ListingData.__pydantic_validator__, SchemaValidator)
+    assert trusted_loader(ListingData) is loader
+
+
+def test_loader_should_load_listings_from_json(make_listing):
+    listings = [make_listing(id=listing_id) for listing_id in ("1001", "1002")]
+    loader = trusted_loader(ListingData)
+    lines = [listing.model_dump_json().encode() for listing in listings]
+    array = "[" + ",".join(line.decode() for line in lines) + "]"
+
+    assert loader.from_json(lines[0]) == listings[0]
+    assert loader.from_json_lines([*lines, b"\n"]) == listings
+    assert loader.from_json_array(array) == listings
+    assert loader.from_dicts([listing.model_dump() for listing in listings]) == listings
+
+    loaded = loader.from_json(lines[0])
+    assert isinstance(loaded.pricing_infos[0], ListingDataPricingInfos)
+    assert isinstance(loaded.address.point, ListingDataAddressPoint)
+    assert isinstance(loaded.updated_at, dt.datetime)
+
+
+def test_loader_should_map_row_columns_to_property_schema(property_row):
+    columns = list(property_row)
+    rows = [tuple({**property_row, "id": str(i)}.values()) for i in range(3)]
+
+    props = trusted_loader(PropertySchema).from_rows(rows, columns)
+
+    assert [p.id for p in props] == ["0", "1", "2"]
+    assert props[0].property_type is PropertyType.RESIDENTIAL
+    assert props[0].rent_price is None
+
+
+def test_load_trusted_should_accept_json_and_dicts(property_row):
+    expected = PropertySchema(**property_row)
+
+    assert load_trusted(PropertySchema, expected.model_dump_json()) == expected
+    assert load_trusted(PropertySchema, property_row) == expected
@@ -0,0 +1,98 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def make_search_response(make_raw_listing):
+    """
+    Retorna uma fábrica de respostas de busca contendo as listagens informadas.
+    """
+
+    def factory(*listings: dict, total_count: int | None = None) -> dict:
+        listings = listings or (make_raw_listing(),)
+        return {
+            "search": {
+                "result": {"listings": [{"listing": item} for item in listings]},
+                "totalCount": len(listings) if total_count is None else total_count,
+            }
+        }
+
+    return factory
+
+
+class FakeListingsRoute:
+    """
+    Simula a rota de listagens sobre um conjunto de dados em memória, incluindo o
+    limite de profundidade da paginação.
+    """
+
+    def __init__(self, dataset, max_depth, make_raw=None):
+        self.dataset = dataset
+        self.max_depth = max_depth
+        self.make_raw = make_raw
+        self.count_calls = 0
+        self.search_calls = 0
+        self.parse_stats = []
+
+    def _filter(self, business_type="SALE", listing_type="USED", **filters):
+        def matches(item):
+            return (
+                item.business_type == business_type
+                and item.listing_type == listing_type
+                and filters.get("price_min", 0) <= item.price
+                and item.price <= (filters.get("price_max") or float("inf"))
+                and filters.get("usable_area_min", 0) <= item.area
+                and item.area <= (filters.get("usable_area_max") or float("inf"))
+                and filters.get("address_city", item.city) == item.city
+            )
+
+        return [item for item in self.dataset if matches(item)]
+
+    def count(self, **filters):
+        self.count_calls += 1
+        return len(self._filter(**filters))
+
+    def search(self, *, include_fields, page, size, _from, parse_data=True, **filters):
+        self.search_calls += 1
+        items = []
+        if _from + size <= self.max_depth:
+            items = self._filter(**filters)[_from : _from + size]
+        if parse_data:
+            return items
+        listings = [{"listing": self.make_raw(id=item.id)} for item in items]
+        return {"search": {"result": {"listings": listings}}}
+
+    def _record_parse(self, stats, errors):
+        self.parse_stats.append(stats)
+
+
+@pytest.fixture
+def dataset():
+    rng = random.Random(42)
+    return [
+        SimpleNamespace(
+            id=str(i),
+            business_type=rng.choice(["SALE", "RENT"]),
+            listing_type=rng.choice(["USED", "DEVELOPMENT"]),
+            price=rng.randint(1_000, 5_000_000),
+            area=rng.randint(20, 500),
+            city=rng.choice(["São Paulo", "Campinas"]),
+        )
+        for i in range(2_000)
+    ]
+
+
+@pytest.fixture
+def make_listings_route(dataset, make_raw_listing):
+    """
+    Retorna uma fábrica de `FakeListingsRoute` sobre `dataset` (ou sobre os itens
+    informados), com o limite de profundidade de 200 listagens.
+    """
+
+    def factory(items=None, max_depth: int = 200) -> FakeListingsRoute:
+        items = dataset if items is None else items
+        return FakeListingsRoute(items, max_depth, make_raw=make_raw_listing)
+
+    return factory
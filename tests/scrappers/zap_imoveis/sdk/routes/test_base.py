@@ -151,3 +151,93 @@ def test_route_when_log_response_is_true():
         mock_log_response.assert_called_once_with(
             f"Response from {resp.url} (status: {response.status_code}): {response.content.decode('utf-8', errors='ignore')}"
         )
+
+
+def _http2_api(handler) -> ZapGlueAPI:
+    import httpx
+
+    api = ZapGlueAPI(SDKConfig(HTTP2=True))
+    api._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return api
+
+
+def test_route_get_should_use_shared_http2_client_when_enabled():
+    import httpx
+
+    requests_seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        return httpx.Response(200, json={"data": "test"})
+
+    api = _http2_api(handler)
+
+    class TestRoute(Route):
+        resource_base_url = "test"
+
+    with patch("cloudscraper.create_scraper") as create_scraper:
+        response = TestRoute(api).get("/listings", params={"size": 1})
+
+    create_scraper.assert_not_called()
+    assert response.json() == {"data": "test"}
+    assert str(requests_seen[0].url) == api.BASE_URL + "test/listings?size=1"
+    assert requests_seen[0].headers["x-domain"] == ".zapimoveis.com.br"
+
+
+def test_route_get_should_raise_not_found_with_http2_client():
+    import httpx
+
+    api = _http2_api(lambda request: httpx.Response(404))
+
+    class TestRoute(Route):
+        resource_base_url = "test"
+
+    try:
+        TestRoute(api).get("/listings")
+    except Exception as e:
+        assert isinstance(e, NotFoundError)
+    else:
+        raise AssertionError("NotFoundError was not raised")
+
+
+def test_http2_client_should_be_created_once_and_closed():
+    api = ZapGlueAPI(SDKConfig(HTTP2=True))
+    client = api.http_client
+
+    assert api.http_client is client
+    api.close()
+    assert client.is_closed
+    assert api._http_client is None
+
+
+def test_route_headers_should_advertise_available_encodings():
+    api = ZapGlueAPI(SDKConfig())
+    encodings = api.listings.build_headers()["Accept-Encoding"].split(", ")
+
+    assert encodings[-2:] == ["gzip", "deflate"]
+    assert "zstd" in encodings and "br" in encodings
+
+
+def test_route_get_should_stream_compressed_body_with_http2_client():
+    import gzip
+
+    import httpx
+
+    body = b'{"data": "' + b"x" * 100_000 + b'"}'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, content=gzip.compress(body), headers={"Content-Encoding": "gzip"}
+        )
+
+    api = _http2_api(handler)
+
+    class TestRoute(Route):
+        resource_base_url = "test"
+
+    response = TestRoute(api).get("/listings", stream=True)
+    chunks = list(Route.iter_content(response, chunk_size=1024))
+    response.close()
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == body
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 import responses
 
+from datalar.scrapers.zap_imoveis.sdk.lazy import LazyListingData
 from datalar.scrapers.zap_imoveis.sdk.routes.listings import Listings
 from datalar.scrapers.zap_imoveis.sdk.sdk import SDKConfig, ZapGlueAPI
 
@@ -57,3 +58,58 @@ def test_listing_search_route_should_raise_error_if_page_is_out_of_bounds(
         assert (
             not mock_get.called
         ), "GET request should not be called with invalid page number"
+
+
+def test_parse_listing_data_should_return_lazy_listings_when_requested(
+    make_search_response,
+):
+    sdk = ZapGlueAPI(config=SDKConfig(RAISE_FOR_STATUS=False))
+
+    parsed = sdk.listings._parse_listing_data(make_search_response(), lazy=True)
+
+    assert len(parsed) == 1
+    assert isinstance(parsed[0], LazyListingData)
+    assert parsed[0].id == "1001"
+
+
+@responses.activate
+def test_listing_count_should_send_filters_and_return_total_count():
+    responses.add(
+        responses.GET,
+        "https://glue-api.zapimoveis.com.br/v2/listings",
+        json={"search": {"totalCount": 4321}},
+        status=200,
+    )
+    sdk = ZapGlueAPI(config=SDKConfig(RAISE_FOR_STATUS=False))
+
+    total = sdk.listings.count(
+        business_type="RENT", price_min=1000, address_city="São Paulo"
+    )
+
+    assert total == 4321
+    params = responses.calls[0].request.params
+    assert params["businessType"] == "RENT"
+    assert params["priceMin"] == "1000"
+    assert params["addressCity"] == "São Paulo"
+    assert params["includeFields"] == "search(totalCount)"
+    assert "priceMax" not in params
+
+
+@responses.activate
+def test_listing_search_should_stream_listings_one_by_one(
+    make_search_response, make_raw_listing
+):
+    responses.add(
+        responses.GET,
+        "https://glue-api.zapimoveis.com.br/v2/listings",
+        json=make_search_response(
+            make_raw_listing(), make_raw_listing(id="1002"), total_count=2
+        ),
+        status=200,
+    )
+    sdk = ZapGlueAPI(config=SDKConfig(RAISE_FOR_STATUS=False))
+
+    listings = sdk.listings.search(include_fields=MagicMock(), stream=True)
+
+    assert not isinstance(listings, list)
+    assert [listing.id for listing in listings] == ["1001", "1002"]
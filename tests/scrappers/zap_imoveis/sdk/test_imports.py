@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+# Orçamento de tempo para importar a SDK em um processo novo, relativo ao import do
+# pydantic no mesmo processo, para não depender da velocidade da máquina. A SDK leva
+# ~1.25x o tempo do pydantic (~75 ms contra ~60 ms); o limite é o dobro disso.
+# Regressões como voltar a importar cloudscraper no import são detectadas pelas
+# verificações de módulos abaixo.
+IMPORT_TIME_BUDGET = 2.5
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from pydantic import BaseModel
+baseline = time.perf_counter() - start
+start = time.perf_counter()
+import datalar.scrapers.zap_imoveis.sdk.sdk
+import datalar.scrapers.zap_imoveis.sdk.routes.listings
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "baseline": baseline,
+    "elapsed": elapsed,
+    "modules": [m for m in ("cloudscraper", "requests", "loguru") if m in sys.modules],
+}))
+"""
+
+
+def _import_sdk() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def test_sdk_import_should_not_load_heavy_dependencies():
+    assert _import_sdk()["modules"] == []
+
+
+def test_sdk_import_should_fit_in_time_budget():
+    timings = _import_sdk()
+    assert timings["elapsed"] < IMPORT_TIME_BUDGET * timings["baseline"]
+
+
+def test_schemas_should_build_validators_on_first_use():
+    from datalar.scrapers.zap_imoveis.sdk import schemas
+
+    assert schemas.ListingData.model_config["defer_build"] is True
+    assert schemas.FullSearchResponseFields().include_all().generate_string()
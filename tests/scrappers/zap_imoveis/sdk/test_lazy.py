@@ -0,0 +1,50 @@
+import datetime as dt
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from datalar.scrapers.zap_imoveis.sdk.lazy import LazyListingData
+from datalar.scrapers.zap_imoveis.sdk.schemas import ListingDataPricingInfos
+
+
+def test_lazy_listing_should_validate_only_accessed_fields(make_raw_listing):
+    listing = LazyListingData(make_raw_listing(unitTypes=["UNKNOWN_TYPE"]))
+
+    assert listing.id == "1001"
+    assert listing.updated_at == dt.datetime(2024, 2, 1, 8, tzinfo=dt.timezone.utc)
+    assert isinstance(listing.pricing_infos[0], ListingDataPricingInfos)
+    assert listing.pricing_infos[0].price == 700000
+    assert listing.address.zip_code == "01310-100"
+
+    # o campo inválido só é validado quando acessado
+    with pytest.raises(ValidationError):
+        listing.unit_types
+
+
+def test_lazy_listing_should_accept_json_bytes(make_raw_listing):
+    listing = LazyListingData(json.dumps(make_raw_listing()).encode())
+    assert listing.id == "1001"
+    assert listing.raw["sourceId"] == "src-1001"
+
+
+def test_lazy_listing_should_use_field_defaults(make_raw_listing):
+    raw = make_raw_listing()
+    del raw["mergedAmenities"]
+    listing = LazyListingData(raw)
+    assert listing.merged_amenities == []
+
+
+def test_lazy_listing_should_cache_validated_values(make_raw_listing):
+    listing = LazyListingData(make_raw_listing())
+    assert listing.pricing_infos is listing.pricing_infos
+
+
+def test_lazy_listing_should_raise_attribute_error_for_unknown_fields(make_raw_listing):
+    listing = LazyListingData(make_raw_listing())
+    with pytest.raises(AttributeError):
+        listing.not_a_field
+
+
+def test_lazy_listing_materialize_should_match_eager_parsing(make_raw_listing, make_listing):
+    assert LazyListingData(make_raw_listing()).materialize() == make_listing()
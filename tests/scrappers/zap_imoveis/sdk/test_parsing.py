@@ -0,0 +1,203 @@
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import ValidationError
+
+from datalar.scrapers.zap_imoveis.sdk.parsing import (
+    MIN_CHUNK_SIZE,
+    ParseStats,
+    create_parse_executor,
+    free_threading_enabled,
+    parse_listing,
+    parse_listings_chunk,
+    resolve_executor_kind,
+    split_chunks,
+)
+from datalar.scrapers.zap_imoveis.sdk.schemas import UNKNOWN
+from datalar.scrapers.zap_imoveis.sdk.sdk import SDKConfig, ZapGlueAPI
+
+
+@pytest.fixture
+def large_response(make_raw_listing, make_search_response):
+    listings = [make_raw_listing(id=str(i)) for i in range(5 * MIN_CHUNK_SIZE)]
+    listings[7] = make_raw_listing(id="broken", pricingInfos="not a list")
+    return make_search_response(*listings)
+
+
+def test_free_threading_detection(monkeypatch):
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+    assert free_threading_enabled()
+    assert resolve_executor_kind("auto") == "thread"
+
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+    assert not free_threading_enabled()
+    assert resolve_executor_kind("auto") == "process"
+
+    monkeypatch.delattr(sys, "_is_gil_enabled", raising=False)
+    assert not free_threading_enabled()
+
+
+def test_invalid_executor_kind_should_raise():
+    with pytest.raises(ValueError, match="Invalid parse executor"):
+        create_parse_executor("fibers")
+
+
+def test_split_chunks_should_keep_order_and_minimum_size():
+    items = list(range(100))
+
+    chunks = split_chunks(items, 8)
+
+    assert [i for chunk in chunks for i in chunk] == items
+    assert len(chunks) == 100 // MIN_CHUNK_SIZE
+    assert split_chunks(items[:5], 8) == [items[:5]]
+    assert split_chunks([], 8) == []
+
+
+def test_parse_listings_chunk_should_report_invalid_listings(make_raw_listing):
+    parsed, errors, stats = parse_listings_chunk(
+        [make_raw_listing(), make_raw_listing(pricingInfos="not a list")]
+    )
+
+    assert [listing.id for listing in parsed] == ["1001"]
+    assert len(errors) == 1
+    assert (stats.parsed, stats.dropped) == (1, 1)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_parsing_should_match_sequential_parsing(large_response, executor):
+    raw_listings = [
+        item["listing"] for item in large_response["search"]["result"]["listings"]
+    ]
+    expected, _, _ = parse_listings_chunk(raw_listings)
+    sdk = ZapGlueAPI(SDKConfig(PARSE_EXECUTOR=executor, PARSE_WORKERS=2))
+    sdk.logger = MagicMock()
+
+    try:
+        result = sdk.listings._parse_listing_data(large_response)
+    finally:
+        sdk.close()
+
+    assert result == expected
+    assert len(result) == 5 * MIN_CHUNK_SIZE - 1
+    sdk.logger.error.assert_called_once()
+    assert sdk.listings.parse_stats.dropped == 1
+    assert sdk._parse_executor is None
+
+
+def test_small_pages_should_be_parsed_inline(make_search_response):
+    sdk = ZapGlueAPI(SDKConfig(PARSE_EXECUTOR="thread"))
+    executor = sdk.parse_executor
+    executor.map = MagicMock()
+
+    assert len(sdk.listings._parse_listing_data(make_search_response())) == 1
+    executor.map.assert_not_called()
+    sdk.close()
+
+
+def test_tolerant_mode_should_coerce_unknown_enum_values(make_raw_listing):
+    stats = ParseStats()
+    raw = make_raw_listing(
+        constructionStatus="RENOVATING",
+        unitTypes=["APARTMENT", "CASTLE"],
+        status="INACTIVE",
+    )
+    raw["pricingInfos"][0]["businessType"] = "LEASE"
+
+    listing = parse_listing(raw, mode="tolerant", stats=stats)
+
+    assert listing.construction_status == UNKNOWN
+    assert listing.unit_types == ["APARTMENT", UNKNOWN]
+    assert listing.status == UNKNOWN
+    assert listing.pricing_infos[0].business_type == UNKNOWN
+    assert listing.pricing_infos[0].price == 700000
+    assert stats.recovered == 1
+    assert stats.field_errors == {
+        "construction_status": 1,
+        "unit_types": 1,
+        "status": 1,
+        "pricing_infos.business_type": 1,
+    }
+
+
+def test_tolerant_mode_should_drop_invalid_optional_values(make_raw_listing):
+    raw = make_raw_listing(floors=[1, "x", 3])
+    raw["pricingInfos"][0]["yearlyIptu"] = "abc"
+
+    listing = parse_listing(raw, mode="tolerant")
+
+    assert listing.floors == [1, 3]
+    assert listing.pricing_infos[0].yearly_iptu is None
+    assert listing.pricing_infos[0].monthly_condo_fee == 800
+
+
+def test_tolerant_mode_should_drop_invalid_list_items_not_the_listing(
+    make_raw_listing,
+):
+    stats = ParseStats()
+    raw = make_raw_listing(
+        propertyDevelopers=[
+            {"name": "X", "logoUrl": "not a url"},
+            {"name": "Y", "logoUrl": "https://example.com/y.png"},
+            {"logoUrl": "https://example.com/z.png"},
+        ]
+    )
+
+    [listing], _, chunk_stats = parse_listings_chunk([raw], mode="tolerant")
+    assert [developer.name for developer in listing.property_developers] == ["Y"]
+    assert chunk_stats.recovered == 1 and chunk_stats.dropped == 0
+
+    listing = parse_listing(raw, mode="tolerant", stats=stats)
+    assert stats.field_errors == {
+        "property_developers.logo_url": 1,
+        "property_developers.name": 1,
+    }
+
+
+def test_tolerant_mode_should_drop_listings_missing_required_fields(
+    make_raw_listing,
+):
+    stats = ParseStats()
+    raw = make_raw_listing(constructionStatus="RENOVATING")
+    del raw["id"]
+
+    with pytest.raises(ValidationError):
+        parse_listing(raw, mode="tolerant", stats=stats)
+
+    assert stats.dropped == 1
+    assert stats.field_errors == {"id": 1, "construction_status": 1}
+
+
+def test_strict_mode_should_drop_listings_with_unknown_enum_values(make_raw_listing):
+    stats = ParseStats()
+
+    with pytest.raises(ValidationError):
+        parse_listing(make_raw_listing(status="INACTIVE"), stats=stats)
+
+    assert stats.dropped == 1
+    assert stats.field_errors == {"status": 1}
+
+
+def test_strict_mode_should_not_accept_the_unknown_fallback(make_raw_listing):
+    raw = make_raw_listing(status=UNKNOWN)
+    raw["pricingInfos"][0]["businessType"] = UNKNOWN
+
+    with pytest.raises(ValidationError):
+        parse_listing(raw)
+    assert parse_listing(raw, mode="tolerant").status == UNKNOWN
+
+
+def test_listings_route_should_keep_listings_in_tolerant_mode(
+    make_raw_listing, make_search_response
+):
+    sdk = ZapGlueAPI(SDKConfig(PARSE_MODE="tolerant"))
+    sdk.logger = MagicMock()
+    response = make_search_response(
+        make_raw_listing(), make_raw_listing(id="2", contractType="AGENCY")
+    )
+
+    parsed = sdk.listings._parse_listing_data(response)
+
+    assert [listing.contract_type for listing in parsed] == ["REAL_ESTATE", UNKNOWN]
+    assert sdk.listings.parse_stats.field_errors == {"contract_type": 1}
+    sdk.logger.error.assert_not_called()
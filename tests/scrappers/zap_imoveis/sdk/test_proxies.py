@@ -0,0 +1,254 @@
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from datalar.scrapers.zap_imoveis.sdk.proxies import NoProxyAvailableError, ProxyPool
+from datalar.scrapers.zap_imoveis.sdk.sdk import SDKConfig, ZapGlueAPI
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StandInProxy:
+    """
+    Proxy HTTP local que responde às requisições no lugar da API: recebe a URL absoluta
+    (como um proxy de encaminhamento), registra os cookies enviados e define um cookie de
+    liberação próprio.
+    """
+
+    def __init__(self, name: str, status: int = 200) -> None:
+        self.name = name
+        self.status = status
+        self.paths = []
+        self.cookies = Counter()
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                proxy.paths.append(self.path)
+                proxy.cookies[self.headers.get("Cookie")] += 1
+                body = json.dumps({"search": {"totalCount": 7}}).encode()
+                self.send_response(proxy.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header(
+                    "Set-Cookie", f"cf_clearance={proxy.name}; Domain=zap.test; Path=/"
+                )
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in_proxies():
+    proxies = []
+
+    def factory(name, status=200):
+        proxy = StandInProxy(name, status)
+        proxies.append(proxy)
+        return proxy
+
+    yield factory
+    for proxy in proxies:
+        proxy.close()
+
+
+def _sdk(pool: ProxyPool, **config) -> ZapGlueAPI:
+    sdk = ZapGlueAPI(SDKConfig(PROXY_POOL=pool, RAISE_FOR_STATUS=False, **config))
+    sdk.BASE_URL = "http://zap.test/v2/"
+    return sdk
+
+
+def test_acquire_should_respect_per_proxy_concurrency():
+    pool = ProxyPool(["http://a", "http://b"], max_concurrency=2)
+
+    acquired = [pool.acquire() for _ in range(4)]
+
+    assert Counter(p.url for p in acquired) == {"http://a": 2, "http://b": 2}
+    with pytest.raises(NoProxyAvailableError):
+        pool.acquire(timeout=0.01)
+
+    pool.release(acquired[0], latency=0.1)
+    assert pool.acquire(timeout=0.01) is acquired[0]
+
+
+def test_acquire_should_prefer_faster_and_healthier_proxies():
+    pool = ProxyPool(["http://slow", "http://fast"], max_concurrency=4)
+    slow, fast = pool.proxies
+    slow.latency, fast.latency = 0.8, 0.2
+
+    assert pool.acquire() is fast
+
+    fast.block_rate = 0.45
+    assert pool.acquire() is slow
+
+
+def test_blocked_proxy_should_be_quarantined_and_recover_after_probe():
+    clock = FakeClock()
+    pool = ProxyPool(
+        ["http://a"], max_consecutive_failures=2, quarantine=10, clock=clock
+    )
+    proxy = pool.proxies[0]
+    proxy.session = object()
+
+    for _ in range(2):
+        pool.release(pool.acquire(), blocked=True)
+
+    assert proxy.quarantined(clock.now)
+    assert proxy.session is None
+    with pytest.raises(NoProxyAvailableError):
+        pool.acquire(timeout=0)
+
+    clock.now = 10
+    probe = pool.acquire(timeout=0)
+    # em período de teste, o proxy aceita apenas uma requisição por vez
+    with pytest.raises(NoProxyAvailableError):
+        pool.acquire(timeout=0)
+
+    pool.release(probe, latency=0.1)
+    assert not proxy.probation
+    assert len([pool.acquire(timeout=0) for _ in range(4)]) == 4
+
+
+def test_failed_probe_should_double_quarantine():
+    clock = FakeClock()
+    pool = ProxyPool(
+        ["http://a"], max_consecutive_failures=1, quarantine=10, clock=clock
+    )
+    proxy = pool.proxies[0]
+
+    pool.release(pool.acquire(), blocked=True)
+    assert proxy.quarantined_until == 10
+
+    clock.now = 10
+    pool.release(pool.acquire(timeout=0), error=True)
+    assert proxy.quarantined_until == 30
+
+
+def test_lease_should_count_exceptions_as_errors():
+    pool = ProxyPool(["http://a"])
+
+    with pytest.raises(ConnectionError):
+        with pool.lease():
+            raise ConnectionError("connection reset")
+
+    stats = pool.stats()[0]
+    assert stats["errors"] == 1
+    assert stats["in_flight"] == 0
+
+
+class FakeSession:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_quarantined_session_should_be_closed_after_its_last_lease():
+    pool = ProxyPool(["http://a"], max_consecutive_failures=1)
+    with pool.lease() as slow:
+        session = slow.session(lambda proxy: FakeSession())
+        with pool.lease() as blocked:
+            assert blocked.session(lambda proxy: FakeSession()) is session
+            blocked.report(429)
+
+        assert pool.proxies[0].session is None
+        assert not session.closed
+        slow.report(200)
+
+    assert session.closed
+
+
+def test_detached_lease_should_hold_the_proxy_until_closed():
+    pool = ProxyPool(["http://a"], max_concurrency=1)
+    with pool.lease() as lease:
+        lease.report(200)
+        lease.detach()
+
+    assert pool.stats()[0]["in_flight"] == 1
+    lease.close()
+    lease.close()
+    assert pool.stats()[0]["in_flight"] == 0
+    assert pool.stats()[0]["requests"] == 1
+
+
+def test_stream_response_should_hold_the_lease_until_closed(stand_in_proxies):
+    proxy = stand_in_proxies("a")
+    pool = ProxyPool([proxy.url])
+    sdk = _sdk(pool)
+
+    resp = sdk.listings.get(stream=True)
+    assert pool.stats()[0]["in_flight"] == 1
+    assert b"".join(sdk.listings.iter_content(resp))
+    resp.close()
+    sdk.close()
+
+    assert pool.stats()[0]["in_flight"] == 0
+
+
+def test_sdk_should_accept_proxy_urls_in_config():
+    config = SDKConfig(PROXY_POOL=["http://a", "http://b"])
+
+    assert isinstance(config.PROXY_POOL, ProxyPool)
+    assert len(config.PROXY_POOL) == 2
+
+
+@pytest.mark.parametrize("http2", [False, True])
+def test_requests_should_rotate_through_stand_in_proxies(stand_in_proxies, http2):
+    proxies = [stand_in_proxies("a"), stand_in_proxies("b")]
+    pool = ProxyPool([p.url for p in proxies], max_concurrency=1)
+    sdk = _sdk(pool, HTTP2=http2)
+
+    def count():
+        for _ in range(5):
+            assert sdk.listings.count(business_type="SALE") == 7
+
+    threads = [threading.Thread(target=count) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sdk.close()
+
+    assert sum(len(p.paths) for p in proxies) == 10
+    assert all(p.paths for p in proxies)
+    assert proxies[0].paths[0].startswith("http://zap.test/v2/listings?")
+    # cada proxy reenvia apenas o cookie de liberação que ele mesmo obteve
+    for proxy in proxies:
+        assert set(proxy.cookies) <= {None, f"cf_clearance={proxy.name}"}
+        assert proxy.cookies[None] == 1
+
+
+def test_blocking_stand_in_proxy_should_be_quarantined(stand_in_proxies):
+    blocked = stand_in_proxies("blocked", status=429)
+    healthy = stand_in_proxies("healthy")
+    pool = ProxyPool([blocked.url, healthy.url], max_consecutive_failures=2)
+    pool.proxies[0].latency = 0.0  # o proxy bloqueado é o preferido inicialmente
+    sdk = _sdk(pool)
+
+    for _ in range(10):
+        sdk.listings.get(params={"size": 1})
+    sdk.close()
+
+    assert len(blocked.paths) == 2
+    assert len(healthy.paths) == 8
+    assert pool.stats()[0]["quarantined"]
@@ -136,3 +136,31 @@ def test_listings_property_lazy_loads_correctly(mocker):
     mock_listings_class.assert_called_once()
     # A instância retornada deve ser a mesma do primeiro acesso.
     assert listings_instance1 is listings_instance2
+
+
+def test_http_client_should_be_created_once_across_threads(mocker):
+    """
+    Testa se threads concorrentes compartilham o mesmo cliente HTTP/2.
+    """
+    import threading
+    import time
+
+    sdk = ZapGlueAPI()
+
+    def slow_client(proxy=None):
+        time.sleep(0.05)
+        return MagicMock()
+
+    create = mocker.patch.object(sdk, "create_http_client", side_effect=slow_client)
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(sdk.http_client))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    create.assert_called_once()
+    assert all(client is clients[0] for client in clients)
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from datalar.scrapers.zap_imoveis.sdk.sdk import SDKConfig, ZapGlueAPI
+from datalar.scrapers.zap_imoveis.sdk.singleflight import (
+    AsyncSingleFlight,
+    SingleFlight,
+    request_key,
+)
+
+WORKERS = 8
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met")
+        time.sleep(0.001)
+
+
+def test_request_key_should_ignore_parameter_order():
+    assert request_key("get", "u", {"a": 1, "b": "x"}) == request_key(
+        "GET", "u", {"b": "x", "a": 1}
+    )
+    assert request_key("GET", "u", {"a": 1}) != request_key("GET", "u", {"a": 2})
+
+
+def test_concurrent_identical_calls_should_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        # mantém a chamada em andamento até que todas as threads estejam aguardando
+        _wait_for(lambda: flight.stats.coalesced == WORKERS - 1)
+        return object()
+
+    with ThreadPoolExecutor(WORKERS) as executor:
+        results = list(executor.map(lambda _: flight.do("k", fetch), range(WORKERS)))
+
+    assert len(executions) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats.calls == WORKERS
+    assert flight.stats.executions == 1
+    assert flight.in_flight() == 0
+
+
+def test_errors_should_be_shared_and_not_cached():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        _wait_for(lambda: flight.stats.coalesced == 1)
+        raise ConnectionError("boom")
+
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(flight.do, "k", failing)
+        started.wait()
+        follower = executor.submit(flight.do, "k", lambda: "unused")
+        for future in (leader, follower):
+            with pytest.raises(ConnectionError):
+                future.result()
+
+    assert flight.do("k", lambda: "fresh") == "fresh"
+
+
+def test_async_single_flight_should_coalesce_tasks():
+    flight = AsyncSingleFlight()
+    executions = []
+
+    async def fetch():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(WORKERS)))
+
+    assert asyncio.run(main()) == ["result"] * WORKERS
+    assert len(executions) == 1
+    assert flight.stats.coalesced == WORKERS - 1
+
+
+def test_async_single_flight_should_survive_waiter_cancellation():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_route_get_should_coalesce_identical_requests():
+    sdk = ZapGlueAPI(SDKConfig(SINGLE_FLIGHT=True, RAISE_FOR_STATUS=False))
+    response = MagicMock(status_code=200)
+
+    def send(*args, **kwargs):
+        _wait_for(lambda: sdk.single_flight.stats.coalesced == WORKERS - 1)
+        return response
+
+    with patch.object(type(sdk.listings), "_send", side_effect=send) as mock_send:
+        with ThreadPoolExecutor(WORKERS) as executor:
+            results = list(
+                executor.map(
+                    lambda _: sdk.listings.get(params={"size": 1, "page": 1}),
+                    range(WORKERS),
+                )
+            )
+
+    assert mock_send.call_count == 1
+    assert all(result is response for result in results)
+    assert sdk.single_flight.stats.coalesced == WORKERS - 1
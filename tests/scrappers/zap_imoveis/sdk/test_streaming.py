@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from datalar.scrapers.zap_imoveis.sdk.streaming import iter_json_array
+
+PATH = ("search", "result", "listings")
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 100_000])
+def test_iter_json_array_should_handle_any_chunk_boundary(chunk_size):
+    items = [
+        {"listing": {"id": "1", "title": "Apartamento à venda", "price": 700000}},
+        {"listing": {"id": "2", "title": "Casa com varanda — São Paulo"}},
+        123456789,
+        -1.5e3,
+        "texto",
+    ]
+    body = json.dumps(
+        {
+            "page": {"uriPagination": {"page": 1}},
+            "search": {"totalCount": 5, "result": {"listings": items}},
+        },
+        ensure_ascii=False,
+    ).encode()
+
+    assert list(iter_json_array(_chunks(body, chunk_size), PATH)) == items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+def test_iter_json_array_should_skip_members_with_brackets_inside_strings(chunk_size):
+    items = [{"title": 'aspas " e barra \\ e chaves {[]}'}, "\\", 10]
+    body = json.dumps(
+        {
+            "page": {"text": '}"{[', "nested": [1, {"escaped": "\\"}, "]"]},
+            "count": 12,
+            "search": {"flag": True, "result": {"listings": items}},
+        }
+    ).encode()
+
+    assert list(iter_json_array(_chunks(body, chunk_size), PATH)) == items
+
+
+def test_iter_json_array_should_stop_reading_after_the_array():
+    chunks = iter([b'{"search": {"result": {"listings": [1, 2]', b"}, GARBAGE"])
+
+    assert list(iter_json_array(chunks, PATH)) == [1, 2]
+
+
+def test_iter_json_array_should_yield_nothing_for_empty_array():
+    body = b'{"search": {"result": {"listings": [ ]}}}'
+
+    assert list(iter_json_array([body], PATH)) == []
+
+
+def test_iter_json_array_should_raise_key_error_when_path_is_missing():
+    body = b'{"search": {"totalCount": 0}}'
+
+    with pytest.raises(KeyError, match="search.result"):
+        list(iter_json_array(_chunks(body, 4), PATH))
+
+
+def test_iter_json_array_should_raise_value_error_when_truncated():
+    body = b'{"search": {"result": {"listings": [{"id": "1"}, {"id": '
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(_chunks(body, 5), PATH))
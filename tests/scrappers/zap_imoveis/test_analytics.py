@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from datalar.scrapers.zap_imoveis.analytics import ListingFrame
+
+
+def _pricing(price, business_type="SALE", **extra):
+    return [{"price": price, "businessType": business_type, **extra}]
+
+
+@pytest.fixture
+def raw_listings(make_raw_listing):
+    return [
+        make_raw_listing(id="1", usableAreas=[100], pricingInfos=_pricing(1_000_000)),
+        make_raw_listing(id="2", usableAreas=[50], pricingInfos=_pricing(400_000)),
+        make_raw_listing(id="3", usableAreas=[80], pricingInfos=_pricing(4_000, "RENTAL")),
+        make_raw_listing(
+            id="4",
+            usableAreas=[60],
+            pricingInfos=_pricing(300_000),
+            address={"city": "Campinas", "neighborhood": "Cambuí"},
+        ),
+        make_raw_listing(id="5", usableAreas=[], pricingInfos=_pricing(900_000)),
+    ]
+
+
+def test_listing_frame_from_raw_and_from_listings_should_match(raw_listings, make_listing):
+    from_raw = ListingFrame.from_raw(raw_listings)
+    from_models = ListingFrame.from_listings([make_listing(**raw) for raw in raw_listings])
+
+    assert len(from_raw) == len(from_models) == 5
+    np.testing.assert_array_equal(from_raw.price, from_models.price)
+    np.testing.assert_array_equal(from_raw.usable_area, from_models.usable_area)
+    np.testing.assert_array_equal(from_raw.neighborhood, from_models.neighborhood)
+    assert from_raw.labels == from_models.labels
+
+
+def test_group_stats_should_compute_price_per_m2_percentiles_by_neighborhood(
+    raw_listings,
+):
+    frame = ListingFrame.from_raw(raw_listings)
+    stats = frame.group_stats(
+        by=("state", "city", "neighborhood"), business_type="SALE"
+    )
+
+    records = {r["neighborhood"]: r for r in stats.to_records()}
+    assert set(records) == {"Bela Vista", "Cambuí"}
+    # a listagem sem área útil é descartada
+    assert records["Bela Vista"]["count"] == 2
+    assert records["Bela Vista"]["p50"] == pytest.approx(9_000)
+    assert records["Bela Vista"]["p25"] == pytest.approx(8_500)
+    assert records["Cambuí"]["mean"] == pytest.approx(5_000)
+
+
+def test_group_stats_should_match_numpy_percentiles(raw_listings):
+    frame = ListingFrame.from_raw(raw_listings * 3)
+    stats = frame.group_stats(by=("business_type",), metric="price", percentiles=(10, 90))
+
+    for key, p10, p90 in zip(stats.keys, stats.percentiles[10], stats.percentiles[90]):
+        code = frame.labels["business_type"].index(key[0])
+        values = frame.price[frame.business_type == code]
+        assert p10 == pytest.approx(np.percentile(values, 10))
+        assert p90 == pytest.approx(np.percentile(values, 90))
+
+
+def test_group_stats_should_keep_full_label_without_parent_keys(raw_listings):
+    stats = ListingFrame.from_raw(raw_listings).group_stats(by=("city",))
+    assert ("SP", "São Paulo") in [key[0] for key in stats.keys]
+
+
+def test_rental_yield_should_compare_rent_and_sale_medians(raw_listings):
+    frame = ListingFrame.from_raw(raw_listings)
+    yields = frame.rental_yield()
+
+    # aluguel: 4000 / 80 = 50/m² por mês; venda: mediana de 9000/m²
+    assert yields == {("SP", "São Paulo", "Bela Vista"): pytest.approx(12 * 50 / 9_000)}
+
+
+def test_group_stats_should_reject_unknown_metric(raw_listings):
+    with pytest.raises(ValueError, match="Unknown metric"):
+        ListingFrame.from_raw(raw_listings).group_stats(metric="rooms")
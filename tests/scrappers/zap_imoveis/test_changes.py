@@ -0,0 +1,120 @@
+import pytest
+
+from datalar.scrapers.zap_imoveis.changes import (
+    ChangeFeed,
+    ChangeLog,
+    ChangeType,
+    ListingState,
+)
+
+
+def _state(listing_id, price=1000, status="ACTIVE", updated_at="2024-01-01T00:00:00"):
+    return ListingState(listing_id, (("SALE", price),), status, updated_at)
+
+
+@pytest.fixture
+def feed(tmp_path):
+    return ChangeFeed(
+        str(tmp_path / "state"),
+        partitions=4,
+        log=ChangeLog(str(tmp_path / "log.jsonl")),
+    )
+
+
+def test_first_crawl_should_emit_only_new_listings(feed):
+    events = []
+    feed.subscribe(events.append)
+
+    summary = feed.diff([_state("1"), _state("2")])
+
+    assert summary.listings == 2
+    assert summary.counts[ChangeType.NEW] == 2
+    assert sorted(e.listing_id for e in events) == ["1", "2"]
+    assert sorted(s.id for s in feed.stored()) == ["1", "2"]
+
+
+def test_diff_should_emit_typed_changes(feed):
+    feed.diff([_state(str(i)) for i in range(10)])
+    events = []
+    feed.subscribe(events.append)
+
+    summary = feed.diff(
+        [_state("0", price=900), _state("1", status="INACTIVE")]
+        + [_state(str(i)) for i in range(2, 9)]
+        + [_state("new")]
+    )
+
+    by_id = {e.listing_id: e for e in events}
+    assert by_id["0"].type == ChangeType.PRICE_CHANGED
+    assert (by_id["0"].old.price("SALE"), by_id["0"].new.price("SALE")) == (1000, 900)
+    assert by_id["1"].type == ChangeType.CHANGED
+    assert by_id["9"].type == ChangeType.REMOVED and by_id["9"].new is None
+    assert by_id["new"].type == ChangeType.NEW
+    assert len(events) == 4
+    assert summary.counts == {
+        ChangeType.NEW: 1,
+        ChangeType.PRICE_CHANGED: 1,
+        ChangeType.CHANGED: 1,
+        ChangeType.REMOVED: 1,
+    }
+    assert "9" not in {s.id for s in feed.stored()}
+
+
+def test_partial_crawl_should_keep_missing_listings(feed):
+    feed.diff([_state("1"), _state("2")])
+
+    summary = feed.diff([_state("1", price=1)], complete=False)
+
+    assert summary.counts[ChangeType.REMOVED] == 0
+    assert {s.id: s.price("SALE") for s in feed.stored()} == {"1": 1, "2": 1000}
+
+
+def test_changing_partitions_should_repartition_the_previous_state(feed):
+    feed.diff([_state(str(i)) for i in range(20)])
+    feed = ChangeFeed(feed.state_dir, partitions=7, log=feed.log)
+    events = []
+    feed.subscribe(events.append)
+
+    summary = feed.diff([_state(str(i)) for i in range(1, 20)] + [_state("new")])
+
+    assert sorted((e.type, e.listing_id) for e in events) == [
+        (ChangeType.NEW, "new"),
+        (ChangeType.REMOVED, "0"),
+    ]
+    assert summary.listings == 20
+    assert len(list(feed.stored())) == 20
+
+
+def test_log_should_be_append_only_and_resumable(feed):
+    feed.diff([_state("1")])
+    first = list(feed.log.read())
+    offset = first[-1][0]
+
+    feed.diff([_state("1", price=2)])
+
+    resumed = [event for _, event in feed.log.read(offset)]
+    assert [e.type for e in resumed] == [ChangeType.PRICE_CHANGED]
+    assert resumed[0].new.prices == (("SALE", 2),)
+    assert len(list(feed.log.read())) == 2
+
+
+def test_failed_subscriber_should_keep_previous_state(feed):
+    feed.diff([_state("1")])
+
+    def fail(event):
+        raise RuntimeError("consumer down")
+
+    feed.subscribe(fail)
+    with pytest.raises(RuntimeError):
+        feed.diff([_state("1", price=5)])
+
+    assert [s.price("SALE") for s in feed.stored()] == [1000]
+
+
+def test_listing_state_should_be_built_from_listing(make_listing):
+    state = ListingState.from_listing(make_listing())
+
+    assert state.id == "1001"
+    assert state.prices == (("SALE", 700000),)
+    assert state.status == "ACTIVE"
+    assert state.updated_at.startswith("2024-02-01T08:00:00")
@@ -0,0 +1,61 @@
+import tracemalloc
+
+from datalar.scrapers.zap_imoveis.compact import CompactListings
+
+
+def test_compact_listings_should_round_trip_to_listing_data(make_listing):
+    listings = [
+        make_listing(id="1"),
+        make_listing(
+            id="2",
+            address={"point": None, "street": None},
+            pricingInfos=[
+                {
+                    "price": 3500,
+                    "businessType": "RENTAL",
+                    "rentalInfo": {
+                        "period": "MONTHLY",
+                        "warranties": ["DEPOSIT"],
+                        "monthlyRentalTotalPrice": 4300,
+                    },
+                }
+            ],
+            propertyDevelopers=[{"name": "Construtora", "logoUrl": "https://x.com/l.png"}],
+        ),
+    ]
+
+    collection = CompactListings.from_listings(listings)
+
+    assert len(collection) == 2
+    assert collection[1].pricing_infos[0].rental_period == "MONTHLY"
+    assert collection.to_listings() == listings
+
+
+def test_compact_listings_should_share_repeated_values(make_listing):
+    collection = CompactListings.from_listings(
+        make_listing(id=str(i), address={"city": "".join(["Cam", "pinas"])})
+        for i in range(3)
+    )
+
+    first, second = collection[0], collection[1]
+    assert first.address.city is second.address.city
+    assert first.amenities is second.amenities
+    assert first.pricing_infos[0].business_type is second.pricing_infos[0].business_type
+
+
+def test_compact_listings_should_use_less_memory_than_models(make_listing):
+    def allocated(factory):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            kept = factory()
+            return tracemalloc.get_traced_memory()[0] - before, kept
+        finally:
+            tracemalloc.stop()
+
+    model_size, listings = allocated(
+        lambda: [make_listing(id=str(i)) for i in range(200)]
+    )
+    compact_size, _ = allocated(lambda: CompactListings.from_listings(listings))
+
+    assert compact_size < model_size / 2
@@ -0,0 +1,217 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from datalar.archive import RecordArchive
+from datalar.bloom import BloomFilter
+from datalar.scrapers.zap_imoveis.crawler import ListingsCrawler
+from datalar.scrapers.zap_imoveis.planner import QueryPlanner, SearchQuery
+
+
+@pytest.fixture
+def sdk(make_listings_route):
+    return SimpleNamespace(listings=make_listings_route(), logger=MagicMock())
+
+
+
+def test_planner_should_split_until_every_query_is_reachable(sdk, dataset):
+    planner = QueryPlanner(sdk, max_results=200)
+    plan = planner.plan()
+
+    assert all(p.count <= 200 and p.complete for p in plan)
+    assert sum(p.count for p in plan) == len(dataset)
+    assert planner.requests == sdk.listings.count_calls
+
+
+def test_planner_should_not_split_queries_that_already_fit(sdk):
+    planner = QueryPlanner(sdk, max_results=10_000)
+    plan = planner.plan(SearchQuery(business_type="SALE"))
+
+    assert [p.query.listing_type for p in plan] == ["DEVELOPMENT", "USED"]
+    assert sdk.listings.count_calls == 2
+
+
+def test_planner_should_split_by_location_before_price(sdk):
+    locations = [{"address_city": "São Paulo"}, {"address_city": "Campinas"}]
+    planner = QueryPlanner(sdk, max_results=400, locations=locations)
+    plan = planner.plan(SearchQuery(business_type="SALE", listing_type="USED"))
+
+    assert {p.query.address_city for p in plan} == {"São Paulo", "Campinas"}
+
+
+def test_planner_should_not_lose_listings_outside_the_locations(sdk, dataset):
+    planner = QueryPlanner(
+        sdk, max_results=200, locations=[{"address_city": "São Paulo"}]
+    )
+    plan = planner.plan(SearchQuery(business_type="SALE", listing_type="USED"))
+
+    expected = sdk.listings.count(business_type="SALE", listing_type="USED")
+    assert all(p.complete for p in plan)
+    assert sum(p.count for p in plan) == expected
+    sdk.logger.warning.assert_called_once()
+
+
+def test_planner_should_flag_queries_that_cannot_be_split(
+    dataset, make_listings_route
+):
+    same_price = [
+        SimpleNamespace(**{**vars(item), "price": 10, "area": 10}) for item in dataset
+    ]
+    sdk = SimpleNamespace(listings=make_listings_route(same_price), logger=MagicMock())
+    plan = QueryPlanner(sdk, max_results=200, max_price=100, max_usable_area=100).plan(
+        SearchQuery(business_type="SALE", listing_type="USED")
+    )
+
+    assert [p.complete for p in plan] == [False]
+    sdk.logger.warning.assert_called_once()
+
+
+def test_crawler_should_collect_every_listing_once(sdk, dataset):
+    crawler = ListingsCrawler(
+        sdk, planner=QueryPlanner(sdk, max_results=200), page_size=50, max_workers=4
+    )
+    listings = list(crawler.crawl())
+
+    assert sorted(item.id for item in listings) == sorted(item.id for item in dataset)
+    assert crawler.stats.listings == len(dataset)
+    assert crawler.stats.page_requests == sdk.listings.search_calls
+
+
+def test_crawler_should_stop_fetching_when_the_consumer_stops(sdk):
+    crawler = ListingsCrawler(
+        sdk, planner=QueryPlanner(sdk, max_results=200), page_size=10, max_workers=2
+    )
+    listings = crawler.crawl()
+    next(listings)
+    listings.close()
+
+    assert crawler.stats.planned_queries > 1
+    assert sdk.listings.search_calls <= 4
+
+
+def test_crawler_pipeline_should_deliver_every_listing_to_the_sink(
+    dataset, make_listings_route
+):
+    route = make_listings_route()
+    sdk = SimpleNamespace(
+        listings=route, logger=MagicMock(), config=SimpleNamespace(PARSE_MODE="strict")
+    )
+    crawler = ListingsCrawler(
+        sdk, planner=QueryPlanner(sdk, max_results=200), page_size=50, max_workers=4
+    )
+    batches = []
+
+    metrics = crawler.crawl_into(
+        batches.append, transform=lambda listing: listing.id, sink_batch_size=100
+    )
+
+    ids = [listing_id for batch in batches for listing_id in batch]
+    assert sorted(ids) == sorted(item.id for item in dataset)
+    assert all(len(batch) <= 100 for batch in batches)
+    assert crawler.stats.listings == len(dataset)
+    assert crawler.stats.page_requests == route.search_calls
+    assert sum(stats.parsed for stats in route.parse_stats) == len(dataset)
+    assert [m.name for m in metrics] == [
+        "fetch",
+        "parse",
+        "collect",
+        "transform",
+        "sink",
+    ]
+
+
+def test_crawler_should_write_a_profile_when_profiling_is_enabled(
+    sdk, dataset, tmp_path
+):
+    crawler = ListingsCrawler(
+        sdk,
+        planner=QueryPlanner(sdk, max_results=200),
+        page_size=50,
+        max_workers=4,
+        profile_dir=str(tmp_path),
+        profile_interval=0.001,
+    )
+    listings = list(crawler.crawl())
+
+    assert len(listings) == len(dataset)
+    (run,) = tmp_path.iterdir()
+    assert {path.name for path in run.iterdir()} == {
+        "stacks.collapsed",
+        "report.txt",
+        "report.json",
+    }
+    assert crawler.last_profile.duration > 0
+
+
+def test_crawler_should_deliver_only_new_listings_with_a_seen_filter(sdk, dataset):
+    seen = BloomFilter(capacity=1000)
+    known = {item.id for item in dataset[:40]}
+    seen.update(known)
+    confirmed = []
+
+    def is_known(listing_id):
+        confirmed.append(listing_id)
+        return listing_id in known
+
+    crawler = ListingsCrawler(
+        sdk,
+        planner=QueryPlanner(sdk, max_results=200),
+        page_size=50,
+        seen_filter=seen,
+        is_known=is_known,
+    )
+    new = [listing.id for listing in crawler.crawl(new_only=True)]
+
+    assert sorted(new) == sorted(item.id for item in dataset[40:])
+    assert crawler.stats.new_listings == len(dataset) - 40
+    assert crawler.stats.known_lookups == len(confirmed) >= 40
+    known.update(new)
+    assert list(crawler.crawl(new_only=True)) == []
+
+
+def test_crawler_pipeline_should_mark_listings_as_seen_only_after_the_sink(
+    dataset, make_listings_route
+):
+    route = make_listings_route()
+    sdk = SimpleNamespace(
+        listings=route, logger=MagicMock(), config=SimpleNamespace(PARSE_MODE="strict")
+    )
+    seen = BloomFilter(capacity=10_000, error_rate=0.0001)
+    crawler = ListingsCrawler(
+        sdk, planner=QueryPlanner(sdk, max_results=200), page_size=50, seen_filter=seen
+    )
+
+    def failing_sink(batch):
+        raise IOError("disk full")
+
+    with pytest.raises(IOError):
+        crawler.crawl_into(failing_sink)
+    assert seen.count == 0
+
+    batches = []
+    crawler.crawl_into(batches.append, transform=lambda listing: listing.id)
+
+    assert sorted(i for batch in batches for i in batch) == sorted(
+        item.id for item in dataset
+    )
+    assert all(item.id in seen for item in dataset)
+
+
+def test_crawler_pipeline_should_archive_raw_listings(
+    dataset, make_listings_route, tmp_path
+):
+    route = make_listings_route()
+    sdk = SimpleNamespace(
+        listings=route, logger=MagicMock(), config=SimpleNamespace(PARSE_MODE="strict")
+    )
+    crawler = ListingsCrawler(
+        sdk, planner=QueryPlanner(sdk, max_results=200), page_size=50
+    )
+
+    with RecordArchive(str(tmp_path)) as archive:
+        metrics = crawler.crawl_into(lambda batch: None, archive=archive)
+
+        assert [m.name for m in metrics][:3] == ["fetch", "archive", "parse"]
+        assert {r.key for r in archive.scan()} == {item.id for item in dataset}
+        assert archive.get_json(dataset[0].id)["id"] == dataset[0].id
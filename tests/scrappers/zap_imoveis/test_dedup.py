@@ -0,0 +1,92 @@
+import pytest
+
+from datalar.scrapers.zap_imoveis.dedup import DedupIndex, MinHasher
+
+DESCRIPTION = (
+    "Lindo apartamento reformado com varanda gourmet, dois quartos sendo uma suíte, "
+    "cozinha planejada, uma vaga de garagem e lazer completo com piscina e academia."
+)
+
+
+def test_minhash_similarity_should_approximate_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = hasher.signature(DESCRIPTION)
+    b = hasher.signature(DESCRIPTION.replace("academia", "churrasqueira"))
+    c = hasher.signature("Casa térrea com quintal amplo e edícula nos fundos.")
+
+    assert (a == b).mean() > 0.7
+    assert (a == c).mean() < 0.2
+
+
+def test_dedup_index_should_assign_same_canonical_id_to_reposted_listing(make_listing):
+    index = DedupIndex()
+    original = make_listing(id="1", sourceId="a", description=DESCRIPTION)
+    repost = make_listing(
+        id="2",
+        sourceId="b",
+        usableAreas=[71],
+        title="Apartamento 2 dormitórios Bela Vista",
+        description=DESCRIPTION + " Aceita financiamento.",
+    )
+
+    assert index.add(original).canonical_id == "1"
+    match = index.add(repost)
+
+    assert match.is_duplicate
+    assert match.canonical_id == "1"
+    assert index.canonical_id("2") == "1"
+    assert index.duplicates("1") == {"1", "2"}
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"bedrooms": [3]},
+        {"usableAreas": [120]},
+        {"address": {"zipCode": "04538-133"}},
+        {
+            "title": "Casa térrea em Moema",
+            "description": "Casa térrea com quintal amplo, edícula e churrasqueira.",
+        },
+    ],
+)
+def test_dedup_index_should_not_match_different_properties(make_listing, overrides):
+    index = DedupIndex()
+    index.add(make_listing(id="1", description=DESCRIPTION))
+    match = index.add(make_listing(**{"id": "2", "description": DESCRIPTION, **overrides}))
+
+    assert not match.is_duplicate
+    assert match.canonical_id == "2"
+
+
+def test_dedup_index_should_merge_groups_into_oldest_canonical_id(make_listing):
+    index = DedupIndex(threshold=0.5)
+    first, second, third = (
+        " ".join(f"{word}{i}" for i in range(30)) for word in ("sala", "quarto", "vaga")
+    )
+    # 1 e 2 são pouco similares entre si, mas ambos são similares a 3
+    index.add(make_listing(id="1", title="", description=f"{first} {second}"))
+    index.add(make_listing(id="2", title="", description=f"{second} {third}"))
+    assert index.canonical_id("2") == "2"
+    match = index.add(make_listing(id="3", title="", description=f"{first} {second} {third}"))
+
+    assert match.canonical_id == "1"
+    assert {index.canonical_id(i) for i in ("1", "2", "3")} == {"1"}
+
+
+def test_dedup_index_should_not_reindex_known_listing(make_listing):
+    index = DedupIndex()
+    listing = make_listing(id="1")
+    index.add(listing)
+    index.add(listing)
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize("text", ["", "Apartamento"])
+def test_dedup_index_should_not_match_listings_with_too_little_text(make_listing, text):
+    index = DedupIndex()
+    index.add(make_listing(id="1", title=text, description=""))
+    match = index.add(make_listing(id="2", title=text, description=""))
+
+    assert not match.is_duplicate
+    assert index.duplicates("2") == {"2"}
@@ -0,0 +1,185 @@
+import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+
+from datalar.scrapers.zap_imoveis.crawler import CrawlStats
+from datalar.scrapers.zap_imoveis.planner import SearchQuery
+from datalar.scrapers.zap_imoveis.scheduler import RefreshScheduler
+
+HOUR = 3600
+FAST = SearchQuery(address_city="São Paulo")
+SLOW = SearchQuery(address_city="Campinas")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCrawler:
+    """
+    Simula coletas: cada segmento tem `total` listagens, das quais `changed[cidade]`
+    foram atualizadas na última hora; cada coleta custa uma requisição de contagem e uma
+    por página de 50 listagens.
+    """
+
+    def __init__(self, clock, changed, failing=(), total=100):
+        self.clock = clock
+        self.changed = changed
+        self.failing = set(failing)
+        self.total = total
+        self.incomplete_queries = 0
+        self.first = 0
+        self.stats = CrawlStats()
+        self.crawled = []
+        self.stale = dt.datetime.fromtimestamp(
+            clock.now, dt.timezone.utc
+        ) - dt.timedelta(days=30)
+
+    def crawl(self, query):
+        self.crawled.append(query)
+        self.stats = CrawlStats(
+            count_requests=1,
+            page_requests=2,
+            incomplete_queries=self.incomplete_queries,
+        )
+        if query.address_city in self.failing:
+            raise RuntimeError("blocked")
+        now = dt.datetime.fromtimestamp(self.clock.now, dt.timezone.utc)
+        changed = self.changed[query.address_city]
+        for i in range(self.first, self.first + self.total):
+            yield SimpleNamespace(
+                id=str(i),
+                pricing_infos=[],
+                status="ACTIVE",
+                updated_at=(
+                    now - dt.timedelta(minutes=1)
+                    if i - self.first < changed
+                    else self.stale
+                ),
+            )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_scheduler(tmp_path, crawler, clock, **options):
+    return RefreshScheduler(
+        crawler, str(tmp_path / "schedule.db"), clock=clock, **options
+    )
+
+
+def test_intervals_should_follow_observed_change_rate(tmp_path, clock):
+    crawler = FakeCrawler(clock, {"São Paulo": 20, "Campinas": 1})
+    scheduler = make_scheduler(tmp_path, crawler, clock)
+    scheduler.add_segments([FAST, SLOW])
+
+    first = scheduler.run_pending()
+    assert {run.segment.query for run in first} == {FAST, SLOW}
+    clock.now += 7 * 24 * HOUR
+    scheduler.run_pending()
+
+    fast, slow = scheduler.segment(FAST), scheduler.segment(SLOW)
+    assert fast.runs == slow.runs == 2
+    assert fast.change_rate > slow.change_rate
+    assert fast.interval < slow.interval
+    assert scheduler.min_interval <= fast.interval <= scheduler.max_interval
+    assert fast.cost == 3
+
+
+def test_state_should_persist_between_instances(tmp_path, clock):
+    crawler = FakeCrawler(clock, {"São Paulo": 10})
+    scheduler = make_scheduler(tmp_path, crawler, clock)
+    scheduler.add_segment(FAST)
+    scheduler.run_pending()
+    scheduler.close()
+
+    reopened = make_scheduler(tmp_path, crawler, clock)
+    reopened.add_segment(FAST)
+
+    assert reopened.segment(FAST).runs == 1
+    assert reopened.due() == []
+    assert reopened.spent() == 3
+
+
+def test_plan_should_respect_budget_and_priority(tmp_path, clock):
+    crawler = FakeCrawler(clock, {"São Paulo": 50, "Campinas": 2})
+    scheduler = make_scheduler(
+        tmp_path, crawler, clock, budget=4, min_interval=60, max_interval=60
+    )
+    scheduler.add_segments([FAST, SLOW])
+
+    # sem histórico, o custo assumido (10) excede o orçamento: roda um segmento por janela
+    assert len(scheduler.plan()) == 1
+    scheduler.run_pending()
+    assert scheduler.plan() == []
+    clock.now += 2 * HOUR
+    scheduler.run_pending()
+    clock.now += 2 * HOUR
+
+    # ambos vencidos e o orçamento da janela já foi renovado: cabe apenas um (custo 3)
+    planned = scheduler.plan()
+    assert [segment.query for segment in planned] == [FAST]
+    scheduler.run_pending()
+    assert scheduler.spent() == 3
+    assert scheduler.plan() == []
+
+
+def test_failed_crawl_should_reschedule_without_updating_rate(tmp_path, clock):
+    crawler = FakeCrawler(clock, {}, failing=["Campinas"])
+    scheduler = make_scheduler(tmp_path, crawler, clock)
+    scheduler.add_segment(SLOW)
+
+    [run] = scheduler.run_pending()
+
+    assert run.error == "RuntimeError: blocked"
+    segment = scheduler.segment(SLOW)
+    assert segment.runs == 0 and segment.change_rate is None
+    assert segment.next_run == clock.now + scheduler.initial_interval
+    assert scheduler.spent() == 3
+
+
+def test_change_rate_should_count_listings_that_entered_and_left(tmp_path, clock):
+    crawler = FakeCrawler(clock, {"São Paulo": 0})
+    batches = []
+    scheduler = make_scheduler(
+        tmp_path,
+        crawler,
+        clock,
+        batch_size=30,
+        on_listings=lambda query, batch: batches.append(len(batch)),
+    )
+    scheduler.add_segment(FAST)
+    scheduler.run_pending()
+    clock.now += 7 * 24 * HOUR
+
+    # 10 listagens saem e 10 entram: o total não muda
+    crawler.first = 10
+    [run] = scheduler.run_pending()
+
+    assert run.listings == 100
+    assert run.changes == 20
+    assert batches == [30, 30, 30, 10] * 2
+
+
+def test_partial_crawl_should_not_count_missing_listings_as_removed(tmp_path, clock):
+    crawler = FakeCrawler(clock, {"São Paulo": 0})
+    scheduler = make_scheduler(tmp_path, crawler, clock)
+    scheduler.add_segment(FAST)
+    scheduler.run_pending()
+    clock.now += 7 * 24 * HOUR
+
+    # o planejamento não cobriu o segmento: metade das listagens não foi alcançada
+    crawler.total = 50
+    crawler.incomplete_queries = 1
+    [run] = scheduler.run_pending()
+
+    assert run.listings == 50
+    assert run.changes == 0
+    assert len(list(scheduler.feed(scheduler.segment(FAST)).stored())) == 100
@@ -0,0 +1,92 @@
+import pytest
+
+from datalar.scrapers.zap_imoveis.text_index import (
+    TextIndex,
+    decode_postings,
+    encode_postings,
+    stem,
+    tokenize,
+)
+
+
+@pytest.fixture
+def index(make_listing):
+    index = TextIndex()
+    index.add(make_listing())
+    index.add(
+        make_listing(
+            id="2",
+            title="Casa com quintal",
+            description="Casa térrea com quintal amplo, churrasqueira e edícula.",
+            amenities=["BARBECUE_GRILL"],
+            mergedAmenities=["BARBECUE_GRILL"],
+        )
+    )
+    index.add(
+        make_listing(
+            id="3",
+            title="Apartamento com varandas",
+            description="Não aceitamos animais. Varandas amplas com vista.",
+            amenities=[],
+            mergedAmenities=[],
+        )
+    )
+    return index
+
+
+def test_tokenize_should_fold_accents_drop_stopwords_and_stem():
+    assert tokenize("Próximo ao Metrô e às lojas") == tokenize("proximo metro loja")
+    assert stem("varandas") == stem("varanda")
+    assert stem("aceita") == stem("aceito")
+    assert stem("jardins") == stem("jardim")
+    assert tokenize("portões") == tokenize("portão")
+    assert "ao" not in tokenize("próximo ao metrô")
+
+
+def test_postings_should_round_trip_varint_deltas():
+    docs = [0, 5, 130, 70000, 2**40]
+    frequencies = [1, 300, 2, 1, 7]
+
+    data = encode_postings(docs, frequencies)
+    decoded_docs, decoded_frequencies = decode_postings(data)
+
+    assert decoded_docs.tolist() == docs
+    assert decoded_frequencies.tolist() == frequencies
+    assert len(data) < len(docs) * 8
+    assert [a.tolist() for a in decode_postings(b"")] == [[], []]
+
+
+def test_search_should_rank_listings_by_bm25(index):
+    hits = index.search("varanda gourmet")
+
+    assert [hit.listing_id for hit in hits] == ["1001", "3"]
+    assert hits[0].score > hits[1].score
+    assert [h.listing_id for h in index.search("aceita pet", match_all=True)] == [
+        "1001"
+    ]
+    assert index.search("piscina coberta") == []
+    assert [h.listing_id for h in index.search("barbecue_grill")] == ["2"]
+
+
+def test_updates_should_replace_and_remove_listings(index, make_listing):
+    index.add(make_listing(id="2", title="Casa com piscina", description="Piscina."))
+
+    assert [h.listing_id for h in index.search("piscina")] == ["2"]
+    assert index.search("edícula") == []
+    assert index.remove("1001")
+    assert not index.remove("1001")
+    assert [h.listing_id for h in index.search("varanda")] == ["3"]
+    assert len(index) == 2
+
+
+def test_compact_should_drop_deleted_postings(index):
+    size = index.index_size()
+
+    index.compact()
+    assert index.index_size() == size
+
+    index.remove("2")
+    index.compact()
+    assert index.index_size() < size
+    assert index.document_frequency(stem("quintal")) == 0
+    assert {h.listing_id for h in index.search("apartamento")} == {"1001", "3"}
@@ -0,0 +1,118 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from datalar.memory import MemoryGuard
+from datalar.scrapers.zap_imoveis.crawler import ListingsCrawler
+from datalar.scrapers.zap_imoveis.planner import QueryPlanner
+from datalar.scrapers.zap_imoveis.workers import (
+    CrawlWorker,
+    WorkerSupervisor,
+    enqueue_crawl,
+)
+from datalar.workqueue import SQLiteWorkQueue
+
+
+def make_crawler(route):
+    sdk = SimpleNamespace(listings=route, logger=MagicMock())
+    return ListingsCrawler(
+        sdk, planner=QueryPlanner(sdk, max_results=200), page_size=50
+    )
+
+
+def test_workers_should_crawl_every_shard_once(
+    tmp_path, dataset, make_listings_route
+):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    route = make_listings_route()
+
+    ids = enqueue_crawl(queue, make_crawler(route))
+    assert enqueue_crawl(queue, make_crawler(route)) == ids
+    assert queue.counts()["pending"] == len(ids)
+
+    collected = []
+    lock = threading.Lock()
+
+    def sink(listings):
+        with lock:
+            collected.extend(listing.id for listing in listings)
+
+    workers = [CrawlWorker(queue, make_crawler(route), sink) for _ in range(3)]
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(collected) == sorted(item.id for item in dataset)
+    assert sum(worker.processed for worker in workers) == len(ids)
+    assert queue.counts()["done"] == len(ids)
+    assert queue.result(ids[0])["listings"] > 0
+
+
+def test_worker_should_fail_task_when_sink_raises(
+    tmp_path, dataset, make_listings_route
+):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=1)
+    route = make_listings_route()
+    enqueue_crawl(queue, make_crawler(route))
+
+    def sink(listings):
+        raise IOError("disk full")
+
+    worker = CrawlWorker(queue, make_crawler(route), sink)
+    assert worker.run(max_tasks=1) == 1
+
+    assert worker.failed == 1
+    assert queue.dead_letters()[0].error == "OSError: disk full"
+
+
+def test_worker_should_spend_an_attempt_when_memory_runs_out(
+    tmp_path, dataset, make_listings_route
+):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    route = make_listings_route()
+    ids = enqueue_crawl(queue, make_crawler(route))
+
+    def sink(listings):
+        raise MemoryError
+
+    worker = CrawlWorker(queue, make_crawler(route), sink, retry_delay=0)
+    assert worker.run() == 1
+
+    assert worker.recycle_reason == "MemoryError while processing a page"
+    assert worker.failed == 1
+    assert queue.counts()["pending"] == len(ids)
+
+    # uma página que sempre esgota a memória acaba na fila de tarefas mortas
+    for _ in range(len(ids) * 2):
+        CrawlWorker(queue, make_crawler(route), sink, retry_delay=0).run()
+    assert len(queue.dead_letters()) == len(ids)
+    assert queue.dead_letters()[0].error == "MemoryError while processing a page"
+
+
+def test_supervisor_should_replace_recycled_workers_until_drained(
+    tmp_path, dataset, make_listings_route
+):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    route = make_listings_route()
+    ids = enqueue_crawl(queue, make_crawler(route))
+    output = tmp_path / "ids.txt"
+
+    def sink(listings):
+        with open(output, "a") as f:
+            f.writelines(f"{listing.id}\n" for listing in listings)
+
+    def make_worker():
+        worker_queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+        guard = MemoryGuard(max_pages=2, max_rss=2**40)
+        return CrawlWorker(worker_queue, make_crawler(route), sink, guard=guard)
+
+    # `fork`: o worker é criado por uma função local do teste
+    supervisor = WorkerSupervisor(make_worker, processes=2, start_method="fork")
+    supervisor.run(poll_interval=0.05)
+
+    assert queue.counts()["done"] == len(ids)
+    assert sorted(output.read_text().split()) == sorted(item.id for item in dataset)
+    assert supervisor.recycled >= len(ids) // 2 - 1
+    assert supervisor.crashes == 0
@@ -0,0 +1,127 @@
+import json
+import os
+import random
+
+import pytest
+
+from datalar.archive import RecordArchive
+
+AMENITIES = ["POOL", "GYM", "PARTY_HALL", "ELEVATOR", "BARBECUE_GRILL", "PLAYGROUND"]
+
+
+def listing(i, price=700000):
+    return {
+        "id": str(i),
+        "title": "Apartamento com 2 quartos à venda",
+        "amenities": ["POOL", "GYM", "PARTY_HALL", "ELEVATOR"],
+        "pricingInfos": [{"businessType": "SALE", "price": str(price)}],
+        "address": {"city": "São Paulo", "stateAcronym": "SP"},
+    }
+
+
+def test_archive_should_return_latest_and_historical_records(tmp_path):
+    with RecordArchive(str(tmp_path)) as archive:
+        archive.append_json("1", listing(1), timestamp=100.0)
+        archive.append_json("2", listing(2), timestamp=100.0)
+        archive.append_json("1", listing(1, price=650000), timestamp=200.0)
+
+        assert archive.get_json("1")["pricingInfos"][0]["price"] == "650000"
+        assert archive.get_json("1", at=150.0)["pricingInfos"][0]["price"] == "700000"
+        assert archive.get("1", at=50.0) is None
+        assert archive.get("3") is None
+        assert [r.timestamp for r in archive.history("1")] == [100.0, 200.0]
+
+    reopened = RecordArchive(str(tmp_path))
+    assert reopened.get_json("2") == listing(2)
+    assert [r.key for r in reopened.scan()] == ["1", "2", "1"]
+    reopened.close()
+
+
+def test_archive_should_seal_segments_and_read_them_through_the_index(tmp_path):
+    archive = RecordArchive(str(tmp_path), segment_size=4096)
+    for i in range(500):
+        archive.append_json(str(i), listing(i), timestamp=float(i))
+    archive.append_json("7", listing(7, price=1), timestamp=1000.0)
+    archive.close()
+
+    names = sorted(os.listdir(tmp_path))
+    assert sum(name.endswith(".idx") for name in names) > 3
+    archive = RecordArchive(str(tmp_path))
+    assert archive.get_json("321") == listing(321)
+    assert archive.get_json("7")["pricingInfos"][0]["price"] == "1"
+    assert len(archive.history("7")) == 2
+    assert sum(1 for _ in archive.scan()) == 501
+    archive.close()
+
+
+def test_archive_should_drop_a_partially_written_record(tmp_path):
+    archive = RecordArchive(str(tmp_path))
+    archive.append_json("1", listing(1))
+    segment, offset = archive.append_json("2", listing(2))
+    archive.close()
+    data_path = tmp_path / f"{segment:08d}.dat"
+    with open(data_path, "r+b") as f:
+        f.truncate(offset + 5)
+
+    archive = RecordArchive(str(tmp_path))
+    assert archive.get("2") is None
+    assert archive.get_json("1") == listing(1)
+    archive.append_json("3", listing(3))
+    assert [r.key for r in archive.scan()] == ["1", "3"]
+    archive.close()
+
+
+def test_archive_should_compress_records_and_detect_corruption(tmp_path):
+    raw = json.dumps([listing(i) for i in range(50)]).encode()
+    with RecordArchive(str(tmp_path)) as archive:
+        archive.append("page", raw)
+        segment, offset = archive.append("small", b"{}")
+    size = os.path.getsize(tmp_path / f"{segment:08d}.dat")
+    assert size < len(raw) / 5
+
+    with open(tmp_path / f"{segment:08d}.dat", "r+b") as f:
+        f.seek(offset - 3)
+        f.write(b"\xff")
+    with RecordArchive(str(tmp_path)) as archive:
+        assert archive.get("small").data == b"{}"
+        with pytest.raises(ValueError):
+            archive.get("page")
+
+
+def varied_listing(i):
+    rng = random.Random(i)
+    value = listing(i, price=rng.randrange(200_000, 3_000_000, 1000))
+    value["amenities"] = rng.sample(AMENITIES, 4)
+    value["usableAreas"] = [str(rng.randrange(30, 300))]
+    value["updatedAt"] = f"2024-0{rng.randrange(1, 9)}-1{rng.randrange(0, 9)}T08:00:00Z"
+    return value
+
+
+def test_dictionary_should_shrink_records_and_keep_old_versions_readable(tmp_path):
+    plain = RecordArchive(str(tmp_path / "plain"))
+    for i in range(2000):
+        plain.append_json(str(i), varied_listing(i))
+    plain_size = plain._size
+    plain.close()
+
+    archive = RecordArchive(str(tmp_path / "dict"), train_after=1000)
+    for i in range(2000):
+        archive.append_json(str(i), varied_listing(i))
+    assert archive.dictionary_versions() == [1]
+    first_half = archive._size
+    assert archive.train_dictionary(size=16 * 1024) == 2
+    archive.append_json("new", varied_listing(5000))
+    archive.close()
+
+    assert archive._size - first_half < (plain_size - first_half) / 2
+    reopened = RecordArchive(str(tmp_path / "dict"))
+    assert reopened.dictionary_version == 2
+    assert reopened.get_json("10") == varied_listing(10)
+    assert reopened.get_json("1999") == varied_listing(1999)
+    assert reopened.get_json("new") == varied_listing(5000)
+    reopened.close()
+
+    os.remove(tmp_path / "dict" / "dictionaries" / "0001.zdict")
+    with RecordArchive(str(tmp_path / "dict")) as archive:
+        with pytest.raises(ValueError, match="dictionary version 1"):
+            archive.get("1999")
@@ -0,0 +1,53 @@
+import pytest
+
+from datalar.bloom import BloomFilter, optimal_parameters
+
+
+def test_bloom_filter_should_have_no_false_negatives_and_bounded_false_positives():
+    seen = BloomFilter(capacity=20_000, error_rate=0.01)
+    ids = [f"listing-{i}" for i in range(20_000)]
+
+    assert seen.update(ids) >= 19_900
+    assert all(key in seen for key in ids)
+    assert seen.contains_many(ids).all()
+
+    others = [f"other-{i}" for i in range(20_000)]
+    rate = sum(key in seen for key in others) / len(others)
+    assert rate < 0.02
+    assert seen.contains_many(others).tolist() == [key in seen for key in others]
+    assert abs(seen.estimated_count() - len(ids)) < 400
+    assert seen.false_positive_rate() == pytest.approx(0.01, abs=0.005)
+
+
+def test_bloom_filter_should_persist_and_merge_across_workers(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    with BloomFilter(path, capacity=1000) as first:
+        first.update(["a", "b"])
+        assert not first.add("a")
+    second = BloomFilter(str(tmp_path / "other.bloom"), capacity=1000)
+    second.add("c")
+
+    with BloomFilter(path, capacity=5) as reopened:
+        assert reopened.capacity == 1000
+        assert reopened.count == 2
+        reopened.merge(second)
+        assert "c" in reopened
+    second.close()
+
+    merged = BloomFilter(path)
+    assert all(key in merged for key in "abc")
+    assert "d" not in merged
+    assert merged.count == 3
+
+    with pytest.raises(ValueError):
+        merged.merge(BloomFilter(capacity=10))
+    merged.close()
+
+
+def test_bloom_filter_parameters_should_fit_tens_of_millions_in_tens_of_mb():
+    bits, hashes = optimal_parameters(30_000_000, 0.01)
+
+    assert bits // 8 < 40 * 2**20
+    assert hashes == 7
+    with pytest.raises(ValueError):
+        optimal_parameters(0, 0.01)
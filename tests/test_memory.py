@@ -0,0 +1,31 @@
+import pytest
+
+from datalar.memory import MemoryGuard, live_objects, rss_bytes
+
+
+def test_rss_and_object_counts_should_be_measured():
+    before = rss_bytes()
+    buffer = bytearray(64 * 2**20)
+    buffer[::4096] = b"x" * len(buffer[::4096])
+
+    assert rss_bytes() - before >= 32 * 2**20
+    assert live_objects() > 1000
+
+
+def test_guard_should_report_page_and_memory_limits():
+    guard = MemoryGuard(max_pages=3)
+    assert guard.observe() is None
+    assert guard.observe() is None
+    assert guard.observe() == "processed 3 pages (limit 3)"
+
+    guard = MemoryGuard(max_rss=1, check_every=2)
+    assert guard.observe() is None
+    assert guard.last is None
+    assert guard.observe().startswith("rss ")
+    assert guard.peak_rss == guard.last.rss > 0
+
+    guard = MemoryGuard(max_objects=1)
+    assert guard.observe().endswith("live objects (limit 1)")
+
+    with pytest.raises(ValueError):
+        MemoryGuard(check_every=0)
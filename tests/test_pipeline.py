@@ -0,0 +1,123 @@
+import asyncio
+import operator
+import threading
+import time
+
+import pytest
+
+from datalar.pipeline import Pipeline, Stage
+
+
+def test_pipeline_should_run_items_through_every_stage():
+    batches = []
+    pipeline = Pipeline(
+        [
+            Stage("split", lambda n: range(n), workers=3, flatten=True),
+            Stage("double", lambda x: x * 2, workers=2),
+            Stage("odd", lambda x: x if x % 4 else None),
+            Stage("sink", batches.append, batch_size=10, batch_timeout=0.05),
+        ]
+    )
+
+    metrics = pipeline.run([5, 10, 20])
+
+    items = sorted(x for batch in batches for x in batch)
+    assert items == sorted(2 * x for n in (5, 10, 20) for x in range(n) if x % 2)
+    assert all(len(batch) <= 10 for batch in batches)
+    by_name = {m.name: m for m in metrics}
+    assert by_name["split"].received == 3 and by_name["split"].emitted == 35
+    assert by_name["odd"].emitted == len(items)
+    assert by_name["sink"].received == len(items)
+    assert by_name["sink"].batches == len(batches)
+    assert all(m.finished_at is not None and m.throughput > 0 for m in metrics)
+
+
+def test_results_should_yield_last_stage_outputs():
+    pipeline = Pipeline([Stage("square", lambda x: x * x, workers=4)])
+
+    assert sorted(pipeline.results(range(100))) == [x * x for x in range(100)]
+
+
+def test_slow_sink_should_apply_backpressure_to_the_source():
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for i in range(1_000):
+            produced.append(i)
+            yield i
+
+    def sink(batch):
+        release.wait()
+
+    pipeline = Pipeline(
+        [
+            Stage("fetch", lambda x: x, workers=2),
+            Stage("sink", sink, batch_size=5, queue_size=5),
+        ]
+    )
+    runner = threading.Thread(target=pipeline.run, args=(source(),))
+    runner.start()
+    time.sleep(0.5)
+
+    # fila da fonte (4) + fetch (2 em mãos, 2 bloqueados ao enviar) + fila do sink (5)
+    # + lote em escrita (5): o restante da fonte não foi lido
+    assert len(produced) < 30
+    depth = {m.name: m.queue_depth for m in pipeline.metrics()}
+    assert depth["sink"] == 5
+
+    release.set()
+    runner.join()
+    assert len(produced) == 1_000
+    fetch = pipeline.metrics()[0]
+    assert fetch.blocked_seconds > 0.3
+
+
+def test_async_and_process_stages():
+    async def fetch(x):
+        await asyncio.sleep(0.05)
+        return x
+
+    pipeline = Pipeline(
+        [
+            Stage("fetch", fetch, workers=20, kind="async"),
+            Stage("negate", operator.neg, workers=2, kind="process"),
+        ]
+    )
+    start = time.monotonic()
+
+    assert sorted(pipeline.results(range(40))) == sorted(-x for x in range(40))
+    # 40 esperas de 50 ms com 20 corrotinas: ~0,1 s, não 2 s
+    assert pipeline.metrics()[0].busy_seconds >= 2.0
+    assert time.monotonic() - start < 10
+
+
+@pytest.mark.parametrize("kind", ["thread", "async"])
+def test_stage_error_should_stop_the_pipeline(kind):
+    def fail(x):
+        if x == 3:
+            raise RuntimeError("boom")
+        return x
+
+    async def fail_async(x):
+        return fail(x)
+
+    pipeline = Pipeline(
+        [
+            Stage("work", fail_async if kind == "async" else fail, kind=kind),
+            Stage("sink", lambda batch: None, batch_size=2),
+        ]
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(iter(range(100_000)))
+
+
+def test_consumer_closing_results_should_stop_the_stages():
+    pipeline = Pipeline([Stage("identity", lambda x: x, workers=2)])
+    results = pipeline.results(iter(range(10**9)))
+
+    assert next(results) is not None
+    results.close()
+
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+
+from datalar.profiling import SamplingProfiler, classify, thread_group
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_profiler_should_attribute_samples_to_threads_and_write_reports(tmp_path):
+    stop = threading.Event()
+    waiter = threading.Thread(target=stop.wait, name="pipeline-sink-0")
+
+    with SamplingProfiler(interval=0.002) as profiler:
+        waiter.start()
+        _busy(0.3)
+        stop.set()
+        waiter.join()
+    profile = profiler.profile
+
+    assert profile.total_samples > 0
+    assert profile.duration >= 0.3
+    assert profile.threads()["pipeline-sink"].get("idle", 0) > 0
+    assert "MainThread" in profile.threads()
+    assert any("_busy" in name for name, _ in profile.top_functions())
+    assert profile.peak_memory is not None
+
+    paths = profile.write(str(tmp_path / "run"))
+    collapsed = open(paths["collapsed"]).read().splitlines()
+    assert any(line.startswith("MainThread;") for line in collapsed)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    report = json.loads(open(paths["json"]).read())
+    assert report["samples"] == profile.total_samples
+    assert "top allocators" in open(paths["report"]).read()
+
+
+def test_classify_should_use_the_innermost_matching_frame():
+    def code(filename, name="f"):
+        return compile("pass", filename, "exec").replace(co_name=name)
+
+    crawl = code("/app/datalar/crawler.py", "crawl")
+    pydantic = code("/site-packages/pydantic/main.py")
+    socket = code("/usr/lib/python3.12/socket.py")
+    condition = code("/usr/lib/python3.12/threading.py")
+    normalize = code("/app/datalar/sdk/parsing.py", "_normalize_keys")
+
+    assert classify((crawl, pydantic)) == "validation"
+    assert classify((crawl, pydantic, normalize)) == "normalize"
+    assert classify((crawl, socket)) == "network"
+    assert classify((crawl, condition)) == "idle"
+    assert classify((crawl,)) == "other"
+    assert thread_group("pipeline-fetch-12") == "pipeline-fetch"
+    assert thread_group("ThreadPoolExecutor-0_3") == "ThreadPoolExecutor-0"
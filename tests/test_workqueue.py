@@ -0,0 +1,255 @@
+import threading
+from collections import defaultdict
+
+import pytest
+
+from datalar.workqueue import RedisWorkQueue, SQLiteWorkQueue
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LocalRedis:
+    """
+    Servidor Redis em memória com o subconjunto de comandos usado pela `RedisWorkQueue`.
+    Como no Redis, cada comando é atômico e os valores são armazenados como bytes.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.hashes = defaultdict(dict)
+        self.zsets = defaultdict(dict)
+        self.sets = defaultdict(set)
+
+    @staticmethod
+    def _bytes(value):
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def hsetnx(self, name, key, value):
+        with self.lock:
+            if key in self.hashes[name]:
+                return 0
+            self.hashes[name][key] = self._bytes(value)
+            return 1
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        with self.lock:
+            items = dict(mapping or {})
+            if key is not None:
+                items[key] = value
+            added = sum(k not in self.hashes[name] for k in items)
+            self.hashes[name].update({k: self._bytes(v) for k, v in items.items()})
+            return added
+
+    def hget(self, name, key):
+        return self.hashes[name].get(key)
+
+    def hexists(self, name, key):
+        return key in self.hashes[name]
+
+    def hmget(self, name, *keys):
+        return [self.hashes[name].get(key) for key in keys]
+
+    def hdel(self, name, *keys):
+        with self.lock:
+            return sum(self.hashes[name].pop(key, None) is not None for key in keys)
+
+    def hincrby(self, name, key, amount=1):
+        with self.lock:
+            value = int(self.hashes[name].get(key, 0)) + amount
+            self.hashes[name][key] = self._bytes(value)
+            return value
+
+    def zadd(self, name, mapping):
+        with self.lock:
+            added = sum(member not in self.zsets[name] for member in mapping)
+            self.zsets[name].update(mapping)
+            return added
+
+    def zrem(self, name, *members):
+        with self.lock:
+            return sum(self.zsets[name].pop(m, None) is not None for m in members)
+
+    def zrangebyscore(self, name, min, max, start=None, num=None):
+        low = float(min)
+        high = float(max)
+        with self.lock:
+            members = sorted(
+                (score, member)
+                for member, score in self.zsets[name].items()
+                if low <= score <= high
+            )
+        members = [self._bytes(member) for _, member in members]
+        if start is not None:
+            members = members[start : start + num]
+        return members
+
+    def zcard(self, name):
+        return len(self.zsets[name])
+
+    def sadd(self, name, *members):
+        with self.lock:
+            before = len(self.sets[name])
+            self.sets[name].update(members)
+            return len(self.sets[name]) - before
+
+    def srem(self, name, *members):
+        with self.lock:
+            removed = len(self.sets[name] & set(members))
+            self.sets[name] -= set(members)
+            return removed
+
+    def smembers(self, name):
+        return {self._bytes(member) for member in self.sets[name]}
+
+    def scard(self, name):
+        return len(self.sets[name])
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_queue(request, tmp_path, clock):
+    server = LocalRedis()
+
+    def factory(**options):
+        options = {
+            "visibility_timeout": 60,
+            "max_attempts": 3,
+            "clock": clock,
+            **options,
+        }
+        if request.param == "sqlite":
+            return SQLiteWorkQueue(str(tmp_path / "queue.db"), **options)
+        return RedisWorkQueue(server, "test", **options)
+
+    return factory
+
+
+def test_lease_should_hide_task_until_completed(make_queue):
+    queue = make_queue()
+    task_id = queue.put({"page": 1})
+    assert queue.put({"page": 1}, task_id) == task_id
+
+    task = queue.lease()
+    assert task.id == task_id and task.payload == {"page": 1} and task.attempts == 1
+    assert queue.lease() is None
+    assert queue.complete(task, {"listings": 110})
+    assert queue.result(task_id) == {"listings": 110}
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "dead": 0}
+
+
+def test_expired_lease_should_be_redelivered_and_committed_once(make_queue, clock):
+    queue = make_queue()
+    queue.put({"page": 1}, "p1")
+
+    first = queue.lease()
+    clock.now += 61
+    second = queue.lease()
+
+    assert second.id == "p1" and second.attempts == 2
+    assert not queue.extend(first)
+    assert queue.extend(second)
+    assert queue.complete(second, "second")
+    assert not queue.complete(first, "first")
+    assert queue.result("p1") == "second"
+
+
+def test_failures_should_retry_then_dead_letter(make_queue, clock):
+    queue = make_queue()
+    queue.put({"page": 7}, "p7")
+
+    task = queue.lease()
+    assert queue.fail(task, "HTTP 503", retry_delay=10) == "pending"
+    assert queue.lease() is None
+    clock.now += 10
+    task = queue.lease()
+    assert queue.fail(task, "HTTP 503") == "pending"
+    task = queue.lease()
+    assert task.attempts == 3
+    assert queue.fail(task, "HTTP 503") == "dead"
+    assert queue.lease() is None
+
+    [letter] = queue.dead_letters()
+    assert (letter.id, letter.payload, letter.error) == ("p7", {"page": 7}, "HTTP 503")
+    assert queue.requeue("p7")
+    assert queue.lease().attempts == 1
+
+
+def test_expired_lease_without_attempts_left_should_dead_letter(make_queue, clock):
+    queue = make_queue(max_attempts=1)
+    queue.put({"page": 2}, "p2")
+
+    queue.lease()
+    clock.now += 61
+
+    assert queue.lease() is None
+    assert [letter.id for letter in queue.dead_letters()] == ["p2"]
+    assert queue.dead_letters()[0].error == "lease expired"
+
+
+def test_release_should_hand_task_back_without_spending_an_attempt(make_queue):
+    queue = make_queue(max_attempts=1)
+    queue.put({"page": 4}, "p4")
+
+    task = queue.lease()
+    assert queue.release(task)
+    assert not queue.release(task)
+    assert queue.counts()["pending"] == 1
+
+    task = queue.lease()
+    assert task.attempts == 1
+    assert queue.complete(task, "ok")
+
+
+def test_concurrent_workers_should_lease_each_task_once(make_queue):
+    queue = make_queue()
+    for i in range(200):
+        queue.put({"page": i}, f"p{i}")
+    leased = []
+
+    def worker():
+        while (task := queue.lease()) is not None:
+            leased.append(task.id)
+            queue.complete(task)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(leased) == sorted(f"p{i}" for i in range(200))
+    assert queue.counts()["done"] == 200
+
+
+def test_complete_racing_with_reclaim_should_not_requeue_task(clock):
+    server = LocalRedis()
+    queue = RedisWorkQueue(server, "test", visibility_timeout=60, clock=clock)
+    queue.put({"page": 1}, "p1")
+    task = queue.lease()
+    clock.now += 61
+
+    # o `complete` atrasado chega entre a leitura do estado e a escrita do `_reclaim`
+    hmget = server.hmget
+
+    def hmget_then_complete(name, *keys):
+        values = hmget(name, *keys)
+        if keys == ("attempts", "max_attempts", "state"):
+            server.hmget = hmget
+            assert queue.complete(task, "late")
+        return values
+
+    server.hmget = hmget_then_complete
+
+    assert queue.lease() is None
+    assert queue.result("p1") == "late"
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 1, "dead": 0}